@@ -0,0 +1,115 @@
+# Benchmark of the demodulation of long signals
+#
+# Compares Expression.demod, which transforms all partitions of a signal in a
+# single batched FFT with cached frequency grids and filters, with the previous
+# implementation, which looped over the partitions in Python, for amplitude
+# modulated signals of 10^5 to 10^7 samples.
+#
+# Usage: python demod_benchmark.py [number of repetitions] [carrier cycles per partition]
+
+import sys
+import time
+
+import numpy as np
+
+from empyric.variables import Expression
+
+
+def legacy_demod(s, dt, f0, bw=np.inf, cycles=np.inf, filt=None):
+    if np.isfinite(cycles):
+        fc = Expression.carrier(s, dt, f0, bw=bw)
+
+        k_partition = int(cycles / (dt * fc))
+
+        n_parts = int(len(s) / k_partition) + 1
+
+        s_padded = np.concatenate([s, np.zeros(n_parts * k_partition - len(s))])
+
+        partitions = np.reshape(s_padded, (n_parts, k_partition))
+    else:
+        n_parts = 1
+        k_partition = len(s)
+
+        partitions = np.array([s])
+
+    partitions_demod = np.empty_like(partitions, dtype=np.complex128)
+
+    for i, partition in enumerate(partitions):
+        freq = np.fft.fftfreq(k_partition, d=dt)
+        fft = np.fft.fft(partition)
+
+        fft_in_positive_band = np.abs(
+            fft * ((freq > f0 - 0.5 * bw) & (freq < f0 + 0.5 * bw))
+        )
+
+        where_f0_closest = np.argwhere(
+            fft_in_positive_band == np.max(fft_in_positive_band)
+        ).flatten()[0]
+
+        if np.abs(fft[where_f0_closest]) > 0.0:
+            phase = np.log(fft[where_f0_closest]).imag
+        else:
+            phase = 0.0
+
+        fft_demod = np.zeros_like(fft)
+        fft_demod += np.roll(fft, -where_f0_closest) * np.exp(-1j * phase)
+        fft_demod += np.roll(fft, where_f0_closest) * np.exp(1j * phase)
+
+        if filt == "gaussian":
+            fft_demod *= np.exp(-(freq**2) / (2 * bw**2))
+        if filt == "sinc":
+            fft_demod *= np.sinc(freq / bw)
+        else:
+            fft_demod *= np.abs(freq) < 0.5 * bw
+
+        partitions_demod[i] = np.fft.ifft(fft_demod)
+
+    return np.abs(partitions_demod.flatten())
+
+
+def best_time(function, repetitions, *args, **kwargs):
+    times = []
+
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        function(*args, **kwargs)
+        times.append(time.perf_counter() - t0)
+
+    return min(times)
+
+
+def main(repetitions=3, cycles=10):
+    dt = 1e-7  # 10 MS/s
+    f0 = 1e5  # carrier frequency
+    bw = 4e4
+
+    rng = np.random.default_rng()
+
+    print(
+        f"{'samples':>10} {'partitions':>11} {'legacy (ms)':>12} "
+        f"{'batched (ms)':>13} {'speedup':>8}"
+    )
+
+    for n in [10**5, 10**6, 10**7]:
+        t = dt * np.arange(n)
+        envelope = 1 + 0.5 * np.sin(2 * np.pi * 1e3 * t)
+        s = envelope * np.cos(2 * np.pi * f0 * t + 0.3)
+        s += 0.01 * rng.standard_normal(n)
+
+        kwargs = dict(bw=bw, cycles=cycles, filt="gaussian")
+
+        legacy = best_time(legacy_demod, repetitions, s, dt, f0, **kwargs)
+        batched = best_time(Expression.demod, repetitions, s, dt, f0, **kwargs)
+
+        n_parts = int(n / int(cycles / (dt * f0))) + 1
+
+        print(
+            f"{n:>10d} {n_parts:>11d} {1e3 * legacy:>12.1f} "
+            f"{1e3 * batched:>13.1f} {legacy / batched:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+
+    main(*args)
@@ -0,0 +1,123 @@
+# Benchmark of the evaluation of expressions
+#
+# Compares evaluating an expression from its string on every call, as was done
+# before expressions were compiled upon construction, with the evaluation of the
+# compiled code of the expression in its prebuilt namespace. The time taken by
+# Expression.value, which also validates the values of the definitions and the
+# result, is shown for reference.
+#
+# Also compares the "numpy" and "numexpr" backends for an expression of large arrays.
+#
+# Usage: python expression_benchmark.py [number of evaluations] [array size]
+
+import sys
+import time
+
+import numpy as np
+
+from empyric.variables import Expression, Parameter
+
+# Shorthand replacements previously applied to the expression string on each call
+legacy_functions = {
+    "sqrt(": "np.sqrt(",
+    "exp(": "np.exp(",
+    "sin(": "np.sin(",
+    "cos(": "np.cos(",
+    "tan(": "np.tan(",
+    "sum(": "np.nansum(",
+    "mean(": "np.nanmean(",
+    "rms(": "np.nanstd(",
+    "std(": "np.nanstd(",
+    "var(": "np.nanvar(",
+    "diff(": "np.diff(",
+    "max(": "np.nanmax(",
+    "min(": "np.nanmin(",
+}
+
+
+def legacy_evaluate(expression, definitions):
+    expression = expression.replace("^", "**")
+
+    variables = {symbol: variable._value for symbol, variable in definitions.items()}
+
+    for shorthand, longhand in legacy_functions.items():
+        if shorthand in expression:
+            expression = expression.replace(shorthand, longhand)
+
+    return eval(expression, {**globals(), **variables}, locals())
+
+
+def compiled_evaluate(expression):
+    variables = {
+        symbol: variable._value for symbol, variable in expression.definitions.items()
+    }
+
+    expression._namespace.update(variables)
+
+    return eval(expression._code, expression._namespace)
+
+
+def main(n_evaluations=10**5, array_size=10**6):
+    definitions = {
+        "v": Parameter(parameter=1.5),
+        "i": Parameter(parameter=0.25),
+        "r": Parameter(parameter=50.0),
+    }
+
+    expressions = ["v * i", "sqrt(v^2 + (i * r)^2)", "exp(-v / r) * sin(i)"]
+
+    print(
+        f"{'expression':>24} {'legacy (us)':>12} {'compiled (us)':>14} "
+        f"{'value (us)':>11}"
+    )
+
+    for string in expressions:
+        expression = Expression(string, definitions=definitions)
+
+        assert np.isclose(expression.value, legacy_evaluate(string, definitions))
+
+        start = time.perf_counter()
+        for _ in range(n_evaluations):
+            legacy_evaluate(string, definitions)
+        legacy = (time.perf_counter() - start) / n_evaluations
+
+        start = time.perf_counter()
+        for _ in range(n_evaluations):
+            compiled_evaluate(expression)
+        compiled = (time.perf_counter() - start) / n_evaluations
+
+        start = time.perf_counter()
+        for _ in range(n_evaluations):
+            expression.value
+        value = (time.perf_counter() - start) / n_evaluations
+
+        print(
+            f"{string:>24} {1e6 * legacy:>12.2f} {1e6 * compiled:>14.2f} "
+            f"{1e6 * value:>11.2f}"
+        )
+
+    # Backends for array expressions
+    definitions = {
+        "v": Parameter(parameter=np.random.default_rng().random(array_size)),
+        "r": Parameter(parameter=50.0),
+    }
+
+    string = "sqrt(v^2 + (v / r)^2) * exp(-v)"
+
+    print(f"\n{'backend':>24} {f'{array_size} elements (ms)':>26}")
+
+    for backend in Expression.backends:
+        expression = Expression(string, definitions=definitions, backend=backend)
+
+        n = max(n_evaluations // 1000, 10)
+
+        start = time.perf_counter()
+        for _ in range(n):
+            expression.value
+        elapsed = (time.perf_counter() - start) / n
+
+        print(f"{expression.backend:>24} {1e3 * elapsed:>26.2f}")
+
+
+if __name__ == "__main__":
+    main(*[int(float(arg)) for arg in sys.argv[1:]])
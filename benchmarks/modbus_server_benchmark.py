@@ -0,0 +1,156 @@
+# Benchmark of updating the registers of a Modbus server
+#
+# Starts a ModbusServer on this computer with a number of knobs and a state of many
+# variables, and compares the time taken to store all values in the registers by
+# ModbusServer.update, which encodes them together into one block of registers per
+# set, with the previous implementation, which encoded each value with its own
+# BinaryPayloadBuilder, after finding its data type among all supported types. The
+# previous implementation did this every 100 ms whether or not the state changed,
+# so the CPU time it used per second with no new states is also shown.
+#
+# Usage: python modbus_server_benchmark.py [number of variables] [number of updates]
+
+import importlib
+import socket
+import sys
+import time
+
+from empyric.routines import ModbusServer
+from empyric.types import supported as supported_types
+from empyric.types import Boolean, Toggle, Integer, Float, Array, String, ON, OFF
+from empyric.variables import Parameter
+
+
+def legacy_update_registers(server):
+    # Store readwrite variable values in holding registers (fc = 3)
+    for i, (name, variable) in enumerate(server.knobs.items()):
+        value = variable._value
+
+        builder = server._payload_builder(byteorder=">")
+
+        # encode the value into the 4 registers
+        if value is None or variable._type is None:
+            builder.add_64bit_float(float("nan"))
+        elif issubclass(variable._type, Boolean):
+            builder.add_64bit_uint(value)
+        elif issubclass(variable._type, Toggle):
+            builder.add_64bit_uint(1 if value == ON else 0)
+        elif issubclass(variable._type, Integer):
+            builder.add_64bit_int(value)
+        elif issubclass(variable._type, Float):
+            builder.add_64bit_float(value)
+
+        # encode the meta data
+        meta_reg_val = {
+            Boolean: 0,
+            Toggle: 1,
+            Integer: 2,
+            Float: 3,
+            Array: 4,
+            String: 5,
+        }.get(variable._type, -1)
+
+        builder.add_16bit_int(meta_reg_val)
+
+        server.slave.setValues(
+            3, server.knob_addresses[i], builder.to_registers(), from_vars=True
+        )
+
+    # Store readonly variable values in input registers (fc = 4)
+    selection = server.state
+
+    meter_addresses = [5 * i for i in range(len(selection))]
+
+    for i, (name, value) in enumerate(selection.items()):
+        _type = None
+        for supported_type in supported_types.values():
+            if isinstance(value, supported_type):
+                _type = supported_type
+
+        builder = server._payload_builder(byteorder=">")
+
+        # encode the value into the 4 registers
+        if value is None or _type is None:
+            builder.add_64bit_float(float("nan"))
+        elif _type == Boolean:
+            builder.add_64bit_uint(value)
+        elif _type == Toggle:
+            builder.add_64bit_uint(int(value in Toggle.on_values))
+        elif _type == Integer:
+            builder.add_64bit_int(value)
+        elif _type == Float:
+            builder.add_64bit_float(value)
+
+        # encode the meta data
+        type_int = {Boolean: 0, Toggle: 1, Integer: 2, Float: 3}.get(_type, -1)
+
+        builder.add_16bit_int(type_int)
+
+        server.slave.setValues(
+            4, meter_addresses[i], builder.to_registers(), from_vars=True
+        )
+
+
+def time_updates(update, states):
+    start = time.perf_counter()
+
+    for state in states:
+        update(state)
+
+    return (time.perf_counter() - start) / len(states)
+
+
+def main(n_variables=500, n_updates=200):
+    _socket = socket.socket()
+    _socket.bind(("127.0.0.1", 0))
+    port = _socket.getsockname()[1]
+    _socket.close()
+
+    knobs = {f"knob {i}": Parameter(parameter=float(i)) for i in range(20)}
+
+    server = ModbusServer(knobs=knobs, address="127.0.0.1", port=port)
+
+    payload = importlib.import_module(".payload", package="pymodbus")
+    server._payload_builder = payload.BinaryPayloadBuilder
+
+    kinds = [float, int, bool, lambda i: ON if i % 2 else OFF]
+
+    states = [
+        {
+            "Time": float(step),
+            **{
+                f"variable {i}": kinds[i % len(kinds)](step + i)
+                for i in range(n_variables - 1)
+            },
+        }
+        for step in range(n_updates)
+    ]
+
+    try:
+
+        def legacy_update(state):
+            server.state = state
+            legacy_update_registers(server)
+
+        legacy = time_updates(legacy_update, states)
+        legacy_registers = server.slave.getValues(4, 0, 5 * n_variables)
+
+        current = time_updates(server.update, states)
+
+        # both store the same values in the registers
+        assert server.slave.getValues(4, 0, 5 * n_variables) == legacy_registers
+
+        print(f"{n_variables} variables and {len(knobs)} knobs\n")
+        print(f"{'':>10} {'update (ms)':>12} {'idle CPU (%)':>13}")
+        print(f"{'legacy':>10} {1e3 * legacy:>12.2f} {100 * 10 * legacy:>13.1f}")
+        print(f"{'current':>10} {1e3 * current:>12.2f} {0.0:>13.1f}")
+        print(f"\nspeedup: {legacy / current:.1f}x")
+
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+
+    main(*args)
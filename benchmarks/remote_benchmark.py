@@ -0,0 +1,92 @@
+# Benchmark of polling remote variables on a socket server
+#
+# Starts a SocketServer on this computer with a number of knobs and compares
+# polling the corresponding Remote variables one request at a time, as is done by
+# the value property of each variable, with retrieving them all in one request
+# with Remote.fetch_many, and with retrieving all variables on the server with
+# Remote.snapshot, and with reading Remote variables subscribed to the server,
+# whose values are pushed by the server. Setting all knobs at once with
+# Remote.set_many is compared with setting them one at a time.
+#
+# Usage: python remote_benchmark.py [number of variables] [number of polls]
+
+import sys
+import time
+
+import numpy as np
+
+from empyric.routines import SocketServer
+from empyric.variables import Parameter, Remote
+
+
+def polling_rate(poll, n_polls):
+    start = time.perf_counter()
+
+    for _ in range(n_polls):
+        poll()
+
+    return n_polls / (time.perf_counter() - start)
+
+
+def main(n_variables=40, n_polls=200):
+    knobs = {f"knob {i}": Parameter(parameter=float(i)) for i in range(n_variables)}
+
+    server = SocketServer(knobs=knobs)
+
+    try:
+        server.update({"Time": 0.0, **{name: float(i) for i, name in enumerate(knobs)}})
+
+        address = f"{server.ip_address}::{server.port}"
+
+        remotes = [Remote(address, name) for name in knobs]
+
+        # values of these are pushed by the server and read from a local cache
+        subscribed = [Remote(address, name, subscribe=True) for name in knobs]
+
+        assert Remote.fetch_many(remotes) == [knob.value for knob in knobs.values()]
+
+        def poll_individually():
+            return [remote.value for remote in remotes]
+
+        def poll_together():
+            return Remote.fetch_many(remotes)
+
+        def poll_snapshot():
+            return Remote.snapshot(address)
+
+        def poll_subscribed():
+            return [remote.value for remote in subscribed]
+
+        values = list(np.arange(n_variables, dtype=float))
+
+        def set_individually():
+            for remote, value in zip(remotes, values):
+                remote.value = value
+
+        def set_together():
+            Remote.set_many(remotes, values)
+
+        print(f"{n_variables} variables on a local socket server\n")
+        print(f"{'operation':>22} {'rate (1/s)':>11} {'variables/s':>12}")
+
+        for operation, function in [
+            ("get one at a time", poll_individually),
+            ("get with fetch_many", poll_together),
+            ("get with snapshot", poll_snapshot),
+            ("get subscribed", poll_subscribed),
+            ("set one at a time", set_individually),
+            ("set with set_many", set_together),
+        ]:
+            rate = polling_rate(function, n_polls)
+
+            print(f"{operation:>22} {rate:>11.0f} {rate * n_variables:>12.0f}")
+
+        del remotes, subscribed
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+
+    main(*args)
@@ -0,0 +1,61 @@
+# Benchmark of incremental saving of experiment data
+#
+# Appends 10^6 rows of data to an experiment in blocks, saving after each block, and
+# reports the time taken by each save. Since only new rows are written, the cost per
+# save should stay constant as the data set grows.
+#
+# Usage: python save_benchmark.py [total rows] [rows per save]
+
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from empyric.experiment import Experiment
+from empyric.variables import Parameter
+
+
+def main(total_rows=10**6, rows_per_save=10**4, n_variables=10):
+    variables = {f"x{i}": Parameter(0.0) for i in range(n_variables)}
+
+    experiment = Experiment(variables)
+
+    start = datetime.datetime.now()
+    step = datetime.timedelta(milliseconds=100)
+
+    rng = np.random.default_rng()
+
+    print(f"{'rows saved':>12} {'save call (ms)':>16} {'save + write (ms)':>18}")
+
+    for block in range(total_rows // rows_per_save):
+        values = rng.random((rows_per_save, n_variables))
+
+        for i in range(rows_per_save):
+            n = block * rows_per_save + i
+            row = {"Time": 0.1 * n, **dict(zip(variables, values[i]))}
+            experiment.data.append(start + n * step, row)
+
+        t0 = time.perf_counter()
+        experiment.save()
+        t1 = time.perf_counter()
+        experiment._writer.flush()  # wait for the background write to finish
+        t2 = time.perf_counter()
+
+        if block % 10 == 0 or block == total_rows // rows_per_save - 1:
+            print(
+                f"{experiment.saved:>12d} {1e3 * (t1 - t0):>16.2f} "
+                f"{1e3 * (t2 - t0):>18.2f}"
+            )
+
+    experiment._writer.close()
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        main(*args)
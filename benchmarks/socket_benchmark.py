@@ -0,0 +1,123 @@
+# Benchmark of reading large messages from sockets
+#
+# Compares read_from_socket, which receives into a preallocated chunk, appends to
+# a growing buffer and searches only the new bytes for the termination, with the
+# previous implementation, which concatenated bytes objects and searched the whole
+# message after every chunk, for responses of 10 to 100 MB (such as waveforms).
+# The previous implementation is quadratic in the message size, so it is only
+# timed up to the given size limit.
+#
+# Usage: python socket_benchmark.py [legacy size limit in MB]
+
+import select
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+from empyric.tools import read_from_socket, write_to_socket
+
+
+def legacy_read_from_socket(
+    _socket, nbytes=None, termination="\r", timeout=None, decode=True, chunk_size=4096
+):
+    default_timeout = _socket.gettimeout()
+
+    if timeout is None:
+        timeout = default_timeout
+
+    _socket.settimeout(timeout)
+
+    if nbytes is None:
+        nbytes = np.inf
+
+    null_responses = 0
+    max_nulls = 3
+
+    if type(termination) == str:
+        termination = termination.encode()
+
+    message = b""
+
+    while len(message) < nbytes and null_responses < max_nulls:
+        part = b""
+
+        remaining_bytes = nbytes - len(message)
+
+        rlist, _, xlist = select.select([_socket], [], [_socket], timeout)
+
+        if _socket not in rlist:
+            break
+
+        try:
+            if remaining_bytes < chunk_size:
+                part = _socket.recv(remaining_bytes)
+            else:
+                part = _socket.recv(chunk_size)
+        except socket.timeout:
+            pass
+
+        if len(part) > 0:
+            message = message + part
+
+            if termination in message:
+                break
+        else:
+            null_responses += 1
+
+    _socket.settimeout(default_timeout)
+
+    if decode:
+        return message.decode().strip()
+    else:
+        return message
+
+
+def time_read(read, size):
+    sender, receiver = socket.socketpair()
+
+    payload = b"0" * size
+
+    writer = threading.Thread(target=write_to_socket, args=(sender, payload, "\r"))
+
+    start = time.perf_counter()
+
+    writer.start()
+    message = read(receiver, timeout=5, decode=False)
+
+    elapsed = time.perf_counter() - start
+
+    writer.join()
+    sender.close()
+    receiver.close()
+
+    assert len(message) == size + 1
+
+    return elapsed
+
+
+def main(legacy_limit=10):
+    print(f"{'size (MB)':>10} {'legacy (ms)':>12} {'buffered (ms)':>14} {'MB/s':>8}")
+
+    for size_mb in [10, 20, 50, 100]:
+        size = size_mb * 2**20
+
+        if size_mb <= legacy_limit:
+            legacy = f"{1e3 * time_read(legacy_read_from_socket, size):>12.0f}"
+        else:
+            legacy = f"{'skipped':>12}"
+
+        buffered = time_read(read_from_socket, size)
+
+        print(
+            f"{size_mb:>10d} {legacy} {1e3 * buffered:>14.0f} "
+            f"{size_mb / buffered:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+
+    main(*args)
@@ -0,0 +1,97 @@
+# Benchmark of a socket server with many concurrent clients
+#
+# Starts a SocketServer on this computer, connects a number of clients, each in its
+# own thread, which query a variable on the server as fast as they can, and shows
+# the distribution of response times and the total rate of requests. The CPU time
+# used by the process while the server and its clients are idle is also shown.
+#
+# Usage: python socket_server_benchmark.py [number of clients] [requests per client]
+
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+from empyric.routines import SocketServer
+from empyric.tools import SocketConnection
+from empyric.variables import Parameter
+
+
+def run_client(address, n_requests, barrier, latencies):
+    connection = SocketConnection(socket.create_connection(address), timeout=5)
+
+    barrier.wait()
+
+    for _ in range(n_requests):
+        start = time.perf_counter()
+
+        connection.write("x ?")
+        response = connection.read()
+
+        latencies.append(time.perf_counter() - start)
+
+        assert response == "x 1.5"
+
+    connection.close()
+
+
+def main(n_clients=100, n_requests=100):
+    server = SocketServer(knobs={"x": Parameter(parameter=1.5)})
+
+    try:
+        address = (server.ip_address, server.port)
+
+        barrier = threading.Barrier(n_clients + 1)
+        latencies = [[] for _ in range(n_clients)]
+
+        clients = [
+            threading.Thread(
+                target=run_client, args=(address, n_requests, barrier, latencies[i])
+            )
+            for i in range(n_clients)
+        ]
+
+        for client in clients:
+            client.start()
+
+        barrier.wait()
+        start = time.perf_counter()
+
+        for client in clients:
+            client.join()
+
+        elapsed = time.perf_counter() - start
+
+        latencies = 1e3 * np.concatenate(latencies)
+
+        print(f"\n{n_clients} clients, {n_requests} requests each")
+        print(f"{'requests/s':>14}: {latencies.size / elapsed:.0f}")
+
+        for percentile in [50, 90, 99]:
+            print(
+                f"{f'p{percentile} (ms)':>14}: "
+                f"{np.percentile(latencies, percentile):.3f}"
+            )
+
+        # CPU time used by the server while idle, with clients connected
+        idle_clients = [socket.create_connection(address) for _ in range(n_clients)]
+
+        cpu_start = time.process_time()
+        time.sleep(1.0)
+        idle_cpu = time.process_time() - cpu_start
+
+        print(f"{'idle CPU (%)':>14}: {100 * idle_cpu:.2f}")
+
+        for client in idle_clients:
+            client.close()
+
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+
+    main(*args)
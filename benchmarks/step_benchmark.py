@@ -0,0 +1,61 @@
+# Benchmark of the time taken by experiment iterations
+#
+# Runs an experiment with many variables spread over several (simulated) instruments
+# and reports the mean iteration time, along with the scheduling overhead, i.e. the
+# time spent dispatching variable updates to worker threads and collecting results.
+#
+# Usage: python step_benchmark.py [number of variables] [number of steps]
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from empyric.experiment import Experiment
+from empyric.instruments import Echo
+from empyric.variables import Meter, Parameter, Expression
+
+
+def main(n_variables=80, n_steps=200, n_instruments=8):
+    instruments = [Echo() for _ in range(n_instruments)]
+
+    variables = {}
+
+    for i in range(n_variables):
+        if i % 4 == 0:
+            variables[f"Meter {i}"] = Meter(
+                instrument=instruments[i % n_instruments], meter="output"
+            )
+        elif i % 4 == 1:
+            variables[f"Expression {i}"] = Expression(
+                expression="2 * x", definitions={"x": variables[f"Meter {i - 1}"]}
+            )
+        else:
+            variables[f"Parameter {i}"] = Parameter(parameter=float(i))
+
+    experiment = Experiment(variables)
+
+    step_times = []
+    overheads = []
+
+    for _ in range(n_steps):
+        start = time.perf_counter()
+        next(experiment)
+        step_times.append(time.perf_counter() - start)
+        overheads.append(experiment.scheduling_overhead)
+
+    experiment.terminate()
+
+    print(f"{n_variables} variables, {n_steps} steps")
+    print(f"mean iteration time:      {1e3 * np.mean(step_times):.3f} ms")
+    print(f"mean scheduling overhead: {1e3 * np.mean(overheads):.3f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        main(*args)
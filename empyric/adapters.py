@@ -1,3 +1,4 @@
+import asyncio
 import importlib
 import socket
 import time
@@ -7,7 +8,11 @@ from threading import Lock
 
 import numpy as np
 
-from empyric.tools import read_from_socket, write_to_socket, logger
+from empyric.tools import MessageScanner, SocketConnection, logger
+
+# Message available (MAV) bit of the IEEE 488.2 status byte, which is set when
+# an instrument has a response ready to be read
+_MAV = 0x10
 
 
 def chaperone(method):
@@ -20,6 +25,19 @@ def chaperone(method):
     """
 
     def wrapped_method(self, *args, validator=None, **kwargs):
+        if self.event_loop is not None:
+            if self.event_loop.is_running():
+                # The adapter communicates through an event loop (see the async
+                # methods of the Adapter class), in which the call is run instead
+                async_method = getattr(self, method.__name__ + "_async")
+
+                return _run_in_loop(
+                    self.event_loop, async_method(*args, validator=validator, **kwargs)
+                )
+            else:
+                # The event loop has stopped; reconnect synchronously below
+                self.disconnect()
+
         self.lock.acquire()
 
         traceback = None
@@ -122,6 +140,154 @@ def chaperone(method):
     return wrapped_method
 
 
+def async_chaperone(method):
+    """
+    Wraps all async write, read and query methods of the adapters, in the same way
+    as the `chaperone` function does for the synchronous methods, without blocking
+    the event loop.
+
+    :param method: (coroutine function) method to be wrapped
+    :return: (coroutine function) wrapped method
+    """
+
+    async def wrapped_method(self, *args, validator=None, **kwargs):
+        # the adapter lock is shared with the synchronous methods
+        await _acquire(self.lock)
+
+        try:
+            traceback = None
+
+            reconnects = 0
+
+            while reconnects < self.max_reconnects:
+                if not self.connected_async:
+                    logger.debug(
+                        f"Connecting to {self.instrument.name} "
+                        f"at {self.instrument.address}"
+                    )
+
+                    await asyncio.sleep(self.delay * reconnects)
+
+                    reconnects += 1
+
+                    try:
+                        await self.connect_async()
+                    except Exception as exception:
+                        traceback = exception.__traceback__
+
+                        logger.error(
+                            f"Encountered '{exception}' while trying "
+                            f"to connect to {self.instrument.name}"
+                        )
+
+                        continue
+
+                attempts = 0
+
+                while attempts < self.max_attempts:
+                    try:
+                        logger.debug(
+                            f"Communicating with {self.instrument.name} "
+                            f"at {self.instrument.address}: {method}({args})"
+                        )
+
+                        response = await method(self, *args, **kwargs)
+
+                        if validator and not validator(response):
+                            if hasattr(response, "__len__") and len(response) > 100:
+                                response = (
+                                    str(response[:50]) + "..." + str(response[-50:])
+                                )
+
+                            raise ValueError(
+                                f"invalid response, {response}, "
+                                f"from {method.__name__} method"
+                            )
+
+                        elif traceback is not None:
+                            logger.info(
+                                f"Communication issue with {self.instrument.name} "
+                                "is resolved"
+                            )
+
+                        logger.debug(
+                            f"Communication with {self.instrument.name} "
+                            f"at {self.instrument.address} successful "
+                            f"with response: {response}"
+                        )
+
+                        return response
+
+                    except Exception as exception:
+                        traceback = exception.__traceback__
+
+                        logger.error(
+                            f"Encountered '{exception}' while trying "
+                            f"to talk to {self.instrument.name}"
+                        )
+
+                        attempts += 1
+
+                logger.debug(
+                    f"Disconnecting from {self.instrument.name} "
+                    f"at {self.instrument.address}"
+                )
+
+                await self.disconnect_async()
+
+            raise AdapterError(
+                f"Unable to communicate with {self.instrument.name}! "
+                f"(after {reconnects} reconnects)"
+            ).with_traceback(traceback)
+        finally:
+            self.lock.release()
+
+    wrapped_method.__doc__ = method.__doc__  # keep method doc string
+
+    return wrapped_method
+
+
+async def _acquire(lock, poll_interval=0.001):
+    """
+    Acquire a lock shared with other threads, polling it so that the event loop
+    keeps running while another thread holds it
+
+    :param lock: (threading.Lock) lock to acquire
+    :param poll_interval: (float) time in seconds between attempts to acquire it
+    :return: None
+    """
+
+    while not lock.acquire(blocking=False):
+        await asyncio.sleep(poll_interval)
+
+
+def _run_in_loop(loop, coroutine):
+    """
+    Run a coroutine in a running event loop from another thread, and wait for its
+    result
+
+    :param loop: (asyncio.AbstractEventLoop) event loop running in another thread
+    :param coroutine: (coroutine) coroutine to run
+    :return: result of the coroutine
+    """
+
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:  # not called from an event loop
+        running_loop = None
+
+    if running_loop is loop:
+        coroutine.close()
+
+        raise AdapterError(
+            "synchronous communication through an adapter from within the event "
+            "loop it is attached to would block the loop; use the async methods "
+            "of the adapter instead"
+        )
+
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
 class AdapterError(ConnectionError):
     pass
 
@@ -139,7 +305,7 @@ class Adapter:
     # in the event of a communication error
     max_reconnects = 1
 
-    kwargs = []
+    kwargs = ["adaptive_delay"]
 
     # Library used by adapter; overwritten in children classes.
     lib = "python"
@@ -150,6 +316,18 @@ class Adapter:
 
     delay = 0.1  # delay between successive communication attempts
 
+    #: If True, queries wait only as long as the instrument takes to respond,
+    # instead of the fixed delay; see the `_wait_for_response` method
+    adaptive_delay = False
+
+    #: Response latency of the instrument in seconds, learned in adaptive mode
+    latency = None
+
+    # Event loop through which the adapter communicates, once connected by the
+    # `connect_async` method of an adapter with an asyncio-based transport; while
+    # it is running, the synchronous write, read and query methods are run in it
+    event_loop = None
+
     def __init__(self, instrument, **kwargs):
         if self.lib is None:
             # determined by class attribute `lib`
@@ -259,6 +437,198 @@ class Adapter:
         """
         self.connected = False
 
+    def _response_ready(self):
+        """
+        Whether the response to a query is ready to be read, for the adaptive
+        waiting of the `_wait_for_response` method: True or False, or None if the
+        adapter cannot tell.
+
+        By default, adapters that can tell how many bytes are waiting to be read
+        (through an `in_waiting` property) are ready once there are any; others
+        cannot tell. Adapters of other kinds overwrite this method.
+        """
+
+        in_waiting = getattr(self, "in_waiting", None)
+
+        if in_waiting is None:
+            return None
+
+        return bool(in_waiting)
+
+    async def _response_ready_async(self):
+        """Asynchronous counterpart of the `_response_ready` method"""
+        return await asyncio.to_thread(self._response_ready)
+
+    def _wait_for_response(self):
+        """
+        Wait between writing a query and reading the response.
+
+        By default, this sleeps for the fixed `delay` of the adapter. If the
+        `adaptive_delay` attribute is True, it only waits until the response is
+        ready to be read, as reported by the `_response_ready` method, which is
+        polled with a growing interval, starting after half of the learned response
+        latency and for no longer than `delay`. Adapters that cannot tell whether
+        the response is ready (e.g. Modbus serial adapters) still sleep for the
+        fixed `delay`, which some instruments need between a query and the read of
+        its response.
+        """
+
+        if not self.adaptive_delay:
+            time.sleep(self.delay)
+            return
+
+        start = time.perf_counter()
+
+        if self.latency is not None:
+            time.sleep(min(0.5 * self.latency, self.delay))
+
+        interval = 1e-4
+
+        while True:
+            ready = self._response_ready()
+            remaining = self.delay - (time.perf_counter() - start)
+
+            if ready is None:
+                time.sleep(max(remaining, 0.0))
+                return
+            elif ready:
+                break
+            elif remaining <= 0:
+                return  # let the read wait for the response until its timeout
+
+            time.sleep(min(interval, remaining))
+
+            interval = min(2 * interval, 5e-3)
+
+        self._learn_latency(time.perf_counter() - start)
+
+    async def _wait_for_response_async(self):
+        """
+        Asynchronous counterpart of the `_wait_for_response` method, which polls
+        the `_response_ready_async` method without blocking the event loop
+        """
+
+        if not self.adaptive_delay:
+            await asyncio.sleep(self.delay)
+            return
+
+        start = time.perf_counter()
+
+        if self.latency is not None:
+            await asyncio.sleep(min(0.5 * self.latency, self.delay))
+
+        interval = 1e-4
+
+        while True:
+            ready = await self._response_ready_async()
+            remaining = self.delay - (time.perf_counter() - start)
+
+            if ready is None:
+                await asyncio.sleep(max(remaining, 0.0))
+                return
+            elif ready:
+                break
+            elif remaining <= 0:
+                return
+
+            await asyncio.sleep(min(interval, remaining))
+
+            interval = min(2 * interval, 5e-3)
+
+        self._learn_latency(time.perf_counter() - start)
+
+    def _learn_latency(self, latency):
+        """Update the exponential moving average of the response latency"""
+
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.latency + 0.2 * (latency - self.latency)
+
+    # Asynchronous counterparts of the methods above, for use in event loops (e.g.
+    # by an AsyncExperiment). Adapters with asyncio-based transports overwrite the
+    # `connect_async` and `disconnect_async` methods, and implement `_write_async`,
+    # `_read_async` and `_query_async` methods; otherwise, the synchronous methods
+    # are run in separate threads.
+
+    @property
+    def connected_async(self):
+        """Whether the adapter is connected for use with its async methods"""
+        return self.connected
+
+    async def connect_async(self):
+        """
+        Establishes communications with the instrument for use with the async
+        methods of the adapter.
+        """
+        await asyncio.to_thread(self.connect)
+
+    @async_chaperone
+    async def write_async(self, *args, validator=None, **kwargs):
+        """
+        Write a command, without blocking the event loop.
+
+        :param args: any arguments for the write method
+        :param validator: (callable) function that returns True if its input
+                          looks right or False if it does not
+        :param kwargs: any keyword arguments for the write method
+
+        :return: (str) literal 'Success' if write operation is successful
+        """
+
+        if hasattr(self, "_write_async"):
+            return await self._write_async(*args, **kwargs)
+        elif hasattr(self, "_write"):
+            return await asyncio.to_thread(self._write, *args, **kwargs)
+        else:
+            raise AttributeError(self.__name__ + " adapter has no _write method")
+
+    @async_chaperone
+    async def read_async(self, *args, validator=None, **kwargs):
+        """
+        Read an awaiting message, without blocking the event loop.
+
+        :param args: any arguments for the read method
+        :param validator: (callable) function that returns True if its input
+                          looks right or False if it does not
+        :param kwargs: any keyword arguments for the read method
+
+        :return: instrument response
+        """
+
+        if hasattr(self, "_read_async"):
+            return await self._read_async(*args, **kwargs)
+        elif hasattr(self, "_read"):
+            return await asyncio.to_thread(self._read, *args, **kwargs)
+        else:
+            raise AttributeError(self.__name__ + " adapter has no _read method")
+
+    @async_chaperone
+    async def query_async(self, *args, validator=None, **kwargs):
+        """
+        Submit a query, without blocking the event loop.
+
+        :param args: any arguments for the query method
+        :param validator: (callable) function that returns True if its input
+                          looks right or False if it does not
+        :param kwargs: any keyword arguments for the query method
+
+        :return: instrument response
+        """
+
+        if hasattr(self, "_query_async"):
+            return await self._query_async(*args, **kwargs)
+        elif hasattr(self, "_query"):
+            return await asyncio.to_thread(self._query, *args, **kwargs)
+        else:
+            raise AttributeError(self.__name__ + " adapter has no _query method")
+
+    async def disconnect_async(self):
+        """
+        Close communication port/channel opened by the `connect_async` method.
+        """
+        await asyncio.to_thread(self.disconnect)
+
 
 class Serial(Adapter):
     """
@@ -388,7 +758,7 @@ class Serial(Adapter):
 
     def _query(self, question, bytes=None, until=None, decode=True):
         self._write(question)
-        time.sleep(self.delay)
+        self._wait_for_response()
         return self._read(bytes=bytes, until=until, decode=decode)
 
     def disconnect(self):
@@ -644,21 +1014,98 @@ class GPIB(Adapter):
 
         if self.lib == "pyvisa":
             self.backend.write(question)
-            time.sleep(self.delay)
+            self._wait_for_response()
             response = self.backend.read()
         elif self.lib == "linux-gpib":
             self.backend.write(self._descr, question)
-            time.sleep(self.delay)
+            self._wait_for_response()
             response = self.backend.read(self._descr, bytes).decode()
         elif self.lib == "prologix-gpib":
 
             with self.backend.lock:
                 self.backend.write(question, address=self.instrument.address)
-                time.sleep(self.delay)
+                self._wait_for_response()
                 response = self.backend.read(address=self.instrument.address)
 
         return response
 
+    def _response_ready(self):
+        """
+        Serial poll the instrument and check the message available (MAV) bit of
+        its status byte, which IEEE 488.2 instruments set once a response is
+        ready. Instruments that do not set the MAV bit are waited on for the
+        full `delay`.
+        """
+
+        try:
+            if self.lib == "pyvisa":
+                status = self.backend.read_stb()
+            elif self.lib == "linux-gpib":
+                status = self.backend.serial_poll(self._descr)
+            elif self.lib == "prologix-gpib":
+                status = self.backend.serial_poll(self.instrument.address)
+            else:
+                return None
+        except Exception:  # e.g. serial polling is not supported
+            return None
+
+        return bool(int(status) & _MAV)
+
+    async def _response_ready_async(self):
+        if not isinstance(self.backend, PrologixGPIBLAN):
+            return await asyncio.to_thread(self._response_ready)
+
+        try:
+            status = await self.backend.serial_poll_async(self.instrument.address)
+        except (OSError, ValueError, asyncio.TimeoutError):  # no valid reply
+            return None
+
+        return bool(status & _MAV)
+
+    async def connect_async(self):
+        await asyncio.to_thread(self.connect)
+
+        if isinstance(self.backend, PrologixGPIBLAN):
+            await self.backend.connect_async()
+
+    async def _write_async(self, message):
+        if not isinstance(self.backend, PrologixGPIBLAN):
+            return await asyncio.to_thread(self._write, message)
+
+        # the controller lock is shared with the synchronous methods
+        await _acquire(self.backend.lock)
+
+        try:
+            await self.backend.write_async(message, address=self.instrument.address)
+        finally:
+            self.backend.lock.release()
+
+        return "Success"
+
+    async def _read_async(self, bytes=1024):
+        if not isinstance(self.backend, PrologixGPIBLAN):
+            return await asyncio.to_thread(self._read, bytes)
+
+        await _acquire(self.backend.lock)
+
+        try:
+            return await self.backend.read_async(address=self.instrument.address)
+        finally:
+            self.backend.lock.release()
+
+    async def _query_async(self, question):
+        if not isinstance(self.backend, PrologixGPIBLAN):
+            return await asyncio.to_thread(self._query, question)
+
+        await _acquire(self.backend.lock)
+
+        try:
+            await self.backend.write_async(question, address=self.instrument.address)
+            await self._wait_for_response_async()
+            return await self.backend.read_async(address=self.instrument.address)
+        finally:
+            self.backend.lock.release()
+
     def _linux_gpib_set_timeout(self, timeout):
         if timeout is None:
             self.backend.timeout(self.descr, 0)
@@ -782,6 +1229,13 @@ class PrologixGPIBUSB:
 
         return response
 
+    def serial_poll(self, address):
+        """Serial poll the device at the given address and return its status byte"""
+
+        self.write(f"spoll {address}", to_controller=True)
+
+        return int(self.read(from_controller=True))
+
     def close(self):
         self.serial_port.close()
 
@@ -795,47 +1249,86 @@ class PrologixGPIBLAN:
     Configurator.
     """
 
+    # Controller configuration commands, sent upon connection
+    configuration = (
+        "mode 1",  # set adapter to "controller" mode
+        "auto 0",  # instruments talk only when requested to
+        "read_tmo_ms 500",  # set timeout to 0.5 seconds
+        "eos 3",  # do not append CR or LF to messages
+        "eoi 1",  # assert EOI with last byte to indicate end of data
+        # Append CR to responses from instruments to indicate message termination
+        "eot_char 13",
+        "eot_enable 1",
+    )
+
     @property
     def timeout(self):
-        return self.socket.gettimeout()
+        return self._timeout
 
     @timeout.setter
     def timeout(self, timeout):
-        self.socket.settimeout(timeout)
+        self._timeout = timeout
+
+        if self.event_loop is None:
+            self.connection.timeout = timeout
 
     def __init__(self, ip_address):
+        self.ip_address = ip_address
+
+        # Event loop and asyncio streams, once connected by connect_async
+        self.event_loop = None
+        self._reader, self._writer = None, None
+
+        self._connect()
+
+        self.devices = []
+        self.address = None
+
+        self.lock = Lock()
+
+    def _connect(self):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
-        self.socket.connect((ip_address, 1234))
+        self.socket.connect((self.ip_address, 1234))
 
-        self.socket.settimeout(1)
+        self._timeout = 1
+        self.connection = SocketConnection(self.socket, timeout=self._timeout)
 
-        # set adapter to "controller" mode
-        self.write("mode 1", to_controller=True)
+        for command in self.configuration:
+            self.write(command, to_controller=True)
 
-        # instruments talk only when requested to
-        self.write("auto 0", to_controller=True)
+    def _check_event_loop(self):
+        """
+        Return True if the controller communicates through a running event loop,
+        reverting to the socket if the event loop has stopped
+        """
 
-        # set timeout to 0.5 seconds
-        self.write("read_tmo_ms 500", to_controller=True)
+        if self.event_loop is None:
+            return False
+        elif self.event_loop.is_running():
+            return True
 
-        # Do not append CR or LF to messages
-        self.write("eos 3", to_controller=True)
+        try:
+            self._writer.close()
+        except RuntimeError:  # event loop is closed
+            pass
 
-        # Assert EOI with last byte to indicate end of data
-        self.write("eoi 1", to_controller=True)
+        self.event_loop = None
+        self._reader, self._writer = None, None
 
-        # Append CR to responses from instruments to indicate message
-        # termination
-        self.write("eot_char 13", to_controller=True)
-        self.write("eot_enable 1", to_controller=True)
+        self._connect()
 
-        self.devices = []
         self.address = None
 
-        self.lock = Lock()
+        return False
 
     def write(self, message, to_controller=False, address=None):
+        if self._check_event_loop():
+            return _run_in_loop(
+                self.event_loop,
+                self.write_async(message, to_controller=to_controller, address=address),
+            )
+
         if address and address != self.address:
             self.write(f"addr {address}", to_controller=True)
             self.address = address
@@ -846,11 +1339,17 @@ class PrologixGPIBLAN:
         if to_controller:
             message = "++" + message
 
-        write_to_socket(self.socket, message)
+        self.connection.write(message)
 
         return "Success"
 
     def read(self, from_controller=False, address=None):
+        if self._check_event_loop():
+            return _run_in_loop(
+                self.event_loop,
+                self.read_async(from_controller=from_controller, address=address),
+            )
+
         if address and address != self.address:
             self.write(f"addr {address}", to_controller=True)
             self.address = address
@@ -861,11 +1360,98 @@ class PrologixGPIBLAN:
         if not from_controller:
             self.write(f"read eoi", to_controller=True)
 
-        return read_from_socket(self.socket)
+        return self.connection.read()
+
+    def serial_poll(self, address):
+        """Serial poll the device at the given address and return its status byte"""
+
+        self.write(f"spoll {address}", to_controller=True)
+
+        return int(self.read(from_controller=True))
+
+    async def connect_async(self):
+        """
+        Replace the socket with an asyncio stream, used by the async methods;
+        while the event loop is running, the write and read methods are run in it
+        """
+
+        if self.event_loop is asyncio.get_running_loop():
+            return
+
+        await asyncio.to_thread(self.close)
+
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.ip_address, 1234), self._timeout
+        )
+
+        self.event_loop = asyncio.get_running_loop()
+
+        for command in self.configuration:
+            await self.write_async(command, to_controller=True)
+
+        self.address = None
+
+    async def write_async(self, message, to_controller=False, address=None):
+        if address and address != self.address:
+            await self.write_async(f"addr {address}", to_controller=True)
+            self.address = address
+
+            if address not in self.devices:
+                self.devices.append(address)
+
+        if to_controller:
+            message = "++" + message
+
+        self._writer.write((message + "\r").encode())
+
+        await asyncio.wait_for(self._writer.drain(), self._timeout)
+
+        return "Success"
+
+    async def read_async(self, from_controller=False, address=None):
+        if address and address != self.address:
+            await self.write_async(f"addr {address}", to_controller=True)
+            self.address = address
+
+            if address not in self.devices:
+                self.devices.append(address)
+
+        if not from_controller:
+            await self.write_async(f"read eoi", to_controller=True)
+
+        try:
+            response = await asyncio.wait_for(
+                self._reader.readuntil(b"\r"), self._timeout
+            )
+        except asyncio.IncompleteReadError as error:
+            response = error.partial
+        except asyncio.TimeoutError:
+            response = b""
+
+        return response.decode().strip()
+
+    async def serial_poll_async(self, address):
+        """Asynchronous counterpart of the `serial_poll` method"""
+
+        await self.write_async(f"spoll {address}", to_controller=True)
+
+        return int(await self.read_async(from_controller=True))
 
     def close(self):
-        self.socket.shutdown(socket.SHUT_RDWR)
-        self.socket.close()
+        if self.event_loop is not None:
+            loop, self.event_loop = self.event_loop, None
+
+            try:
+                if loop.is_running():
+                    loop.call_soon_threadsafe(self._writer.close)
+                else:
+                    self._writer.close()
+            except RuntimeError:  # event loop is closed
+                pass
+
+            self._reader, self._writer = None, None
+        else:
+            self.connection.close()
 
 
 class USB(Adapter):
@@ -937,9 +1523,24 @@ class USB(Adapter):
 
     def _query(self, question):
         self._write(question)
-        time.sleep(self.delay)
+        self._wait_for_response()
         return self._read()
 
+    def _response_ready(self):
+        """
+        Read the status byte of the instrument through the USBTMC control
+        endpoint and check its message available (MAV) bit, which IEEE 488.2
+        instruments set once a response is ready. Instruments that do not set the
+        MAV bit are waited on for the full `delay`.
+        """
+
+        try:
+            status = self.backend.read_stb()
+        except Exception:  # e.g. reading the status byte is not supported
+            return None
+
+        return bool(int(status) & _MAV)
+
     def disconnect(self):
         self.backend.close()
 
@@ -979,14 +1580,13 @@ class Socket(Adapter):
 
         self.backend.connect((remote_ip_address, int(remote_port)))
 
+        self.connection = SocketConnection(self.backend, timeout=self.timeout)
+
         self.connected = True
 
     def _write(self, message):
-        write_to_socket(
-            self.backend,
-            message,
-            termination=self.write_termination,
-            timeout=self.timeout,
+        self.connection.write(
+            message, termination=self.write_termination, timeout=self.timeout
         )
 
         return "Success"
@@ -995,15 +1595,31 @@ class Socket(Adapter):
         termination = kwargs.pop("termination", self.read_termination)
         timeout = kwargs.pop("timeout", self.timeout)
 
-        return read_from_socket(
-            self.backend, termination=termination, timeout=timeout, **kwargs
-        )
+        return self.connection.read(termination=termination, timeout=timeout, **kwargs)
 
     def _query(self, question, **kwargs):
         self._write(question)
         return self._read(**kwargs)
 
     def disconnect(self):
+        if self.event_loop is not None:
+            # Close the asyncio stream opened by the connect_async method
+            loop, self.event_loop = self.event_loop, None
+
+            try:
+                if loop.is_running():
+                    loop.call_soon_threadsafe(self._writer.close)
+                else:
+                    self._writer.close()
+            except RuntimeError:  # event loop is closed
+                pass
+
+            self._reader, self._writer = None, None
+
+            self.connected = False
+
+            return
+
         # Clear out any unread messages
 
         try:
@@ -1013,11 +1629,103 @@ class Socket(Adapter):
         except ConnectionError:
             pass
 
-        self.backend.shutdown(socket.SHUT_RDWR)
-        self.backend.close()
+        self.connection.close()
 
         self.connected = False
 
+    @property
+    def connected_async(self):
+        try:
+            return self.connected and self.event_loop is asyncio.get_running_loop()
+        except RuntimeError:  # not called from an event loop
+            return False
+
+    async def connect_async(self):
+        """
+        Replace the socket with an asyncio stream connected to the same address,
+        which is used by the async methods of the adapter
+        """
+
+        if self.connected:
+            await asyncio.to_thread(self.disconnect)
+
+        remote_ip_address, remote_port = self.instrument.address.split("::")
+
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(remote_ip_address, int(remote_port)),
+            self.timeout,
+        )
+
+        self.event_loop = asyncio.get_running_loop()
+
+        self._read_buffer = bytearray()
+
+        self.connected = True
+
+    async def _write_async(self, message):
+        if isinstance(message, str):
+            message = message.encode()
+
+        self._writer.write(message + self.write_termination.encode())
+
+        await asyncio.wait_for(self._writer.drain(), self.timeout)
+
+        return "Success"
+
+    async def _read_async(self, **kwargs):
+        """
+        Read from the asyncio stream, with the same keyword arguments as the
+        `SocketConnection.read` method, searching for the end of the message with a
+        `MessageScanner`; bytes after the end of the message are kept for the next
+        read
+        """
+
+        termination = kwargs.pop("termination", self.read_termination)
+        timeout = kwargs.pop("timeout", self.timeout)
+        nbytes = kwargs.pop("nbytes", None)
+        decode = kwargs.pop("decode", True)
+        chunk_size = kwargs.pop("chunk_size", 4096)
+
+        scanner = MessageScanner(nbytes, termination, self._read_buffer)
+
+        while scanner.end is None:
+            try:
+                part = await asyncio.wait_for(
+                    self._reader.read(scanner.remaining(chunk_size)), timeout
+                )
+            except asyncio.TimeoutError:
+                break
+
+            if not part:  # connection closed by the other end
+                break
+
+            scanner.feed(part)
+
+        message, self._read_buffer = scanner.split(decode=decode)
+
+        return message
+
+    async def _query_async(self, question, **kwargs):
+        await self._write_async(question)
+        return await self._read_async(**kwargs)
+
+    async def disconnect_async(self):
+        if self.event_loop is None:
+            return await asyncio.to_thread(self.disconnect)
+
+        writer = self._writer
+
+        self._reader, self._writer = None, None
+        self.event_loop = None
+        self.connected = False
+
+        writer.close()
+
+        try:
+            await asyncio.wait_for(writer.wait_closed(), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            pass
+
     def __repr__(self):
         return "Socket"
 
@@ -1100,10 +1808,19 @@ class ModbusSerial(Adapter):
             self.backend.write_register(register, message)
         elif dtype == "float":
             self.backend.write_float(register, message, byteorder=byte_order)
-        time.sleep(self.delay)
+        self._wait_for_response()
 
         return "Success"
 
+    def _response_ready(self):
+        """
+        Minimal Modbus writes each request and reads its response within a single
+        call, with the serial port closed after each call, so there is no pending
+        response to poll for; the wait after a write is a pause between
+        transactions, which always lasts for the fixed `delay`.
+        """
+        return None
+
     def _read(self, register, dtype="uint16", byte_order=0):
         self.backend.serial.timeout = self.timeout
 
@@ -1295,59 +2012,50 @@ class Modbus(Adapter):
         The Modbus data type for decoding registers is specified by the `_type`
         argument. Valid values for `_type` are listed in the `_types` attribute.
         """
+
+        write_function, values = self._prepare_write(func_code, values, _type)
+
+        response = getattr(self.backend, write_function)(
+            address, values, slave=self.slave_id
+        )
+
+        return self._check_write(func_code, response)
+
+    def _prepare_write(self, func_code, values, _type):
+        """
+        Validate the arguments of the `_write` method, and convert the values to
+        coil states or register values
+
+        :return: (tuple) name of the client method to call and the converted values
+        """
+
         if _type and _type not in self.types:
             raise TypeError(
                 "invalid _type argument; must be one of:\n" ", ".join(self.types)
             )
 
-        # Enumerate modbus write functions
-        write_functions = {
-            5: self.backend.write_coil,
-            15: self.backend.write_coils,
-            6: self.backend.write_register,
-            16: self.backend.write_registers,
-        }
-
         values = np.array([values]).flatten()
 
         if func_code == 5:
             # Write single coil
             if len(values) == 1:
-                bool_value = bool(values[0])
+                return "write_coil", bool(values[0])
             else:
                 raise TypeError(
                     "Invalid [values] argument for function code 5"
                     "(write single coil); "
                     "[values] must have a length of 1"
                 )
-
-            response = self.backend.write_coil(address, bool_value, slave=self.slave_id)
-
-            if response.function_code == 5:
-                return "Success"
-            else:
-                raise AdapterError(f"Error writing to coil on {self.instrument.name}")
         elif func_code == 15:
             # Write multiple coils
             if len(values) > 1:
-                bool_values = [bool(value) for value in values]
+                return "write_coils", [bool(value) for value in values]
             else:
                 raise TypeError(
                     "Invalid [values] argument for function code 15"
                     "(write multiple coils); "
                     "[values] must have a length greater than 1"
                 )
-
-            response = self.backend.write_coils(
-                address, bool_values, slave=self.slave_id
-            )
-
-            if response.function_code == 15:
-                return "Success"
-            else:
-                raise AdapterError(
-                    f"Error writing to coil(s) on {self.instrument.name}"
-                )
         elif func_code == 16 or func_code == 6:
             # Write multiple registers
             builder = self._builder_cls(
@@ -1357,23 +2065,35 @@ class Modbus(Adapter):
             for value in values:
                 builder.__getattribute__("add_" + _type)(value)
 
-            register_values = builder.to_registers()
-
-            response = self.backend.write_registers(
-                address, register_values, slave=self.slave_id
+            return "write_registers", builder.to_registers()
+        else:
+            raise TypeError(
+                f"Invalid function code [{func_code}]. Function code options are "
+                f"5, 15, 6, or 16. See docs for details."
             )
 
+    def _check_write(self, func_code, response):
+        """Check the response to a write request made by the `_write` method"""
+
+        if func_code == 5:
+            if response.function_code == 5:
+                return "Success"
+            else:
+                raise AdapterError(f"Error writing to coil on {self.instrument.name}")
+        elif func_code == 15:
+            if response.function_code == 15:
+                return "Success"
+            else:
+                raise AdapterError(
+                    f"Error writing to coil(s) on {self.instrument.name}"
+                )
+        else:
             if response.function_code == 16:
                 return "Success"
             else:
                 raise AdapterError(
                     f"Error writing to register(s) on {self.instrument.name}"
                 )
-        else:
-            raise TypeError(
-                f"Invalid function code [{func_code}]. Function code options are "
-                f"5, 15, 6, or 16. See docs for details."
-            )
 
     def _read(self, func_code, address, count=1, _type="16bit_uint"):
         """
@@ -1386,6 +2106,21 @@ class Modbus(Adapter):
         are read by specifying the count.
         """
 
+        read_function = self._prepare_read(func_code, _type)
+
+        response = getattr(self.backend, read_function)(
+            address, count=count, slave=self.slave_id
+        )
+
+        return self._decode(func_code, response, count, _type)
+
+    def _prepare_read(self, func_code, _type):
+        """
+        Validate the arguments of the `_read` method
+
+        :return: (str) name of the client method to call
+        """
+
         if _type and _type not in self.types:
             raise TypeError(
                 "invalid _type argument; must be one of:\n" ", ".join(self.types)
@@ -1393,34 +2128,37 @@ class Modbus(Adapter):
 
         # Enumerate modbus read functions
         read_functions = {
-            1: self.backend.read_coils,
-            2: self.backend.read_discrete_inputs,
-            3: self.backend.read_holding_registers,
-            4: self.backend.read_input_registers,
+            1: "read_coils",
+            2: "read_discrete_inputs",
+            3: "read_holding_registers",
+            4: "read_input_registers",
         }
 
-        if func_code in [1, 2]:
-            # Read coils or discrete inputs
+        if func_code not in read_functions:
+            # Invalid function code
+            raise ValueError(
+                f"invalid Modbus function code {func_code} for "
+                "reading coils/registers"
+            )
+
+        return read_functions[func_code]
 
-            response = read_functions[func_code](
-                address, count=count, slave=self.slave_id
-            ).bits
+    def _decode(self, func_code, response, count, _type):
+        """Decode the response to a read request made by the `_read` method"""
 
-            bits = [bool(bit) for bit in response][:count]
+        if func_code in [1, 2]:
+            # Read coils or discrete inputs
+            bits = [bool(bit) for bit in response.bits][:count]
 
             if len(bits) == 1:
                 return bits[0]
             else:
                 return bits
 
-        elif func_code in [3, 4]:
+        else:
             # Read holding registers or input registers
-            registers = read_functions[func_code](
-                address, count=count, slave=self.slave_id
-            ).registers
-
             decoder = self._decoder_cls.fromRegisters(
-                registers, byteorder=self.byte_order, wordorder=self.word_order
+                response.registers, byteorder=self.byte_order, wordorder=self.word_order
             )
 
             n_values = int(16 * count / (int(_type.split("bit")[0])))
@@ -1434,21 +2172,99 @@ class Modbus(Adapter):
             else:
                 return values
 
-        else:
-            # Invalid function code
-            raise ValueError(
-                f"invalid Modbus function code {func_code} for "
-                "reading coils/registers"
-            )
-
     def _query(self, *args, **kwargs):
         """Alias of `_read` method"""
         return self._read(*args, **kwargs)
 
     def disconnect(self):
+        if self.event_loop is not None:
+            # Close the asyncio client opened by the connect_async method
+            loop, self.event_loop = self.event_loop, None
+
+            try:
+                if loop.is_running():
+                    loop.call_soon_threadsafe(self.backend.close)
+                else:
+                    self.backend.close()
+            except RuntimeError:  # event loop is closed
+                pass
+
+            self.backend = None
+
+            return
+
         while self.connected:
             self.backend.close()
 
+    @property
+    def connected_async(self):
+        if self.protocol != "TCP":
+            return self.connected
+
+        try:
+            return self.connected and self.event_loop is asyncio.get_running_loop()
+        except RuntimeError:  # not called from an event loop
+            return False
+
+    async def connect_async(self):
+        """
+        For Modbus TCP, replace the client with PyModbus's asyncio client, which
+        is used by the async methods of the adapter
+        """
+
+        if self.protocol != "TCP":
+            return await asyncio.to_thread(self.connect)
+
+        if self.connected:
+            await asyncio.to_thread(self.disconnect)
+
+        client = importlib.import_module(".client", package="pymodbus")
+
+        address = self.instrument.address.split("::")
+
+        if len(address) == 1:
+            address.append(502)  # standard Modbus TCP port
+
+        self.backend = client.AsyncModbusTcpClient(
+            host=address[0], port=int(address[1]), timeout=self.timeout
+        )
+
+        await self.backend.connect()
+
+        self.event_loop = asyncio.get_running_loop()
+
+    async def _write_async(self, func_code, address, values, _type="16bit_uint"):
+        if self.event_loop is None:  # not Modbus TCP
+            return await asyncio.to_thread(
+                self._write, func_code, address, values, _type=_type
+            )
+
+        write_function, values = self._prepare_write(func_code, values, _type)
+
+        response = await getattr(self.backend, write_function)(
+            address, values, slave=self.slave_id
+        )
+
+        return self._check_write(func_code, response)
+
+    async def _read_async(self, func_code, address, count=1, _type="16bit_uint"):
+        if self.event_loop is None:  # not Modbus TCP
+            return await asyncio.to_thread(
+                self._read, func_code, address, count=count, _type=_type
+            )
+
+        read_function = self._prepare_read(func_code, _type)
+
+        response = await getattr(self.backend, read_function)(
+            address, count=count, slave=self.slave_id
+        )
+
+        return self._decode(func_code, response, count, _type)
+
+    async def _query_async(self, *args, **kwargs):
+        """Alias of `_read_async` method"""
+        return await self._read_async(*args, **kwargs)
+
 
 class Phidget(Adapter):
     """
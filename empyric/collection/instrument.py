@@ -1,3 +1,5 @@
+import asyncio
+import inspect
 import typing
 from threading import RLock
 from functools import wraps
@@ -149,6 +151,10 @@ def measurer(method):
 
     dtype = typing.get_type_hints(method).get("return", Type)
 
+    if inspect.iscoroutinefunction(method):
+        # asynchronous measure_[meter]_async method
+        return async_measurer(method, meter.removesuffix("_async"), dtype)
+
     logger.debug(f'Meter {" ".join(meter.split("_"))} dtype is {dtype}')
 
     @wraps(method)
@@ -190,6 +196,54 @@ def measurer(method):
     return wrapped_method
 
 
+def async_measurer(method, meter, dtype):
+    """
+    Counterpart of the ``measurer`` function for asynchronous measure_[meter]_async
+    methods, to which the ``measurer`` function defers.
+
+    The instrument lock is not acquired, since it is held by threads; each
+    transaction with the instrument is protected by the adapter lock instead.
+
+    :param method: (coroutine function) method to be wrapped
+    :param meter: (str) name of the meter
+    :param dtype: (Type) data type of the meter
+
+    :return: wrapped method
+    """
+
+    @wraps(method)
+    async def wrapped_method(*args, **kwargs):
+        self = args[0]
+
+        if not self.adapter.connected:
+            self.__setattr__(meter, None)
+            print(f"Instrument {self.name} is disconnected; unable to measure {meter}")
+            return
+
+        try:
+            logger.debug(f"Measuring value of {meter} on {self.name}...")
+
+            value = recast(await method(*args, **kwargs), to=dtype)
+
+            logger.debug(f"Measured value of {meter} on {self.name} is {value}")
+        except AttributeError as err:
+            # catches most errors caused by the adapter returning None
+            if "NoneType" in str(err):
+                logger.debug(
+                    f"Unable to measure non-null value for {meter} on {self.name}"
+                )
+
+                value = None
+            else:
+                raise AttributeError(err)
+
+        self.__setattr__(meter, value)
+
+        return value
+
+    return wrapped_method
+
+
 class Instrument:
     """
     Basic representation of an instrument, essentially a set of knobs and meters
@@ -237,6 +291,12 @@ class Instrument:
     floating point number, the ``measurer`` function additionally converts whatever the
     bare ``measure_temperature`` method returns to a 64-bit floating point value.
 
+    A meter may also have an asynchronous ``measure_[meter]_async`` method, also
+    wrapped by the ``measurer`` function, which communicates through the async
+    methods of the adapter (e.g. ``query_async``). It is used by the
+    ``measure_async`` method, so that an ``AsyncExperiment`` can measure the meter
+    without blocking its event loop.
+
     """
 
     name = "Instrument"
@@ -392,6 +452,59 @@ class Instrument:
             else:
                 raise adapter_error
 
+    # asynchronous counterparts of the methods above
+    async def write_async(self, *args, **kwargs):
+        """
+        Alias for the adapter's write_async method
+
+        :param args: any arguments for the adapter's write method, usually
+                     including a command string
+        :param kwargs: any arguments for the adapter's write method
+        :return: whatever is returned by the adapter's write method
+        """
+
+        try:
+            return await self.adapter.write_async(*args, **kwargs)
+        except AdapterError as adapter_error:
+            if self.ignore_errors:
+                logger.error(str(adapter_error))
+            else:
+                raise adapter_error
+
+    async def read_async(self, *args, **kwargs):
+        """
+        Alias for the adapter's read_async method
+
+        :param args: any arguments for the adapter's read method
+        :param kwargs: any arguments for the adapter's read method
+        :return: whatever is returned by the adapter's read method
+        """
+
+        try:
+            return await self.adapter.read_async(*args, **kwargs)
+        except AdapterError as adapter_error:
+            if self.ignore_errors:
+                logger.error(str(adapter_error))
+            else:
+                raise adapter_error
+
+    async def query_async(self, *args, **kwargs):
+        """
+        Alias for the adapter's query_async method
+
+        :param args: any arguments for the adapter's query method
+        :param kwargs: any arguments for the adapter's query method
+        :return: whatever is returned by the adapter's query method
+        """
+
+        try:
+            return await self.adapter.query_async(*args, **kwargs)
+        except AdapterError as adapter_error:
+            if self.ignore_errors:
+                logger.error(str(adapter_error))
+            else:
+                raise adapter_error
+
     def set(self, knob: str, value):
         """
         Set the value of a knob on the instrument
@@ -440,6 +553,75 @@ class Instrument:
 
         return measurement
 
+    async def measure_async(self, meter: str):
+        """
+        Measure the value of a variable associated with this instrument, without
+        blocking the event loop. If the instrument has a ``measure_[meter]_async``
+        method, it is awaited; otherwise, the ``measure_[meter]`` method is run in a
+        separate thread.
+
+        :param meter: (string) name of the variable to be measured
+        :return: (float/string) measured value of the variable
+        """
+
+        measure_method = getattr(
+            self, "measure_" + meter.replace(" ", "_") + "_async", None
+        )
+
+        if measure_method is None:
+            return await asyncio.to_thread(self.measure, meter)
+
+        return await measure_method()
+
+    def measure_many(self, meters: list):
+        """
+        Measure the values of several meters of this instrument at once.
+
+        By default, the meters are measured one after the other while holding the
+        instrument lock, so that no other commands are interleaved. A meter that
+        cannot be measured gets a value of None, without affecting the others.
+        Instruments that can measure several quantities with a single command (e.g. a
+        SCPI query returning both voltage and current) should override this method,
+        and record the measured values with the `record_measurement` method.
+
+        :param meters: (list) names of the meters to be measured
+        :return: (dict) dictionary of the form {..., meter: value, ...}
+        """
+
+        measurements = {}
+
+        with self.lock:
+            for meter in meters:
+                try:
+                    measurements[meter] = self.measure(meter)
+                except (AdapterError, ValueError) as error:
+                    logger.warning(f"Unable to measure {meter} on {self.name}: {error}")
+
+                    measurements[meter] = None
+
+        return measurements
+
+    def record_measurement(self, meter: str, value):
+        """
+        Convert a value obtained for a meter other than through its measure method
+        (e.g. in `measure_many`) to the data type of the meter, and record it as the
+        last known value of the meter, as the ``measurer`` function does.
+
+        :param meter: (string) name of the meter
+        :param value: (float/string) measured value of the meter
+        :return: (float/string) recorded value of the meter
+        """
+
+        measure_method = getattr(self, "measure_" + meter.replace(" ", "_"))
+
+        dtype = typing.get_type_hints(measure_method).get("return", Type)
+
+        value = recast(value, to=dtype)
+
+        self.__setattr__(meter.replace(" ", "_"), value)
+
+        return value
+
     def connect(self):
         """
         (Re)Connect to the instrument. This is useful when communications are lost and
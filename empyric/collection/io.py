@@ -108,6 +108,28 @@ class BrainboxesED549(Instrument):
         response = self.query("#013", validator=self._validator)
         return response[1:]
 
+    # Asynchronous versions of the measure methods, used by AsyncExperiment
+
+    @measurer
+    async def measure_analog_in0_async(self) -> Float:
+        response = await self.query_async("#010", validator=self._validator)
+        return response[1:]
+
+    @measurer
+    async def measure_analog_in1_async(self) -> Float:
+        response = await self.query_async("#011", validator=self._validator)
+        return response[1:]
+
+    @measurer
+    async def measure_analog_in2_async(self) -> Float:
+        response = await self.query_async("#012", validator=self._validator)
+        return response[1:]
+
+    @measurer
+    async def measure_analog_in3_async(self) -> Float:
+        response = await self.query_async("#013", validator=self._validator)
+        return response[1:]
+
     @staticmethod
     def _validator(response):
         return re.match(r">\+?\-?\d\d\.\d\d\d", response)
@@ -5,8 +5,9 @@ from typing import Union
 import numpy as np
 import pandas as pd
 
+from empyric.tools import logger
 from empyric.types import Toggle, ON, OFF, String, Float, Array
-from empyric.adapters import GPIB
+from empyric.adapters import GPIB, AdapterError
 from empyric.collection.instrument import Instrument, setter, getter, measurer
 
 
@@ -92,8 +93,18 @@ class Keithley2400(Instrument):
 
     @setter
     def set_meter(self, variable: String):
-        if variable not in ["voltage", "current"]:
-            raise ValueError('Source must be either "current" or "voltage"')
+        if variable not in ["voltage", "current", "voltage, current"]:
+            raise ValueError(
+                'Meter must be either "current", "voltage" or "voltage, current"'
+            )
+
+        if variable == "voltage, current":
+            # concurrent measurements of voltage and current, by measure_many
+            self.write(":SENS:FUNC:CONC ON")
+            self.write(':SENS:FUNC "VOLT","CURR"')
+            self.write(":FORM:ELEM VOLT,CURR")
+        else:
+            self.write(":SENS:FUNC:CONC OFF")
 
         if variable == "voltage":
             self.write(':SENS:FUNC "VOLT"')
@@ -107,7 +118,9 @@ class Keithley2400(Instrument):
 
     @getter
     def get_meter(self) -> String:
-        if self.query(":SENS:FUNC?").strip() == "VOLT:DC":
+        if int(self.query(":SENS:FUNC:CONC?").strip()) == 1:
+            return "voltage, current"
+        elif self.query(":SENS:FUNC?").strip().strip('"') == "VOLT:DC":
             return "voltage"
         else:
             return "current"
@@ -152,11 +165,7 @@ class Keithley2400(Instrument):
         if not self.output:
             self.set_output(ON)
 
-        def validator(response):
-            match = re.match(r".\d\.\d+E.\d\d", response)
-            return bool(match)
-
-        return float(self.query(":READ?", validator=validator))
+        return self._read_element(0)
 
     @measurer
     def measure_current(self) -> Float:
@@ -166,11 +175,66 @@ class Keithley2400(Instrument):
         if not self.output:
             self.set_output(ON)
 
+        return self._read_element(1)
+
+    def _read_element(self, index):
+        """
+        Take a reading and return its only element or, if the sourcemeter still
+        measures voltage and current concurrently (e.g. if it was set to do so
+        from elsewhere), the element with the given index of the "voltage,current"
+        response
+        """
+
         def validator(response):
-            match = re.match(r".\d\.\d+E.\d\d", response)
+            match = re.match(r".\d\.\d+E.\d\d(,.\d\.\d+E.\d\d)?$", response.strip())
             return bool(match)
 
-        return float(self.query(":READ?", validator=validator))
+        elements = self.query(":READ?", validator=validator).strip().split(",")
+
+        if len(elements) == 1:
+            return float(elements[0])
+        else:
+            return float(elements[index])
+
+    def measure_many(self, meters: list):
+        """
+        Measure voltage and current concurrently, with a single query, if both are
+        requested. Any other meters are measured separately.
+        """
+
+        if "voltage" not in meters or "current" not in meters:
+            return super().measure_many(meters)
+
+        with self.lock:
+            try:
+                if self.meter != "voltage, current":
+                    self.set_meter("voltage, current")
+
+                if not self.output:
+                    self.set_output(ON)
+
+                def validator(response):
+                    match = re.match(r".\d\.\d+E.\d\d,.\d\.\d+E.\d\d", response)
+                    return bool(match)
+
+                response = self.query(":READ?", validator=validator)
+
+                voltage, current = response.split(",")
+
+                measurements = {
+                    "voltage": self.record_measurement("voltage", float(voltage)),
+                    "current": self.record_measurement("current", float(current)),
+                }
+            except (AdapterError, ValueError) as error:
+                logger.warning(f"Unable to measure voltage and current: {error}")
+
+                measurements = {"voltage": None, "current": None}
+
+            others = [meter for meter in meters if meter not in measurements]
+
+            measurements.update(super().measure_many(others))
+
+        return measurements
 
     @setter
     def set_voltage(self, voltage: Float):
@@ -1,6 +1,7 @@
 # Tools for defining and running experiments
 import asyncio
 import collections
+import contextvars
 import datetime
 import importlib
 import logging
@@ -11,14 +12,13 @@ import sys
 import threading
 import time
 import tkinter as tk
-import warnings
+from concurrent.futures import ThreadPoolExecutor
 from tkinter.filedialog import askopenfilename
 from typing import Union
 
 import numpy as np
 import pandas as pd
 import pykwalify.errors
-from pandas.core.computation import expressions
 from pykwalify.core import Core as YamlValidator
 from ruamel.yaml import YAML
 
@@ -28,6 +28,7 @@ from empyric import graphics as _graphics
 from empyric import instruments as _instruments
 from empyric import routines as _routines
 from empyric.adapters import AdapterError
+from empyric.storage import DataStore, ColumnarStore, ArrayStore, writers
 
 from empyric.tools import convert_time, Clock, logger
 from empyric.types import recast, Boolean, Toggle, Integer, Float, ON
@@ -49,6 +50,19 @@ class Experiment:
     , and can either be a number, a string of the form "[number] [time unit, e.g.
     seconds, minutes or hours]" or "with routines" to end the experiment after the
     last routine has ended.
+
+    The experiment data, i.e. the state at every iteration, is held in the `data`
+    attribute, which is a `DataStore` (by default, a `ColumnarStore`). The optional
+    `data` argument can be used to provide a different store, such as a
+    `ColumnarStore` with bounded memory (`max_rows` argument). Use the `dataframe`
+    property of the store to get the data as a pandas DataFrame.
+
+    Variables and routines are updated by persistent pools of worker threads: one
+    worker for each instrument (whose commands are executed one at a time anyway),
+    and shared pools for all other variables and for routines. After each
+    iteration, the `scheduling_overhead` attribute holds the time in seconds spent on
+    dispatching updates to workers and collecting the results, as opposed to
+    actually updating variables and routines.
     """
 
     # Possible statuses of an experiment
@@ -99,14 +113,30 @@ class Experiment:
             variables: dict,
             routines: dict = None,
             end: Union[numbers.Number, str, None] = None,
+            data: DataStore = None,
+            data_format: str = "csv",
     ):
         self.variables = variables
         # dict of the form {..., name: variable, ...}
 
-        # Used to block evaluation of expressions
-        # until their dependee variables are evaluated
-        for variable in self.variables.values():
-            variable._eval_event = threading.Event()
+        # Sort the variables into waves to be evaluated one after the other, so that
+        # expressions are evaluated after the variables they depend on
+        names = {id(variable): name for name, variable in self.variables.items()}
+
+        dependencies = {
+            name: [
+                names[id(dependee)]
+                for dependee in getattr(variable, "definitions", {}).values()
+                if id(dependee) in names
+            ]
+            for name, variable in self.variables.items()
+        }
+
+        self._waves = dependency_waves(dependencies)
+        # list of lists of variable names
+
+        self._groups = [self._group_variables(wave) for wave in self._waves]
+        # list of dicts of the form {..., (names,): executor key, ...}
 
         if routines:
             self.routines = routines
@@ -137,18 +167,61 @@ class Experiment:
             data={**{"Time": None}, **{name: None for name in self.variables}},
             dtype=object,
         )
-        self.data = pd.DataFrame(
-            columns=["Time"] + list(variables.keys()), dtype=object
-        )
+
+        if data is not None:
+            self.data = data
+        else:
+            self.data = ColumnarStore(["Time"] + list(variables.keys()))
 
         self._status = Experiment.READY
         self.status_locked = True
         # can only be unlocked by the start, hold, stop and terminate methods
 
-        self.saved = []  # list of saved data entries
+        if data_format.lower() not in writers:
+            raise ValueError(
+                f"invalid data format {data_format}; "
+                f"valid formats are {', '.join(writers)}"
+            )
+
+        self.data_format = data_format.lower()
+
+        self.saved = 0  # number of rows of data saved so far (high-water mark)
+        self._writer = None  # writes data to file; created by the save method
+        self._writer_path = None  # path requested for the writer
+        self._writer_finished = False  # set once the data file is completed
+
+        self.arrays = {}
+        # dict of the form {..., name: array_store, ...} holding the array values
+        # of variables, when saving data in CSV format
+
+        self._executors = {}
+        # dict of the form {..., key: executor, ...}; created as needed
+
+        # Worker pools are only shut down between steps, by the iterating thread
+        self._executors_lock = threading.Lock()
+        self._stepping = False
+
+        self.scheduling_overhead = 0.0  # in seconds, for the last iteration
+        self._save_lock = threading.Lock()
 
     def __next__(self):
 
+        with self._executors_lock:
+            self._stepping = True
+
+        try:
+            return self._step()
+        finally:
+            with self._executors_lock:
+                self._stepping = False
+
+            if self.terminated:
+                # terminated during the step, possibly by another thread
+                self._shutdown_executors()
+
+    def _step(self):
+        """Take a step of the experiment"""
+
         # Start the clock on first call
         if self.state.name is None:  # first step of the experiment
             self.start()
@@ -165,48 +238,42 @@ class Experiment:
 
         # If the experiment is running, apply new settings to knobs
         # according to the routines (if there are any)
-        if self.running:
-            # Update each routine in its own thread
-            threads = {}
-            for name, routine in self.routines.items():
-                threads[name] = threading.Thread(
-                    target=self._update_routine, args=(name,)
-                )
-                threads[name].start()
+        overhead = 0.0
 
-            # Wait for all routine threads to finish
-            for name, thread in threads.items():
-                self.status = Experiment.RUNNING + f": executing {name}"
-                thread.join()
+        if self.running:
+            # Update routines in the routine worker pool
+            overhead += self._run_updates(
+                self._update_routine,
+                {name: "routines" for name in self.routines},
+                Experiment.RUNNING + ": executing",
+            )
 
             self.status = Experiment.RUNNING
 
         # Get all variable values if experiment is running or holding
         if self.running or self.holding:
-            for variable in self.variables.values():
-                variable._eval_event.clear()
-
-            # Run each measure / get operation in its own thread
-            threads = {}
-            for name in self.variables:
-                threads[name] = threading.Thread(
-                    target=self._update_variable, args=(name,)
-                )
-                threads[name].start()
-
             base_status = self.status
 
-            # Wait for all threads to finish
-            for name, thread in threads.items():
-                self.status = base_status + f": retrieving {name}"
-                thread.join()
+            # Run measure / get operations in the worker pools of the instruments,
+            # one wave of variables at a time; expressions of the same signals
+            # share their Fourier transforms until the end of the step
+            with _variables.Expression.fft_cache():
+                for groups in self._groups:
+                    if self.terminated:
+                        break
+
+                    overhead += self._run_updates(
+                        self._update_group, groups, base_status + ": retrieving"
+                    )
 
             self.status = base_status
 
+            self.scheduling_overhead = overhead
+
+            logger.debug(f"Scheduling overhead was {1e3 * overhead:.3f} ms")
+
             # Append new state to experiment data set
-            with warnings.catch_warnings():
-                warnings.simplefilter(action="ignore", category=FutureWarning)
-                self.data.loc[self.state.name] = self.state
+            self.data.append(self.state.name, self.state)
 
         # End the experiment, if the duration of the experiment has passed
         if self.clock.time > self.end:
@@ -220,19 +287,209 @@ class Experiment:
     def __iter__(self):
         return self
 
-    def _update_variable(self, name):
-        """Retrieve and store a variable value"""
+    def _executor_key(self, name):
+        """
+        Key of the worker pool that updates the named variable: the instrument of
+        the variable itself, so that instruments of the same name get their own
+        pools, or "variables" for variables without an instrument; the pool of
+        routines has the key "routines"
+        """
+
+        instrument = getattr(self.variables[name], "instrument", None)
+
+        if instrument is not None:
+            return instrument
+        else:
+            return "variables"
+
+    def _group_variables(self, names):
+        """
+        Group the named variables for updating: meters of the same instrument are
+        measured together (see `Instrument.measure_many`), remote variables of the
+        same server are retrieved together (see `Remote.fetch_many`), while other
+        variables are updated individually.
+
+        Returns a dictionary of the form {..., (names,): executor key, ...}
+        """
+
+        groups = {}
+        meters = collections.defaultdict(list)
+        remotes = collections.defaultdict(list)
+
+        for name in names:
+            variable = self.variables[name]
+
+            if isinstance(variable, _variables.Meter):
+                meters[self._executor_key(name)].append(name)
+            elif isinstance(variable, _variables.Remote):
+                remotes[variable.server].append(name)
+            else:
+                groups[(name,)] = self._executor_key(name)
+
+        for key, names in meters.items():
+            groups[tuple(names)] = key
+
+        for names in remotes.values():
+            groups[tuple(names)] = self._executor_key(names[0])
+
+        return groups
+
+    def _executor(self, key):
+        """Get (or create) the worker pool with the given key"""
+
+        if key not in self._executors:
+            if key == "routines":
+                workers = max(len(self.routines), 1)
+            elif key == "variables":
+                # enough workers to update all such variables in a wave at once
+                workers = max(
+                    sum(self._executor_key(name) == key for name in self.variables), 1
+                )
+            else:  # instrument
+                workers = 1
+
+            name = key if isinstance(key, str) else key.name
+
+            self._executors[key] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f"{name}-worker"
+            )
+
+        return self._executors[key]
+
+    def _run_updates(self, update, keys, status):
+        """
+        Run the update function for each item in `keys`, a dictionary of the form
+        {..., name (or tuple of names): executor key, ...}, and wait for all updates
+        to finish.
+
+        Returns the scheduling overhead, i.e. the time elapsed beyond the time spent
+        by the busiest worker pool on the updates.
+        """
+
+        def timed_update(_item):
+            start = time.perf_counter()
+            update(_item)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+
+        # each update runs in a copy of the current context, so that it sees the
+        # shared Fourier transforms of the step (see `Expression.fft_cache`)
+        futures = {
+            item: self._executor(key).submit(
+                contextvars.copy_context().run, timed_update, item
+            )
+            for item, key in keys.items()
+        }
+
+        busy = collections.defaultdict(float)  # time spent by each pool on updates
+
+        for item, future in futures.items():
+            key = keys[item]
+            name = ", ".join(item) if isinstance(item, tuple) else item
+
+            self.status = status + f" {name}"
+
+            if future.cancelled():
+                logger.info(f"Skipped update of {name}")
+                continue
+
+            error = future.exception()
+
+            if error is not None:
+                logger.error(f"Error while updating {name}: {error}")
+            elif not isinstance(key, str):
+                busy[key] += future.result()  # instrument updates run serially
+            else:
+                busy[key] = max(busy[key], future.result())
+
+        elapsed = time.perf_counter() - start
+
+        return max(elapsed - max(busy.values(), default=0.0), 0.0)
+
+    def _shutdown_executors(self):
+        """
+        Stop the worker pools; new ones are created if needed. If a step is in
+        progress, the pools are stopped by the iterating thread once it is over.
+        """
+
+        with self._executors_lock:
+            if self._stepping:
+                return
+
+            executors, self._executors = self._executors, {}
+
+        for executor in executors.values():
+            # don't wait, since this may be called from a worker thread
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _update_group(self, names):
+        """Retrieve and store the values of a group of variables"""
+
+        if isinstance(self.variables[names[0]], _variables.Meter):
+            self._update_meters(names)
+        elif isinstance(self.variables[names[0]], _variables.Remote):
+            self._update_remotes(names)
+        else:
+            for name in names:
+                self._update_variable(name)
+
+    def _update_meters(self, names):
+        """
+        Retrieve and store the values of meters of the same instrument, measured
+        together by the `measure_many` method of the instrument
+        """
 
         try:
-            if isinstance(self.variables[name], _variables.Expression):
-                for symbol, dependee in self.variables[name].definitions.items():
-                    if hasattr(dependee, "_eval_event"):
-                        logger.debug(
-                            f"Expression {name} is waiting for {symbol} to be evaluated"
-                        )
+            meters = {name: self.variables[name] for name in names}
+
+            instrument = meters[names[0]].instrument
 
-                        dependee._eval_event.wait()
+            # Only measure meters whose gates are open
+            gated = [name for name, meter in meters.items() if meter.gate.value]
 
+            try:
+                measurements = instrument.measure_many(
+                    list(dict.fromkeys(meters[name].meter for name in gated))
+                )
+            except (AdapterError, ValueError) as error:
+                measurements = {}
+                logger.warning(f"Unable to evaluate {', '.join(gated)}: {error}")
+
+            for name, meter in meters.items():
+                if name in gated:
+                    value = meter.record(measurements.get(meter.meter, None))
+                else:
+                    value = meter.record(None)
+
+                logger.info(f"{name} evaluated to {value}")
+
+                self._store_value(name, value)
+        except Exception as err:
+            self.terminate()
+            raise err
+
+    def _update_remotes(self, names):
+        """
+        Retrieve and store the values of remote variables of the same server,
+        retrieved together by the `Remote.fetch_many` method
+        """
+
+        try:
+            remotes = [self.variables[name] for name in names]
+
+            for name, value in zip(names, _variables.Remote.fetch_many(remotes)):
+                logger.info(f"{name} evaluated to {value}")
+
+                self._store_value(name, value)
+        except Exception as err:
+            self.terminate()
+            raise err
+
+    def _update_variable(self, name):
+        """Retrieve and store a variable value"""
+
+        try:
             try:
                 value = self.variables[name].value
                 logger.info(f"{name} evaluated to {value}")
@@ -243,28 +500,30 @@ class Experiment:
                 value = None
                 logger.warning(f"Unable to evaluate {name}: {value_error}")
 
-            self.variables[name]._eval_event.set()
-            # unblock threads evaluating dependents
-
-            if np.size(value) > 1:  # store array data as CSV files
-                if np.any(value):
-                    # only save non-empty arrays
-                    dataframe = pd.DataFrame(
-                        {name: value}, index=[self.state.name] * len(value)
-                    )
-                    path = name.replace(" ", "_") + "_"
-                    path += self.state.name.strftime("%Y%m%d-%H%M%S") + ".csv"
-                    dataframe.to_csv(path)
-
-                    self.state[name] = os.path.abspath(path)
-                else:
-                    self.state[name] = None
-            else:
-                self.state[name] = value
+            self._store_value(name, value)
         except Exception as err:
             self.terminate()
             raise err
 
+    def _store_value(self, name, value):
+        """Store a variable value in the state"""
+
+        if np.size(value) > 1 and self.data_format == "csv":
+            # store array data in an array store, with a reference in the state
+            if name not in self.arrays:
+                path = name.replace(" ", "_") + f"_{self.timestamp}"
+                self.arrays[name] = ArrayStore(path)
+
+            try:
+                self.state[name] = self.arrays[name].append(
+                    value, timestamp=datetime.datetime.now()
+                )
+            except (TypeError, ValueError) as err:
+                logger.warning(f"Unable to store array value of {name}: {err}")
+                self.state[name] = value
+        else:
+            self.state[name] = value
+
     def _update_routine(self, name):
         """Update a routine according to the current state"""
 
@@ -279,7 +538,13 @@ class Experiment:
 
     def save(self, directory=None):
         """
-        Save the experiment dataframe to a CSV file
+        Save the experiment data to a file in the format given by the `data_format`
+        attribute (CSV by default)
+
+        Only the data acquired since the last save is appended to the file. The data
+        is written by a background thread, so this method returns right away; the
+        file is completed and closed when the experiment is terminated, after which
+        this method does nothing.
 
         :param directory: (path) (optional) directory to save data to,
                           if different from working directory
@@ -289,29 +554,87 @@ class Experiment:
         base_status = self.status
         self.status = base_status + ": saving data"
 
-        path = f"data_{self.timestamp}.csv"
+        writer_class = writers[self.data_format]
+
+        path = f"data_{self.timestamp}{writer_class.extension}"
 
         if directory:
             path = os.path.join(directory, path)
 
         logger.info(f"Saving experiment data to {path}")
 
-        if not os.path.exists(path):
-            # if this is a new file, write column headers
-            with open(path, "a") as data_file:
-                data_file.write("," + ",".join(self.data.columns) + "\n")
+        with self._save_lock:
+            if self._writer_finished:
+                # the data file was completed upon termination
+                self.status = base_status
+                return
+
+            stop = self.data.appended
+
+            unsaved = self.data.since(self.saved, stop=stop)
+
+            if len(unsaved) < stop - self.saved:
+                logger.warning(
+                    f"{stop - self.saved - len(unsaved)} rows of data were discarded "
+                    "from memory before being saved; consider increasing the buffer "
+                    "size or decreasing the save interval"
+                )
+
+            if len(unsaved) > 0:
+                # The writer is only created once there is data to write
+                if (
+                    self._writer is None
+                    or self._writer.closed
+                    or self._writer_path != path
+                ):
+                    if self._writer is not None:
+                        self._writer.close()
+
+                    types = {"Time": Float}
+                    types.update(
+                        {name: var._type for name, var in self.variables.items()}
+                    )
 
-        unsaved = np.setdiff1d(self.data.index, self.saved)
+                    self._writer = writer_class(path, self.data.columns, types=types)
+                    self._writer_path = path
+                    # (binary writers may write to a different path than requested)
 
-        with open(path, "a") as data_file:
-            for line in unsaved:
-                line_data = ",".join(map(str, list(self.data.loc[line])))
-                data_file.write(str(line) + "," + line_data + "\n")
+                self._writer.write(unsaved)
 
-        self.saved = self.saved + list(unsaved)
+            self.saved = stop
 
         self.status = base_status
 
+    def window(self, start=None, stop=None):
+        """
+        Get the experiment data within a window of experiment times.
+
+        Data is taken from memory where possible. If older data has been discarded
+        from memory and the data is being saved in a format that can be queried
+        (i.e. SQLite), the discarded part of the window is read from the file.
+
+        :param start: (float) (optional) earliest experiment time in seconds
+        :param stop: (float) (optional) latest experiment time in seconds
+        :return: (pandas.DataFrame) experiment data within the window
+        """
+
+        in_memory = self.data.window(start, stop)
+
+        with self._save_lock:
+            writer = self._writer
+
+        discarded = len(self.data) < self.data.appended
+
+        if not discarded or writer is None or not hasattr(writer, "window"):
+            return in_memory
+
+        saved = writer.window(start, stop, columns=self.data.columns)
+
+        if len(in_memory) > 0:
+            saved = saved[saved.index < in_memory.index[0]]
+
+        return pd.concat([saved, in_memory])
+
     def start(self):
         """
         Start the experiment: clock starts/resumes, routines resume,
@@ -372,6 +695,18 @@ class Experiment:
         self.stop()
         self.save()
 
+        # Finish writing data to file; later calls to the save method do nothing
+        with self._save_lock:
+            if self._writer is not None:
+                self._writer.close()
+
+            self._writer_finished = True
+
+        for array_store in self.arrays.values():
+            array_store.close()
+
+        self._shutdown_executors()
+
         self.status_locked = False
         self.status = Experiment.TERMINATED
         if reason:
@@ -393,6 +728,11 @@ class AsyncExperiment(Experiment):
     Each variable and routine is updated as quickly as possible independent of the
     experiment iteration. Every time a variable is updated, the corresponding entry in
     `state` is also updated.
+
+    Meters are measured with the `measure_async` method of their instruments, which
+    communicate through the async methods of their adapters where available, so
+    that networked instruments are polled from the event loop without a thread for
+    each meter. Other variables and routines are updated in separate threads.
     """
 
     def __init__(
@@ -400,8 +740,10 @@ class AsyncExperiment(Experiment):
             variables: dict,
             routines: dict = None,
             end: Union[numbers.Number, str, None] = None,
+            data: DataStore = None,
+            data_format: str = "csv",
     ):
-        super().__init__(variables, routines, end)
+        super().__init__(variables, routines, end, data=data, data_format=data_format)
 
     def __next__(self):
 
@@ -427,9 +769,7 @@ class AsyncExperiment(Experiment):
 
         if (self.running or self.holding) and self.state.name is not None:
             # Append new state to experiment data set
-            with warnings.catch_warnings():
-                warnings.simplefilter(action="ignore", category=FutureWarning)
-                self.data.loc[self.state.name] = self.state
+            self.data.append(self.state.name, self.state)
 
         elif self.terminated:
             raise StopIteration
@@ -441,7 +781,10 @@ class AsyncExperiment(Experiment):
         while not self.terminated:
             if self.running or self.holding:
 
-                await asyncio.to_thread(Experiment._update_variable, self, name)
+                if isinstance(self.variables[name], _variables.Meter):
+                    await self._update_meter(name)
+                else:
+                    await asyncio.to_thread(Experiment._update_variable, self, name)
 
                 # Update time
                 self.state["Time"] = self.clock.time
@@ -450,6 +793,35 @@ class AsyncExperiment(Experiment):
             else:
                 await asyncio.sleep(0.1)  # give other updating tasks a chance to run
 
+    async def _update_meter(self, name):
+        """Measure and store the value of the named meter"""
+
+        meter = self.variables[name]
+
+        try:
+            try:
+                if isinstance(meter.gate, _variables.Parameter):
+                    gate_open = meter.gate.value
+                else:
+                    gate_open = await asyncio.to_thread(getattr, meter.gate, "value")
+
+                if gate_open:
+                    value = meter.record(
+                        await meter.instrument.measure_async(meter.meter)
+                    )
+                else:
+                    value = meter.record(None)
+
+                logger.info(f"{name} evaluated to {value}")
+            except (AdapterError, ValueError) as error:
+                value = None
+                logger.warning(f"Unable to evaluate {name}: {error}")
+
+            self._store_value(name, value)
+        except Exception as err:
+            self.terminate()
+            raise err
+
     async def _update_routine(self, name):
         """Update named routine"""
         while not self.terminated:
@@ -654,8 +1026,8 @@ class Manager:
             # Save experimental data periodically
             next_save = self.last_save + self.save_interval
             if self.experiment.clock.time >= next_save:
-                save_thread = threading.Thread(target=self.experiment.save)
-                save_thread.start()
+                # data is written in the background, so this does not block
+                self.experiment.save()
                 self.last_save = self.experiment.clock.time
 
             # Check if any alarms are triggered and handle them
@@ -664,7 +1036,7 @@ class Manager:
                     # Add to dictionary of triggered alarms, if newly triggered
                     if name not in self.awaiting_alarms:
                         self.awaiting_alarms[name] = {
-                            "time": self.experiment.data["Time"].iloc[-1],
+                            "time": self.experiment.state["Time"],
                             "status": self.experiment.status,
                         }
 
@@ -731,6 +1103,45 @@ class RuncardError(BaseException):
     pass
 
 
+def dependency_waves(dependencies):
+    """
+    Sort named items into waves, such that each item comes after the items it
+    depends on; items within a wave do not depend on each other and can be
+    processed in parallel.
+
+    :param dependencies: (dict) dictionary of the form
+                         {..., name: [names of items it depends on], ...}
+    :return: (list) list of lists of names, one list per wave
+    """
+
+    remaining = {name: set(dependees) for name, dependees in dependencies.items()}
+
+    for name, dependees in remaining.items():
+        unknown = dependees.difference(remaining)
+        if unknown:
+            raise KeyError(f"{name} depends on unknown item(s) {', '.join(unknown)}")
+
+    waves = []
+
+    while remaining:
+        wave = [name for name, dependees in remaining.items() if not dependees]
+
+        if not wave:
+            raise ValueError(
+                "circular dependency among " + ", ".join(sorted(remaining))
+            )
+
+        for name in wave:
+            remaining.pop(name)
+
+        for dependees in remaining.values():
+            dependees.difference_update(wave)
+
+        waves.append(wave)
+
+    return waves
+
+
 def validate_runcard(runcard):
     logger.info("Validating runcard")
 
@@ -804,6 +1215,24 @@ def convert_runcard(runcard):
     # Validate runcard format and contents
     validate_runcard(runcard)
 
+    # Check that the dependencies of expressions exist and are not circular, before
+    # connecting to any instruments
+    dependencies = {}
+    for name, specs in runcard["Variables"].items():
+        dependencies[name] = list(specs.get("definitions", {}).values())
+
+        for variable in dependencies[name]:
+            if variable not in runcard["Variables"]:
+                raise KeyError(
+                    f"variable {variable} specified for expression {name} "
+                    f"is not in Variables!"
+                )
+
+    try:
+        dependency_waves(dependencies)
+    except ValueError as err:
+        raise ValueError(f"invalid expression definitions in Variables; {err}")
+
     converted_runcard = runcard.copy()
 
     # Load any custom components
@@ -883,22 +1312,10 @@ def convert_runcard(runcard):
                 offset=specs.get("offset", 0),
             )
         elif "expression" in specs:
-            expression = specs["expression"]
-            definitions = specs.get("definitions", {}).copy()
-
-            for variable in definitions.values():
-                if variable not in variables:
-                    raise KeyError(
-                        f"variable {variable} specified for expression {name} "
-                        f"is not in Variables!"
-                    )
-
-            definitions = {
-                symbol: variables[name] for symbol, name in definitions.items()
-            }
-
+            # definitions are filled in below, once all variables are initialized
             variables[name] = _variables.Expression(
-                expression=expression, definitions=definitions
+                expression=specs["expression"],
+                backend=specs.get("backend", "numpy"),
             )
         elif "server" in specs:
             server = specs["server"]
@@ -913,6 +1330,9 @@ def convert_runcard(runcard):
                 settable=settable,
                 multiplier=specs.get("multiplier", 1),
                 offset=specs.get("offset", 0),
+                subscribe=specs.get("subscribe", False),
+                deadband=specs.get("deadband", None),
+                interval=specs.get("interval", None),
             )
 
         elif "parameter" in specs:
@@ -923,6 +1343,14 @@ def convert_runcard(runcard):
             if specs["hidden"]:
                 variables[name]._hidden = True
 
+    # Expressions may depend on variables defined after them in the runcard
+    for name, specs in runcard["Variables"].items():
+        if "expression" in specs:
+            variables[name].definitions = {
+                symbol: variables[dependee]
+                for symbol, dependee in specs.get("definitions", {}).items()
+            }
+
     # Routines section
     available_routines = {**_routines.supported, **custom_routines}
 
@@ -988,24 +1416,42 @@ def convert_runcard(runcard):
             routines[name] = available_routines[_type](**specs)
 
     # Create the experiment
-    async_experiment = False
-    if "Settings" in runcard:
-        if runcard["Settings"].get("async", False):
-            async_experiment = True
+    settings = runcard.get("Settings", {})
+
+    async_experiment = settings.get("async", False)
+
+    # Limit the number of experiment states kept in memory, if specified
+    buffer_size = settings.get("buffer size", None)
+
+    data = ColumnarStore(
+        ["Time"] + list(variables.keys()),
+        max_rows=int(buffer_size) if buffer_size is not None else None,
+    )
+
+    # File format for saving experiment data
+    data_format = settings.get("format", "csv")
 
     if async_experiment:
 
-        logger.info("Initializing synchronous experiment")
+        logger.info("Initializing asynchronous experiment")
 
         converted_runcard["Experiment"] = AsyncExperiment(
-            variables, routines=routines, end=runcard["Settings"].get("end", None)
+            variables,
+            routines=routines,
+            end=settings.get("end", None),
+            data=data,
+            data_format=data_format,
         )
     else:
 
-        logger.info("Initializing asynchronous experiment")
+        logger.info("Initializing synchronous experiment")
 
         converted_runcard["Experiment"] = Experiment(
-            variables, routines=routines, end=runcard["Settings"].get("end", None)
+            variables,
+            routines=routines,
+            end=settings.get("end", None),
+            data=data,
+            data_format=data_format,
         )
 
     # Alarms section
@@ -0,0 +1,280 @@
+# Stateful signal processing operators for expressions
+import ast
+import time
+
+import numpy as np
+
+
+def _output(value):
+    """Return 0-d arrays as scalars"""
+    if np.ndim(value) == 0:
+        return np.asarray(value).item()
+    else:
+        return value
+
+
+class Filter:
+    """
+    Base class for stateful signal processing operators, which process one sample
+    of a signal (a number or an array of fixed shape) per call and keep whatever
+    history they need, so that each call takes the same time no matter how long
+    the signal has been processed.
+
+    In an `Expression`, each call of an operator, e.g. `ema(x, 10)`, gets its own
+    instance of the corresponding filter (see `bind_filters`), which is called
+    once per evaluation of the expression. Time-based operators measure time
+    between calls with the monotonic clock of the computer.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear the history of the filter"""
+        pass  # overwritten by child classes
+
+    def __call__(self, x, *args):
+        # overwritten by child classes
+        return x
+
+    @staticmethod
+    def _sample(x):
+        """Convert a sample to a floating point (or complex) array"""
+
+        x = np.asarray(x)
+
+        if x.dtype.kind != "c":
+            x = x.astype(np.float64, copy=False)
+
+        return x
+
+    def __repr__(self):
+        return "Filter"
+
+
+class EMA(Filter):
+    """
+    Exponential moving average, `ema(x, tau)`, with time constant `tau` in
+    seconds. Each new sample is weighted according to the time elapsed since the
+    previous sample, so the smoothing does not depend on the step interval.
+    """
+
+    def reset(self):
+        self._average = None
+        self._time = None
+
+    def __call__(self, x, tau):
+        x = self._sample(x)
+        now = time.monotonic()
+
+        if self._average is None or self._average.shape != x.shape:
+            self._average = x.astype(np.result_type(x, np.float64), copy=True)
+        else:
+            weight = 1.0 - np.exp(-(now - self._time) / tau)
+            self._average += weight * (x - self._average)
+
+        self._time = now
+
+        return _output(self._average.copy())
+
+    def __repr__(self):
+        return "EMA"
+
+
+class LowPass(EMA):
+    """
+    First order (RC) low-pass filter, `lowpass(x, fc)`, with cutoff frequency
+    `fc` in hertz; equivalent to an exponential moving average with a time
+    constant of 1 / (2 pi fc).
+    """
+
+    def __call__(self, x, fc):
+        return super().__call__(x, 1.0 / (2.0 * np.pi * fc))
+
+    def __repr__(self):
+        return "LowPass"
+
+
+class RollingMean(Filter):
+    """
+    Mean of the last `n` samples, `rolling_mean(x, n)`. The samples are kept in a
+    ring buffer, along with their running sum, which is recomputed from the
+    buffer every `n` samples to avoid accumulating rounding errors. Until `n`
+    samples have been received, the mean of the available samples is returned.
+    """
+
+    def reset(self):
+        self._buffer = None
+        self._sum = None
+        self._index = 0
+        self._count = 0
+
+    def __call__(self, x, n):
+        x = self._sample(x)
+        n = int(n)
+
+        if self._buffer is None or self._buffer.shape != (n,) + x.shape:
+            self.reset()
+            self._buffer = np.zeros((n,) + x.shape, dtype=x.dtype)
+            self._sum = np.zeros(x.shape, dtype=x.dtype)
+
+        if self._count == n:
+            self._sum -= self._buffer[self._index]
+        else:
+            self._count += 1
+
+        self._buffer[self._index] = x
+        self._sum += x
+
+        self._index = (self._index + 1) % n
+
+        if self._index == 0:
+            self._sum = self._buffer.sum(axis=0)
+
+        return _output(self._sum / self._count)
+
+    def __repr__(self):
+        return "RollingMean"
+
+
+class FIR(Filter):
+    """
+    Finite impulse response filter, `fir(x, coefficients)`, returning the sum of
+    the last `len(coefficients)` samples weighted by the coefficients, with the
+    first coefficient applying to the newest sample. Samples before the first
+    one are taken to be zero.
+    """
+
+    def reset(self):
+        self._buffer = None
+        self._index = 0
+
+    def __call__(self, x, coefficients):
+        x = self._sample(x)
+        coefficients = np.asarray(coefficients)
+        n = len(coefficients)
+
+        if self._buffer is None or self._buffer.shape != (n,) + x.shape:
+            self.reset()
+            self._buffer = np.zeros((n,) + x.shape, dtype=x.dtype)
+
+        # Buffer is filled backwards, so that the newest sample is at the index
+        self._index = (self._index - 1) % n
+        self._buffer[self._index] = x
+
+        weights = np.roll(coefficients, self._index)
+
+        return _output(np.tensordot(weights, self._buffer, axes=1))
+
+    def __repr__(self):
+        return "FIR"
+
+
+class Decimate(Filter):
+    """
+    Decimation by a factor `k`, `decimate(x, k)`, which returns the mean of each
+    block of `k` consecutive samples once the block is complete, and None
+    otherwise, so that only every `k`-th evaluation has a value.
+    """
+
+    def reset(self):
+        self._sum = None
+        self._count = 0
+
+    def __call__(self, x, k):
+        x = self._sample(x)
+
+        if self._sum is None or self._sum.shape != x.shape:
+            self.reset()
+            self._sum = np.zeros(x.shape, dtype=x.dtype)
+
+        self._sum += x
+        self._count += 1
+
+        if self._count < int(k):
+            return None
+
+        mean = self._sum / self._count
+
+        self._sum = np.zeros(x.shape, dtype=x.dtype)
+        self._count = 0
+
+        return _output(mean)
+
+    def __repr__(self):
+        return "Decimate"
+
+
+class Derivative(Filter):
+    """
+    Time derivative, `deriv(x)`, in units of x per second, computed from the
+    last two samples; None is returned for the first sample.
+    """
+
+    def reset(self):
+        self._previous = None
+        self._time = None
+
+    def __call__(self, x):
+        x = self._sample(x)
+        now = time.monotonic()
+
+        if self._previous is None or self._previous.shape != x.shape:
+            derivative = None
+        else:
+            derivative = _output((x - self._previous) / (now - self._time))
+
+        self._previous = x.copy()
+        self._time = now
+
+        return derivative
+
+    def __repr__(self):
+        return "Derivative"
+
+
+class _FilterBinder(ast.NodeTransformer):
+    """Replaces calls of filter functions with calls of filter instances"""
+
+    def __init__(self):
+        self.instances = {}
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+
+        if isinstance(node.func, ast.Name) and node.func.id in supported:
+            name = f"_filter_{len(self.instances)}"
+
+            self.instances[name] = supported[node.func.id]()
+
+            node.func = ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node.func)
+
+        return node
+
+
+def bind_filters(tree):
+    """
+    Give each call of a filter function (e.g. `ema(x, 10)`) in the parsed
+    expression its own filter instance, so that each call keeps its own history.
+
+    :param tree: (ast.Expression) parsed expression; modified in place
+    :return: (dict) filter instances, of the form {..., name: filter, ...}, to be
+             included in the namespace of the expression
+    """
+
+    binder = _FilterBinder()
+
+    binder.visit(tree)
+
+    return binder.instances
+
+
+# Names of the filter functions available in expressions
+supported = {
+    "ema": EMA,
+    "lowpass": LowPass,
+    "rolling_mean": RollingMean,
+    "fir": FIR,
+    "decimate": Decimate,
+    "deriv": Derivative,
+}
@@ -10,6 +10,7 @@ import pandas.errors
 
 from empyric.types import recast, Type, Float, String
 from empyric.routines import SocketServer, ModbusServer
+from empyric.storage import DataStore
 
 if sys.platform == "darwin":
     import matplotlib
@@ -33,8 +34,8 @@ class Plotter:
     Handler for plotting data based on the runcard plotting settings and data
     context.
 
-    Argument must be a pandas DataFrame with a 'time' column and datetime
-    indices.
+    Argument must be a pandas DataFrame or a DataStore (such as the `data` attribute
+    of an experiment) with a 'time' column and datetime indices.
 
     The optional settings keyword argument is given in the form,
     {...,
@@ -55,12 +56,17 @@ class Plotter:
         """
         Plot data based on settings
 
-        :param data: (pandas.Dataframe) data to be plotted.
+        :param data: (pandas.Dataframe/DataStore) data to be plotted.
         :param settings: (dict) dictionary of plot settings
         """
 
         self.data = data
-        self.full_data = self.numericize(data)
+
+        if isinstance(data, DataStore):
+            self._position = 0  # number of rows of the store processed so far
+            self.full_data = self.numericize(self._new_data())
+        else:
+            self.full_data = self.numericize(data)
 
         self.plotted = []
 
@@ -107,15 +113,19 @@ class Plotter:
         """Plot all plots"""
 
         # Update full data
-        new_indices = np.setdiff1d(self.data.index, self.full_data.index)
+        new_data = self._new_data()
 
-        if len(new_indices) > 0:
+        if len(new_data) > 0:
             if len(self.full_data) == 0:
-                self.full_data = self.numericize(self.data.loc[new_indices])
+                self.full_data = self.numericize(new_data)
             else:
-                self.full_data = pd.concat(
-                    [self.full_data, self.numericize(self.data.loc[new_indices])]
-                )
+                self.full_data = pd.concat([self.full_data, self.numericize(new_data)])
+
+            max_rows = getattr(self.data, "max_rows", None)
+
+            if max_rows is not None and len(self.full_data) > max_rows:
+                # keep no more rows than the data store in ring buffer mode
+                self.full_data = self.full_data.iloc[-max_rows:]
         elif len(self.full_data) == 0:
             return
 
@@ -135,6 +145,21 @@ class Plotter:
             else:
                 raise AttributeError(f"Plotting style '{style}' not recognized!")
 
+    def _new_data(self):
+        """Get the rows of data that have not yet been processed for plotting"""
+
+        if isinstance(self.data, DataStore):
+            # only fetch rows appended since the last call
+            stop = self.data.appended
+            new_data = self.data.since(self._position, stop=stop)
+            self._position = stop
+
+            return new_data
+        else:
+            new_indices = np.setdiff1d(self.data.index, self.full_data.index)
+
+            return self.data.loc[new_indices]
+
     def _plot_basic(self, name, averaged=False, errorbars=False):
         """Make a simple plot, (possibly multiple) y vs. x"""
 
@@ -409,8 +434,8 @@ class Plotter:
                             attempt += 1
                             plt.pause(1)
 
-                elif np.ndim(element) == 1:
-                    expanded_element = list(element)
+                elif np.ndim(element) == 1:  # lists, arrays or array references
+                    expanded_element = list(np.asarray(element))
 
                     expanded_element = [
                         np.float64(value) if value is not None else np.nan
@@ -737,6 +762,8 @@ class ExperimentGUI:
 
             if state[name] is None:
                 write_entry(entry, "None")
+            elif np.ndim(state[name]) > 0:  # array data kept in the state
+                write_entry(entry, f"Array{np.shape(state[name])}")
             elif state[name] == np.nan:
                 write_entry(entry, "NaN")
             else:
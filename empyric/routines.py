@@ -1,15 +1,15 @@
 import importlib
+import json
 import numbers
 import socket
+import struct
 import queue
 import threading
 import asyncio
 from typing import Union
 
-import select
 import functools
 
-import dill
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize as scipy_minimize
@@ -20,8 +20,7 @@ from bayes_opt import BayesianOptimization, UtilityFunction
 from empyric.tools import (
     convert_time,
     autobind_socket,
-    read_from_socket,
-    write_to_socket,
+    pack_values,
     get_ip_address,
     logger,
 )
@@ -37,6 +36,7 @@ from empyric.types import (
     String,
 )
 from empyric.types import supported as supported_types
+from empyric.storage import ArrayRef
 
 
 class Routine:
@@ -868,6 +868,131 @@ class Minimization(Optimization):
     _sign = -1.0
 
 
+@functools.lru_cache(maxsize=16)
+def _read_csv_array(path, name):
+    """Read an array stored in a CSV file, which is only read once"""
+
+    df = pd.read_csv(path)
+
+    if name in df.columns:
+        # 1D array
+        array = df[name].values
+    else:
+        # 2D array
+        array = df.values
+
+    array.flags.writeable = False  # shared between requests
+
+    return array
+
+
+class _Subscription:
+    """
+    Subscription of a client of a socket server to the values of variables, which
+    the server pushes to the client as they change.
+
+    A value is only pushed if it changed by more than its deadband since it was
+    last pushed (for numbers), or if it changed at all (for other values). Pushes
+    of a value are at least its interval apart; changes within an interval are
+    pushed at its end.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+
+        self.aliases = set()  # subscribed variables; None means all variables
+
+        self.deadband = 0  # default deadband
+        self.deadbands = {}  # of the form {..., alias: deadband, ...}
+
+        self.interval = 0.0  # default minimum time between pushes, in seconds
+        self.intervals = {}  # of the form {..., alias: interval, ...}
+
+        self.sent = {}  # values last pushed, of the form {..., alias: value, ...}
+        self.pushed_at = {}  # event loop times of the last pushes of values
+        self.stale = set()  # variables that may have changed since last checked
+        self.pending = None  # task of a delayed push
+
+    def add(self, arguments):
+        """
+        Add variables to the subscription, or change its deadbands or interval
+
+        :param arguments: (dict) may contain `aliases` (list of aliases, or None
+                          for all variables), `deadband` and `interval` (number,
+                          or dict of the form {..., alias: number, ...})
+        :return: (list/None) aliases added to the subscription; None for all
+        """
+
+        aliases = arguments.get("aliases", None)
+
+        if aliases is None:
+            self.aliases = None
+        elif self.aliases is not None:
+            self.aliases.update(aliases)
+
+        deadband = arguments.get("deadband", None)
+
+        if isinstance(deadband, dict):
+            self.deadbands.update(
+                {alias: float(value) for alias, value in deadband.items()}
+            )
+        elif deadband is not None:
+            self.deadband = float(deadband)
+
+        interval = arguments.get("interval", None)
+
+        if isinstance(interval, dict):
+            self.intervals.update(
+                {alias: float(value) for alias, value in interval.items()}
+            )
+        elif interval is not None:
+            self.interval = float(interval)
+
+        return aliases
+
+    def next_push(self, alias):
+        """Event loop time after which the value of a variable may be pushed"""
+
+        interval = self.intervals.get(alias, self.interval)
+
+        return self.pushed_at.get(alias, -np.inf) + interval
+
+    def due(self, time):
+        """Variables that may have changed and may be pushed at the given time"""
+
+        return {alias for alias in self.stale if self.next_push(alias) <= time}
+
+    def changes(self, values):
+        """Values that changed since they were last pushed, beyond any deadband"""
+
+        return {
+            alias: value
+            for alias, value in values.items()
+            if alias not in self.sent or self._changed(alias, value)
+        }
+
+    def _changed(self, alias, value):
+        last = self.sent[alias]
+
+        if _is_number(value) and _is_number(last):
+            if np.isnan(value) and np.isnan(last):
+                return False
+
+            return not abs(value - last) <= self.deadbands.get(alias, self.deadband)
+
+        try:
+            return not np.array_equal(value, last)
+        except (TypeError, ValueError):
+            return True
+
+    def __repr__(self):
+        return "_Subscription"
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
 class SocketServer(Routine):
     """
     Server routine for transmitting data to other experiments, local or remote,
@@ -876,10 +1001,35 @@ class SocketServer(Routine):
     Any knobs given in the `knobs` argument can be read and set by clients.
     Clients can also read the values of any variables of the controlling
     experiment, via the `state` argument of the `update` method.
+
+    Clients may send several requests at once, which are answered in order. The
+    `@info` request gets the settability and type of all variables in a single
+    JSON-encoded response. Array values, including those of the state held in
+    array stores, are sent in binary form (see `empyric.tools.pack_values`), as
+    their data type, shape and raw data.
+
+    Clients can subscribe to variables with the `@subscribe` request, after which
+    the server pushes their values to the client whenever they change upon an
+    update, so that the client need not poll them. The subscription may set a
+    deadband for numeric values, below which changes are not pushed, and a
+    minimum interval between pushes of each value, either of which may be given
+    per variable. Subscriptions are ended by disconnecting.
+
+    The server runs an asyncio event loop in a separate thread, in which each
+    client is served by its own coroutine as soon as its requests arrive. Getting
+    and setting the values of knobs, which may communicate with instruments, is
+    done in worker threads, so that a slow instrument does not hold up the other
+    clients.
     """
 
     assert_control = False
 
+    # Maximum size of a request, which may contain array values
+    request_limit = 2**24
+
+    # Size of unsent data beyond which pushes to a subscriber are deferred
+    push_limit = 2**24
+
     def __init__(self, knobs: dict = None, **kwargs):
         if knobs is None:
             knobs = {}
@@ -890,213 +1040,613 @@ class SocketServer(Routine):
 
         self.ip_address, self.port = autobind_socket(self.socket)
 
-        self.socket.listen(5)
-        self.socket.settimeout(1)
+        # Listen right away, so that clients can connect before the server starts
+        self.socket.listen(socket.SOMAXCONN)
+
+        self.clients = {}  # of the form {..., address: stream writer, ...}
+        self._client_tasks = set()
 
-        self.clients_queue = queue.Queue(1)
-        self.clients_queue.put({})
+        self.subscriptions = {}  # of the form {..., address: subscription, ...}
 
         self.running = True
 
         self.state = {}
 
+        self.event_loop = None
+        self._stopped = None  # asyncio event, set upon termination
+        self._started = threading.Event()
+
         self.server_thread = threading.Thread(
             target=asyncio.run, args=(self._run_async_server(),)
         )
 
         self.server_thread.start()
 
+        self._started.wait()
+
     def terminate(self):
-        # Kill client handling threads
+        # Stop the server, which disconnects all clients
         self.running = False
+
+        try:
+            self.event_loop.call_soon_threadsafe(self._stopped.set)
+        except RuntimeError:  # event loop is already closed
+            pass
+
         self.server_thread.join()
 
     async def _run_async_server(self):
-        asyncio.create_task(self._accept_connections())
-        asyncio.create_task(self._process_requests())
+        self.event_loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._push_lock = asyncio.Lock()  # keeps pushes of values in order
+
+        try:
+            server = await asyncio.start_server(
+                self._serve_client,
+                sock=self.socket,
+                backlog=socket.SOMAXCONN,
+                limit=self.request_limit,
+            )
+        finally:
+            self._started.set()
+
+        async with server:
+            await self._stopped.wait()
+
+            for writer in list(self.clients.values()):
+                writer.close()
+
+            # Closing the streams ends the client tasks
+            if self._client_tasks:
+                await asyncio.wait(self._client_tasks, timeout=1)
+
+    async def _serve_client(self, reader, writer):
+        """Answer the requests of a client, in order, until it disconnects"""
 
-        async def server_forever():
+        address = writer.get_extra_info("peername")
+
+        self.clients[address] = writer
+        self._client_tasks.add(asyncio.current_task())
+
+        print(f"Client at {address} has connected")
+
+        try:
             while self.running:
-                await asyncio.sleep(0.1)
+                try:
+                    request = await reader.readuntil(b"\r")
+                except asyncio.IncompleteReadError:  # client has disconnected
+                    break
 
-        await server_forever()
+                request = request.decode().strip()
 
-    async def _accept_connections(self):
-        if self.running:
-            try:
-                (client, address) = self.socket.accept()
+                if request.startswith("@subscribe"):
+                    outgoing_message = await self._subscribe(address, writer, request)
+                else:
+                    # knob values are got and set outside of the event loop
+                    outgoing_message = await asyncio.to_thread(self._respond, request)
+
+                # Send outgoing message
+                if outgoing_message is not None:
+                    if isinstance(outgoing_message, str):
+                        outgoing_message = outgoing_message.encode()
+
+                    writer.write(outgoing_message + b"\r")
+
+                    await writer.drain()
+
+        except (ConnectionError, asyncio.LimitOverrunError) as error:
+            print(f"Connection issue with client at {address}: {error}")
 
-                client.settimeout(1)
+        finally:
+            del self.clients[address]
+            self._client_tasks.discard(asyncio.current_task())
+
+            subscription = self.subscriptions.pop(address, None)
+
+            if subscription is not None and subscription.pending is not None:
+                subscription.pending.cancel()
+
+            writer.close()
+
+    def _respond(self, request):
+        """Get the message to send to a client in response to a request"""
+
+        outgoing_message = None
+
+        if request == "@info":
+            # Settability and type of all variables, in one message
+            info = {
+                alias: [
+                    self._settability(alias),
+                    getattr(self._type_of(alias), "__name__", None),
+                ]
+                for alias in {**self.knobs, **self.state}
+            }
+
+            outgoing_message = "@info " + json.dumps(info)
+
+        elif request.startswith("@"):
+            outgoing_message = self._respond_bulk(request)
 
-                clients = self.clients_queue.get()
+        elif request:
+            alias = " ".join(request.split(" ")[:-1])
+            value = request.split(" ")[-1]
 
-                clients[address] = client
+            if alias not in self.knobs and alias not in self.state:
+                outgoing_message = f"Error: invalid alias"
 
-                self.clients_queue.put(clients)
+            elif value == "settable?":
+                outgoing_message = f"{alias} {self._settability(alias)}"
 
-                print(f"Client at {address} has connected")
+            elif value == "type?":
+                outgoing_message = f"{alias} {self._type_of(alias)}"
 
-            except socket.timeout:
-                pass
+            elif value == "?":  # Query of value
+                _value = self._value_of(alias)
+
+                if isinstance(_value, Array):
+                    # send arrays as their raw data in binary form
+                    outgoing_message = pack_values({alias: _value})
+                else:
+                    outgoing_message = f"{alias} {_value}"
+
+            else:  # Setting a value
+                knob = self._free_knob(alias)
+
+                if knob is not None:
+                    knob.value = recast(value, to=knob._type)
+
+                    outgoing_message = f"{alias} {knob.value}"
+
+                else:
+                    outgoing_message = f"Error: cannot set {alias}"
+
+        return outgoing_message
+
+    def _respond_bulk(self, request):
+        """
+        Get the response to a request concerning several variables at once, which
+        is the values of the variables in compact binary form (see `pack_values`):
 
-            await asyncio.sleep(0.001)
+        - `@get [alias, ...]` gets the values of the listed variables
+        - `@set {alias: value, ...}` sets the values of the listed knobs, and gets
+          the new values of those that could be set
+        - `@snapshot` gets the values of all variables
+        """
+
+        command, _, arguments = request.partition(" ")
+
+        try:
+            if command == "@get":
+                values = self._values_of(json.loads(arguments))
+
+            elif command == "@set":
+                values = {}
+
+                for alias, value in json.loads(arguments).items():
+                    knob = self._free_knob(alias)
+
+                    if knob is not None:
+                        knob.value = recast(value, to=knob._type)
+
+                        values[alias] = knob.value
+
+            elif command == "@snapshot":
+                values = self._values_of({**self.knobs, **self.state})
+
+            else:
+                return f"Error: invalid request {command}"
+
+        except (ValueError, TypeError, AttributeError) as error:
+            return f"Error: invalid arguments of {command}: {error}"
+
+        return pack_values(values)
+
+    async def _subscribe(self, address, writer, request):
+        """
+        Subscribe a client to the values of variables, with a request of the form
+        `@subscribe {"aliases": [alias, ...], "deadband": ..., "interval": ...}`,
+        in which all items are optional (see `_Subscription.add`); no aliases
+        means all variables. The response holds the current values of the
+        variables added to the subscription, in compact binary form.
+        """
+
+        arguments = request[len("@subscribe") :].strip()
+
+        try:
+            arguments = json.loads(arguments) if arguments else {}
 
-            asyncio.create_task(self._accept_connections())
+            aliases = arguments.get("aliases", None)
 
+            if aliases is None:
+                aliases = {**self.knobs, **self.state}
+
+            # get the values before changing the subscription, so that no values
+            # of the added variables are pushed ahead of the response
+            values = await asyncio.to_thread(self._values_of, aliases)
+
+            subscription = self.subscriptions.get(address, None)
+
+            if subscription is None:
+                subscription = _Subscription(writer)
+
+            subscription.add(arguments)
+
+        except (ValueError, TypeError, AttributeError) as error:
+            return f"Error: invalid arguments of @subscribe: {error}"
+
+        self.subscriptions[address] = subscription
+
+        subscription.sent.update(values)
+
+        return pack_values(values)
+
+    async def _publish(self):
+        """Push the changed values of subscribed variables to all subscribers"""
+
+        values = {}  # values of variables, shared between subscriptions
+
+        for subscription in list(self.subscriptions.values()):
+            await self._push(subscription, values)
+
+    async def _push_later(self, subscription, wait):
+        """Push the latest values to a subscriber after some time"""
+
+        await asyncio.sleep(wait)
+
+        subscription.pending = None
+
+        await self._push(subscription, updated=False)
+
+    async def _push(self, subscription, values=None, updated=True):
+        """
+        Push the changed values of subscribed variables to a subscriber. Upon an
+        update, all subscribed variables are checked for changes, except those
+        pushed less than their interval ago, which are checked at the end of it.
+        """
+
+        loop = self.event_loop
+
+        if subscription.aliases is None:
+            aliases = {**self.knobs, **self.state}
         else:
-            # Close sockets
-            try:
-                self.socket.shutdown(socket.SHUT_RDWR)
-            except OSError:  # socket was not connected
-                pass
-            self.socket.close()
+            aliases = subscription.aliases
 
-            clients = self.clients_queue.get()
+        if updated:
+            subscription.stale.update(aliases)
 
-            for address, client in clients.items():
-                try:
-                    client.shutdown(socket.SHUT_RDWR)
-                    client.close()
-                except ConnectionError:
-                    # client is already disconnected
-                    pass
-                except OSError:
-                    # client is already disconnected
-                    pass
-
-            # Return empty clients dict to queue so process_requests can exit
-            self.clients_queue.put({})
-
-    async def _process_requests(self):
-        if self.running:
-            clients = self.clients_queue.get()
+        transport = subscription.writer.transport
 
-            # Purge disconnected clients
-            clients = {
-                address: client
-                for address, client in clients.items()
-                if client is not None
-            }
+        if transport.get_write_buffer_size() > self.push_limit:
+            # the client is not keeping up; changes are pushed with the next update
+            return
 
-            for address, client in clients.items():
-                outgoing_message = None
+        if values is None:
+            values = {}
 
-                try:
-                    request = read_from_socket(client, chunk_size=1)
-                except ConnectionError:
-                    print(f"Connection issue with client at {address}")
-                    client.shutdown(socket.SHUT_RDWR)
-                    client.close()
-                    clients[address] = None
-                    continue
+        async with self._push_lock:
+            due = subscription.due(loop.time())
 
-                if request:
-                    alias = " ".join(request.split(" ")[:-1])
-                    value = request.split(" ")[-1]
+            subscription.stale -= due
 
-                    if alias not in self.knobs and alias not in self.state:
-                        outgoing_message = f"Error: invalid alias"
+            missing = [alias for alias in due if alias not in values]
 
-                    elif value == "settable?":
-                        settable = (alias in self.knobs) and self.knobs[alias].settable
+            if missing:
+                # knob values are got outside of the event loop
+                values.update(await asyncio.to_thread(self._values_of, missing))
 
-                        if settable:
-                            outgoing_message = f"{alias} settable"
-                        elif alias in self.state:
-                            outgoing_message = f"{alias} read-only"
-                        else:
-                            outgoing_message = f"{alias} undefined"
+            if transport.is_closing():
+                return
 
-                    elif value == "type?":
-                        if alias in self.knobs:
-                            _type = self.knobs[alias]._type
-                        elif alias in self.state:
-                            _type = None
-                            value = self.state[alias]
+            changes = subscription.changes({alias: values[alias] for alias in due})
 
-                            if isinstance(value, String) and ".csv" in value:
-                                # value is an Array stored in a CSV file
-                                _type = Array
-                            else:
-                                for supported_type in supported_types.values():
-                                    if isinstance(value, supported_type):
-                                        _type = supported_type
+            if changes:
+                subscription.writer.write(pack_values(changes) + b"\r")
 
-                        else:
-                            _type = None
+                subscription.sent.update(changes)
 
-                        outgoing_message = f"{alias} {_type}"
+                now = loop.time()
+                subscription.pushed_at.update({alias: now for alias in changes})
 
-                    elif value == "?":  # Query of value
-                        if alias in self.knobs:
-                            _value = self.knobs[alias].value
-                        elif alias in self.state:
-                            _value = self.state[alias]
+        # check the other variables once their intervals have passed
+        if subscription.pending is not None:
+            subscription.pending.cancel()
+            subscription.pending = None
 
-                            if isinstance(_value, String) and ".csv" in _value:
-                                # value is an array, list or tuple stored in CSV file
-                                df = pd.read_csv(_value)
+        if subscription.stale:
+            wait = min(map(subscription.next_push, subscription.stale)) - loop.time()
 
-                                if alias in df.columns:
-                                    # 1D array
-                                    _value = df[alias].values
-                                else:
-                                    # 2D array
-                                    _value = df.values
+            subscription.pending = loop.create_task(
+                self._push_later(subscription, max(wait, 0.0))
+            )
 
-                        else:
-                            _value = None
+    def _values_of(self, aliases):
+        """Values of variables, of the form {..., alias: value, ...}"""
 
-                        if isinstance(_value, Array):
-                            # pickle arrays and send as bytes
-                            outgoing_message = f"{alias} dlpkl".encode()
-                            outgoing_message += dill.dumps(
-                                _value, protocol=dill.HIGHEST_PROTOCOL
-                            )
-                        else:
-                            outgoing_message = f"{alias} {_value}"
+        return {alias: self._value_of(alias) for alias in aliases}
 
-                    else:  # Setting a value
-                        knob_exists = alias in self.knobs
+    def _value_of(self, alias):
+        """Value of a variable, as reported to clients"""
 
-                        is_free = not getattr(self.knobs[alias], "_controller", None)
+        if alias in self.knobs:
+            return self.knobs[alias].value
+        elif alias in self.state:
+            _value = self.state[alias]
 
-                        if knob_exists and is_free:
-                            knob = self.knobs[alias]
+            if isinstance(_value, ArrayRef):
+                # array held in an array store, read without copying
+                _value = _value.value
 
-                            knob.value = recast(value, to=knob._type)
+            elif isinstance(_value, String) and ".csv" in _value:
+                # value is an array, list or tuple stored in CSV file
+                _value = _read_csv_array(_value, alias)
 
-                            outgoing_message = f"{alias} {knob.value}"
+            return _value
 
-                        else:
-                            outgoing_message = f"Error: cannot set {alias}"
+        else:
+            return None
 
-                # Send outgoing message
-                if outgoing_message is not None:
-                    write_to_socket(client, outgoing_message)
-                    message_sent = True
+    def _free_knob(self, alias):
+        """Knob with the given alias, if it exists and is free to be set"""
 
-                # Remove clients with problematic connections
-                exceptional = client in select.select([], [], [client], 0)[2]
+        knob = self.knobs.get(alias, None)
 
-                if exceptional:
-                    print(f"Client at {address} has a connection issue")
-                    clients[address] = None
+        if knob is not None and not getattr(knob, "_controller", None):
+            return knob
 
-            self.clients_queue.put(clients)
-            await asyncio.sleep(0.001)
+    def _settability(self, alias):
+        """Settability of a variable, as reported to clients"""
 
-            asyncio.create_task(self._process_requests())
+        settable = (alias in self.knobs) and self.knobs[alias].settable
+
+        if settable:
+            return "settable"
+        elif alias in self.state:
+            return "read-only"
+        else:
+            return "undefined"
+
+    def _type_of(self, alias):
+        """Data type of a variable, as reported to clients"""
+
+        if alias in self.knobs:
+            return self.knobs[alias]._type
+        elif alias in self.state:
+            _type = None
+            value = self.state[alias]
+
+            if isinstance(value, ArrayRef) or (
+                isinstance(value, String) and ".csv" in value
+            ):
+                # value is an Array held in an array store or stored in a CSV file
+                _type = Array
+            else:
+                for supported_type in supported_types.values():
+                    if isinstance(value, supported_type):
+                        _type = supported_type
+
+            return _type
+
+        else:
+            return None
 
     @Routine.enabler
     def update(self, state):
         self.state = state
 
+        if self.subscriptions and self.running:
+            # push changed values to subscribers
+            publish = self._publish()
+
+            try:
+                asyncio.run_coroutine_threadsafe(publish, self.event_loop)
+            except RuntimeError:  # event loop is already closed
+                publish.close()
+
     def __del__(self):
         if self.running:
             self.terminate()
 
 
+# Data type codes stored in the last of the registers of each variable
+_modbus_type_codes = {
+    Boolean: 0,
+    Toggle: 1,
+    Integer: 2,
+    Float: 3,
+    Array: 4,
+    String: 5,
+}
+
+# Formats and conversions of the values of each data type in 64 bits
+_modbus_value_formats = {
+    Boolean: ("Q", int),
+    Toggle: ("Q", int),
+    Integer: ("q", int),
+    Float: ("d", float),
+}
+
+
+# Decoders of the values written by clients to the registers of each data type,
+# from the bytes of the registers and the offset of the value
+_modbus_decoders = {
+    Boolean: lambda data, offset: struct.unpack_from(">Q", data, offset)[0],
+    Toggle: lambda data, offset: (
+        ON if struct.unpack_from(">Q", data, offset)[0] == 1 else OFF
+    ),
+    Integer: lambda data, offset: struct.unpack_from(">q", data, offset)[0],
+    Float: lambda data, offset: struct.unpack_from(">d", data, offset)[0],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _modbus_type(cls):
+    """Data type of values of a class, as reported by a Modbus server"""
+
+    _type = None
+
+    for supported_type in supported_types.values():
+        if issubclass(cls, supported_type):
+            _type = supported_type
+
+    return _type
+
+
+@functools.lru_cache(maxsize=None)
+def _modbus_encoding(_type, encodable=True):
+    """
+    Format, conversion and type code of the registers of a variable; values that
+    cannot be encoded are stored as NaN
+    """
+
+    value_format, convert = _modbus_value_formats.get(_type, ("d", None))
+
+    if not encodable:
+        value_format, convert = "d", None
+
+    return value_format, convert, _modbus_type_codes.get(_type, -1)
+
+
+def _modbus_registers(_type, value):
+    """Registers holding a single value, followed by its data type code"""
+
+    value_format, convert, code = _modbus_encoding(_type, value is not None)
+
+    try:
+        data = struct.pack(
+            ">" + value_format + "h", convert(value) if convert else float("nan"), code
+        )
+    except (ValueError, TypeError, OverflowError, struct.error):
+        data = struct.pack(">dh", float("nan"), code)
+
+    return np.frombuffer(data, dtype=">u2").tolist()
+
+
+class _RegisterBlock:
+    """
+    Block of Modbus registers holding the values of a set of variables, each of
+    which is stored in 5 registers starting from its address: 4 registers for its
+    64-bit value and 1 register for its data type code.
+
+    The layout of the block is compiled into a single struct, so that all values
+    are encoded together with one call to `struct.pack`; it is only compiled again
+    if the data types of the values change. Registers between those of the
+    variables are set to zero.
+
+    :param addresses: (list) starting addresses of the registers of the variables
+    :param names: (list) names of the variables, in the same order; used in error
+                  messages
+    """
+
+    def __init__(self, addresses, names=None):
+        addresses = [int(address) for address in addresses]
+
+        if names is None:
+            names = [f"variable {i}" for i in range(len(addresses))]
+
+        # Order of the variables in the block
+        self.order = sorted(range(len(addresses)), key=lambda i: addresses[i])
+
+        for i, j in zip(self.order[:-1], self.order[1:]):
+            if addresses[j] - addresses[i] < 5:
+                raise ValueError(
+                    f"registers of {names[i]} at address {addresses[i]} and "
+                    f"{names[j]} at address {addresses[j]} overlap"
+                )
+
+        if self.order == list(range(len(addresses))):
+            self.order = None  # variables are already in order
+        else:
+            addresses = [addresses[i] for i in self.order]
+
+        self.start = addresses[0] if addresses else 0
+
+        # Number of unused registers before those of each variable
+        self.gaps = [0] + [
+            next_address - address - 5
+            for address, next_address in zip(addresses[:-1], addresses[1:])
+        ]
+
+        self._encodings = None
+        self._struct = None
+        self._codes = None
+
+    def encode(self, types, values):
+        """
+        Encode values into the registers of the block
+
+        :param types: (list) data types of the variables
+        :param values: (list) values of the variables, in the same order
+        :return: (list) values of the registers, starting from `start`
+        """
+
+        if self.order is not None:
+            types = [types[i] for i in self.order]
+            values = [values[i] for i in self.order]
+
+        encodings = [
+            _modbus_encoding(_type, value is not None)
+            for _type, value in zip(types, values)
+        ]
+
+        try:
+            args = self._pack_args(encodings, values)
+
+            data = self._struct.pack(*args)
+
+        except (ValueError, TypeError, OverflowError, struct.error):
+            # Some values do not fit their data types, and are stored as NaN
+            encodings = [
+                encoding
+                if self._fits(encoding, value)
+                else _modbus_encoding(_type, False)
+                for encoding, _type, value in zip(encodings, types, values)
+            ]
+
+            args = self._pack_args(encodings, values)
+
+            data = self._struct.pack(*args)
+
+        return np.frombuffer(data, dtype=">u2").tolist()
+
+    def _pack_args(self, encodings, values):
+        """Arguments of `struct.pack` for the given encodings and values"""
+
+        if encodings != self._encodings:
+            # Compile the layout of the block for these data types
+            layout = ">" + "".join(
+                f"{2 * gap}x{value_format}h" if gap else f"{value_format}h"
+                for gap, (value_format, _, _) in zip(self.gaps, encodings)
+            )
+
+            self._struct = struct.Struct(layout)
+            self._encodings = encodings
+            self._codes = [code for _, _, code in encodings]
+
+        args = [None] * (2 * len(values))
+
+        args[0::2] = [
+            float("nan") if convert is None else convert(value)
+            for (_, convert, _), value in zip(encodings, values)
+        ]
+        args[1::2] = self._codes
+
+        return args
+
+    @staticmethod
+    def _fits(encoding, value):
+        value_format, convert, _ = encoding
+
+        try:
+            struct.pack(">" + value_format, convert(value) if convert else 0.0)
+            return True
+        except (ValueError, TypeError, OverflowError, struct.error):
+            return False
+
+    def __repr__(self):
+        return "_RegisterBlock"
+
+
 class ModbusServer(Routine):
     """
     Server routine for transmitting data to other experiments, local or remote,
@@ -1124,6 +1674,12 @@ class ModbusServer(Routine):
     64-bit value and 1 register for metadata (i.e. data type). Note that the `state` of
     an instance of `Experiment` has "Time" as its first entry (i.e. input register 0 is
     the time value).
+
+    The registers are updated whenever the `update` method is called with a new state,
+    with the values of all variables encoded together into a single block of registers
+    for each set; holding registers are updated even while the routine is disabled,
+    while input registers keep the last state given to the enabled routine. Holding
+    registers are also updated when a client sets a knob.
     """
 
     assert_control = False
@@ -1158,6 +1714,35 @@ class ModbusServer(Routine):
 
         self.state = None  # set by update method
 
+        if len(self.knob_addresses) != len(knobs):
+            raise ValueError("the number of knob addresses must match that of knobs")
+
+        if meters is not None and len(self.meter_addresses) != len(meters):
+            raise ValueError(
+                "the number of meter addresses must match that of meters"
+            )
+
+        # Layouts of the holding and input registers
+        self._knob_registers = _RegisterBlock(self.knob_addresses, list(self.knobs))
+
+        # Knobs and their decoders, of the form
+        # {..., address: (name, variable, decoder), ...}
+        self._knob_map = {
+            int(address): (name, variable, _modbus_decoders.get(variable._type))
+            for address, (name, variable) in zip(
+                self.knob_addresses, self.knobs.items()
+            )
+        }
+
+        if meters is not None:
+            self._meter_registers = _RegisterBlock(self.meter_addresses, list(meters))
+        else:
+            self._meter_registers = None  # set upon obtaining a state
+
+        self._meter_names = None  # names of the meters in the input registers
+
+        self._registers_lock = threading.Lock()
+
         # Check for PyModbus installation
         try:
             importlib.import_module("pymodbus")
@@ -1169,10 +1754,6 @@ class ModbusServer(Routine):
         # Import tools from pymodbus
         datastore = importlib.import_module(".datastore", package="pymodbus")
         device = importlib.import_module(".device", package="pymodbus")
-        payload = importlib.import_module(".payload", package="pymodbus")
-
-        self._payload_builder = payload.BinaryPayloadBuilder
-        self._payload_decoder = payload.BinaryPayloadDecoder
 
         DataBlock = datastore.ModbusSequentialDataBlock
 
@@ -1197,6 +1778,9 @@ class ModbusServer(Routine):
 
         # Run server
         self.server = None  # assigned in _run_async_server
+        self.event_loop = None  # assigned in _run_async_server
+        self._started = threading.Event()
+        self._start_error = None  # assigned in _run_async_server, if it fails
         self.ip_address = kwargs.get("address", get_ip_address())
         self.port = kwargs.get("port", 502)
         # TODO: warn when port is off-limits due to permissions
@@ -1206,11 +1790,21 @@ class ModbusServer(Routine):
 
         self.server_thread.start()
 
+        self._started.wait()
+
+        if self._start_error is not None:
+            self.server_thread.join()
+
+            raise self._start_error
+
     def setValues_decorator(self, setValues_method):
         """
         This decorator adds a `from_vars` kwarg to indicate that the intention
         is to update the registers from variable values. Otherwise, the wrapped
         method sets the corresponding variables instead.
+
+        A single request may write the registers of several knobs, in which case
+        all of them are set before the holding registers are updated.
         """
 
         @functools.wraps(setValues_method)
@@ -1227,188 +1821,170 @@ class ModbusServer(Routine):
                         f"an attempt was made to write to a readonly "
                         f"register at address {address}"
                     )
-                else:
-                    if self.knobs:
-
-                        # Identify knob corresponding to given register address
-                        try:
-                            index = [
-                                i for i, addr in enumerate(self.knob_addresses)
-                                if addr == address
-                            ][0]
-                        except IndexError:
-                            logger.warning(
-                                "an attempt was made to set a knob "
-                                "through an unassigned register"
-                            )
-                            return
-
-                        variable = list(self.knobs.values())[index]
-
-                        controller = getattr(variable, "_controller", None)
-
-                        if controller:
-                            name = list(self.knobs.keys())[index]
-
-                            logger.warning(
-                                f"an attempt was made to set {name}, "
-                                "but it is currently controlled by "
-                                f"{controller}."
-                            )
-                            return
-
-                        decoder = self._payload_decoder.fromRegisters(
-                            values, byteorder=">"
-                        )
-
-                        if issubclass(variable._type, Boolean):
-                            variable.value = decoder.decode_64bit_uint()
-                        elif issubclass(variable._type, Toggle):
-                            int_value = decoder.decode_64bit_uint()
-                            variable.value = ON if int_value == 1 else OFF
-                        elif issubclass(variable._type, Integer):
-                            variable.value = decoder.decode_64bit_int()
-                        elif issubclass(variable._type, Float):
-                            variable.value = decoder.decode_64bit_float()
+                elif self.knobs:
+                    self._set_knobs(address, values)
 
         return wrapped_method
 
-    async def _update_registers(self):
-
-        try:
+    def _set_knobs(self, address, values):
+        """Set the knobs whose registers are written by a client"""
 
-            if self.state is None:  # do nothing if state is undefined
-                await asyncio.sleep(0.1)
-                return
+        data = struct.pack(f">{len(values)}H", *values)
 
-            # Store readwrite variable values in holding registers (fc = 3)
-            for i, (name, variable) in enumerate(self.knobs.items()):
-                value = variable._value
-
-                builder = self._payload_builder(byteorder=">")
-
-                # encode the value into the 4 registers
-                if value is None or variable._type is None:
-                    builder.add_64bit_float(float("nan"))
-                elif issubclass(variable._type, Boolean):
-                    builder.add_64bit_uint(value)
-                elif issubclass(variable._type, Toggle):
-                    builder.add_64bit_uint(1 if value == ON else 0)
-                elif issubclass(variable._type, Integer):
-                    builder.add_64bit_int(value)
-                elif issubclass(variable._type, Float):
-                    builder.add_64bit_float(value)
-                else:
-                    raise ValueError(
-                        f"unable to update modbus server registers from value "
-                        f"{value} of variable {name} with data type "
-                        f"{variable._type}"
-                    )
+        knobs_set = []  # of the form [..., (address, variable), ...]
+        found = False
 
-                # encode the meta data
-                meta_reg_val = {
-                    Boolean: 0,
-                    Toggle: 1,
-                    Integer: 2,
-                    Float: 3,
-                    Array: 4,
-                    String: 5,
-                }.get(variable._type, -1)
+        # Find the knobs whose value registers are all written
+        position = 0
 
-                builder.add_16bit_int(meta_reg_val)
+        while position + 4 <= len(values):
+            knob = self._knob_map.get(address + position, None)
 
-                # from_vars kwarg added with setValues_decorator above
-                self.slave.setValues(
-                    3, self.knob_addresses[i],
-                    builder.to_registers(), from_vars=True
-                )
+            if knob is None:
+                position += 1
+                continue
 
-            # Store readonly variable values in input registers (fc = 4)
+            found = True
 
-            if self.meters is not None:
+            name, variable, decoder = knob
 
-                try:
-                    selection = {name: self.state[name] for name in self.meters}
-                except KeyError as err:
-                    raise ValueError(
-                        f"meter {err.args[0]} not found in experiment variables"
-                    )
-            else:
-                selection = self.state
+            offset = position
+            position += 5
 
-            if len(self.meter_addresses) == 0:
-                # assume consecutive sets of registers, if not specified
-                self.meter_addresses = [5 * i for i in range(len(selection))]
+            controller = getattr(variable, "_controller", None)
 
-            for i, (name, value) in enumerate(selection.items()):
+            if controller:
+                logger.warning(
+                    f"an attempt was made to set {name}, "
+                    "but it is currently controlled by "
+                    f"{controller}."
+                )
+                continue
 
-                _type = None
-                for supported_type in supported_types.values():
-                    if isinstance(value, supported_type):
-                        _type = supported_type
+            if decoder is None:  # data type was unknown until now
+                decoder = _modbus_decoders.get(variable._type, None)
 
-                builder = self._payload_builder(byteorder=">")
-
-                # encode the value into the 4 registers
-                if value is None or _type is None:
-                    builder.add_64bit_float(float("nan"))
-                elif _type == Boolean:
-                    builder.add_64bit_uint(value)
-                elif _type == Toggle:
-                    builder.add_64bit_uint(int(value in Toggle.on_values))
-                elif _type == Integer:
-                    builder.add_64bit_int(value)
-                elif _type == Float:
-                    builder.add_64bit_float(value)
-                else:
-                    raise ValueError(
-                        f"unable to update modbus server registers from value "
-                        f"{value} of variable {name} with data type "
-                        f"{_type}"
+                if decoder is None:
+                    logger.warning(
+                        f"an attempt was made to set {name}, "
+                        f"which has unsupported data type {variable._type}"
                     )
+                    continue
+
+            variable.value = decoder(data, 2 * offset)
 
-                # encode the meta data
-                type_int = {Boolean: 0, Toggle: 1, Integer: 2, Float: 3}.get(_type, -1)
+            knobs_set.append((address + offset, variable))
+
+        if not found:
+            logger.warning(
+                "an attempt was made to set a knob through an unassigned register"
+            )
 
-                builder.add_16bit_int(type_int)
+        # Update the holding registers of the knobs that were set
+        with self._registers_lock:
+            for knob_address, variable in knobs_set:
+                registers = _modbus_registers(variable._type, variable._value)
 
                 # from_vars kwarg added with setValues_decorator above
-                self.slave.setValues(
-                    4, self.meter_addresses[i],
-                    builder.to_registers(), from_vars=True
+                self.slave.setValues(3, knob_address, registers, from_vars=True)
+
+    def _update_knob_registers(self):
+        """Store readwrite variable values in holding registers (fc = 3)"""
+
+        types = [variable._type for variable in self.knobs.values()]
+        values = [variable._value for variable in self.knobs.values()]
+
+        with self._registers_lock:
+            registers = self._knob_registers.encode(types, values)
+
+            # from_vars kwarg added with setValues_decorator above
+            self.slave.setValues(
+                3, self._knob_registers.start, registers, from_vars=True
+            )
+
+    def _update_meter_registers(self, state):
+        """Store readonly variable values in input registers (fc = 4)"""
+
+        if self.meters is not None:
+            try:
+                values = [state[name] for name in self.meters]
+            except KeyError as err:
+                raise ValueError(
+                    f"meter {err.args[0]} not found in experiment variables"
                 )
+        else:
+            names, values = [], []
 
-            await asyncio.sleep(0.1)
+            for name, value in state.items():
+                names.append(name)
+                values.append(value)
 
-        finally:
+            if names != self._meter_names:
+                # assume consecutive sets of registers
+                self._meter_names = names
+                self.meter_addresses = [5 * i for i in range(len(names))]
+                self._meter_registers = _RegisterBlock(self.meter_addresses, names)
+
+        types = [_modbus_type(type(value)) for value in values]
 
-            asyncio.create_task(self._update_registers())
+        with self._registers_lock:
+            registers = self._meter_registers.encode(types, values)
+
+            # from_vars kwarg added with setValues_decorator above
+            self.slave.setValues(
+                4, self._meter_registers.start, registers, from_vars=True
+            )
 
     async def _run_async_server(self):
 
-        asyncio.create_task(self._update_registers())
+        self.event_loop = asyncio.get_running_loop()
 
-        server = importlib.import_module(".server", package="pymodbus")
+        try:
+            server = importlib.import_module(".server", package="pymodbus")
 
-        self.server = server.ModbusTcpServer(
-            self.context, identity=self.identity, address=(self.ip_address, self.port)
-        )
+            self.server = server.ModbusTcpServer(
+                self.context,
+                identity=self.identity,
+                address=(self.ip_address, self.port),
+            )
+        except Exception as error:
+            # raised by __init__, in the thread that starts the server
+            self._start_error = error
+            return
+        finally:
+            self._started.set()
 
         try:
             await self.server.serve_forever()
         except asyncio.exceptions.CancelledError:
-            # Server shutdown cancels the _update_registers task
             pass
 
-    @Routine.enabler
     def update(self, state):
+        # The holding registers follow the values of the knobs even while the
+        # routine is disabled, since clients can read them at any time
+        self._update_knob_registers()
+
+        self._serve_state(state)
+
+    @Routine.enabler
+    def _serve_state(self, state):
+        """Store the given state in the input registers, while the routine is enabled"""
+
         self.state = state
 
+        self._update_meter_registers(state)
+
     def terminate(self):
 
-        # Close modbus server
-        if not self.server.serving.done():
-            self.server.serving.set_result(True)
+        # Close modbus server, from the thread running its event loop
+        def stop_serving():
+            if not self.server.serving.done():
+                self.server.serving.set_result(True)
+
+        try:
+            self.event_loop.call_soon_threadsafe(stop_serving)
+        except RuntimeError:  # event loop is already closed
+            pass
 
 
 supported = {
@@ -0,0 +1,1296 @@
+# Storage of experiment data
+import bisect
+import collections
+import importlib
+import io
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from empyric.tools import logger
+from empyric.types import Boolean, Toggle, Integer, Float, Complex, Array
+
+
+class DataStore:
+    """
+    Base class for in-memory stores of experiment data.
+
+    A data store holds one row per experiment step, with one column per entry of the
+    experiment `state` (including "Time"), indexed by the datetime of the step. Rows
+    are added with the `append` method and read back as pandas DataFrames with the
+    `since` method or the `dataframe` property.
+
+    Every row appended to a store is given an absolute position, counting up from
+    zero. The `appended` attribute is the total number of rows ever appended, so that
+    consumers of the data (plotters, data writers, etc.) can keep track of which rows
+    they have already processed and ask only for newer ones.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+
+        self.appended = 0  # total number of rows appended to the store
+
+        # Guards the contents of the store, since rows are typically appended by the
+        # experiment thread while being read by the GUI and by data saving threads
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        # overwritten by child classes
+        return 0
+
+    def append(self, index, row):
+        """
+        Append a row to the store
+
+        :param index: (datetime) index of the new row
+        :param row: (dict/Series) row of the form {..., column: value, ...}
+        :return: None
+        """
+
+        # overwritten by child classes
+        pass
+
+    def since(self, position, stop=None):
+        """
+        Get the rows of the store with absolute positions from `position` up to, but
+        not including, `stop`. Rows that are no longer held by the store are omitted.
+
+        :param position: (int) absolute position of the first requested row
+        :param stop: (int) absolute position after the last requested row; defaults
+                     to the number of rows appended so far.
+        :return: (pandas.DataFrame) requested rows
+        """
+
+        # overwritten by child classes
+        return pd.DataFrame(columns=self.columns, dtype=object)
+
+    @property
+    def dataframe(self):
+        """All rows currently held by the store, as a pandas DataFrame"""
+        return self.since(0)
+
+    def window(self, start=None, stop=None):
+        """
+        Get the rows of the store with experiment times ("Time" column) from `start`
+        to `stop`, inclusive. Rows that are no longer held by the store are omitted.
+
+        :param start: (float) (optional) earliest experiment time in seconds
+        :param stop: (float) (optional) latest experiment time in seconds
+        :return: (pandas.DataFrame) requested rows
+        """
+
+        # may be overwritten by child classes for efficiency
+        data = self.dataframe
+
+        times = pd.to_numeric(data["Time"], errors="coerce")
+
+        in_window = np.ones(len(data), dtype=bool)
+
+        if start is not None:
+            in_window &= (times >= start).to_numpy()
+
+        if stop is not None:
+            in_window &= (times <= stop).to_numpy()
+
+        return data[in_window]
+
+    def __repr__(self):
+        return "DataStore"
+
+
+class _Chunk:
+    """Fixed size block of rows in a ColumnarStore"""
+
+    def __init__(self, size, dtypes, start):
+        self.index = np.empty(size, dtype="datetime64[ns]")
+
+        self.values = {
+            column: np.empty(size, dtype=object if dtype is None else dtype)
+            for column, dtype in dtypes.items()
+        }
+
+        self.valid = {column: np.zeros(size, dtype=bool) for column in dtypes}
+
+        # running maximum of the experiment times, for searching by time
+        self.times = np.full(size, -np.inf)
+
+        self.start = start  # absolute position of the first row in the chunk
+        self.length = 0  # number of rows written to the chunk
+
+    def reset(self, start):
+        """Recycle the chunk for new rows"""
+
+        for valid in self.valid.values():
+            valid[:] = False
+
+        self.start = start
+        self.length = 0
+
+
+class ColumnarStore(DataStore):
+    """
+    Data store which keeps each column in a typed NumPy array.
+
+    Rows are written into preallocated chunks of `chunk_size` rows, and a new chunk
+    is allocated only when the last one is full, so appending a row takes the same
+    time no matter how many rows are already stored.
+
+    The data type of each column is inferred from the first value that is not None:
+    booleans, integers, floats and complex numbers are stored in arrays of the
+    corresponding NumPy type, while any other values (toggles, strings, arrays, etc.)
+    are stored in object arrays. If a later value does not fit the data type of its
+    column, the column is converted to a suitable data type (e.g. integer to float).
+    Missing values (None) are tracked separately, and appear as None (or NaN for
+    floating point and complex columns) when the data is read back.
+
+    If the optional `max_rows` argument is given, the store works as a ring buffer
+    that keeps (at least) the `max_rows` most recent rows; the oldest chunk is
+    recycled once the limit is reached. Otherwise, all rows are kept.
+    """
+
+    _numeric_dtypes = (
+        np.dtype(np.int64),
+        np.dtype(np.float64),
+        np.dtype(np.complex128),
+    )
+
+    def __init__(self, columns, chunk_size=4096, max_rows=None):
+        super().__init__(columns)
+
+        self.chunk_size = int(chunk_size)
+        self.max_rows = max_rows
+
+        self._dtypes = {column: None for column in self.columns}
+        # None indicates that the data type is yet to be determined
+
+        self._chunks = collections.deque()
+
+        self._last_time = -np.inf  # latest experiment time appended
+
+    def __len__(self):
+        with self.lock:
+            return sum(chunk.length for chunk in self._chunks)
+
+    def append(self, index, row):
+        with self.lock:
+            if not self._chunks or self._chunks[-1].length == self.chunk_size:
+                self._add_chunk()
+
+            chunk = self._chunks[-1]
+            i = chunk.length
+
+            chunk.index[i] = np.datetime64(index, "ns")
+
+            for column in self.columns:
+                value = row[column]
+
+                if value is None:
+                    chunk.valid[column][i] = False
+                    continue
+
+                if not self._fits(value, self._dtypes[column]):
+                    self._retype(column, value)
+
+                chunk.values[column][i] = value
+                chunk.valid[column][i] = True
+
+            try:
+                time = float(row["Time"])
+            except (KeyError, TypeError, ValueError):
+                time = np.nan
+
+            # guard against unordered times (e.g. if the clock was reset)
+            if time > self._last_time:
+                self._last_time = time
+
+            chunk.times[i] = self._last_time
+
+            chunk.length += 1
+            self.appended += 1
+
+    def since(self, position, stop=None):
+        with self.lock:
+            if stop is None or stop > self.appended:
+                stop = self.appended
+
+            indices = []
+            values = {column: [] for column in self.columns}
+            valid = {column: [] for column in self.columns}
+
+            for chunk in self._chunks:
+                start = max(position - chunk.start, 0)
+                end = min(stop - chunk.start, chunk.length)
+
+                if end <= start:
+                    continue
+
+                indices.append(chunk.index[start:end])
+
+                for column in self.columns:
+                    values[column].append(chunk.values[column][start:end])
+                    valid[column].append(chunk.valid[column][start:end])
+
+            if not indices:
+                return pd.DataFrame(columns=self.columns, dtype=object)
+
+            # concatenation copies the data, so the DataFrame is independent of the
+            # chunks, which may be overwritten or recycled later
+            data = {
+                column: self._view(
+                    np.concatenate(values[column]), np.concatenate(valid[column])
+                )
+                for column in self.columns
+            }
+
+            index = pd.DatetimeIndex(np.concatenate(indices))
+
+        return pd.DataFrame(data, index=index, columns=self.columns)
+
+    def window(self, start=None, stop=None):
+        # Experiment times increase monotonically, so the window is found by binary
+        # search instead of by checking every row
+        with self.lock:
+            first = 0 if start is None else self._time_position(start, "left")
+            last = self.appended if stop is None else self._time_position(stop, "right")
+
+            return self.since(first, stop=last)
+
+    def _time_position(self, time, side):
+        """
+        Absolute position of the first row with an experiment time at or after
+        (side = "left") or after (side = "right") the given time
+        """
+
+        chunks = [chunk for chunk in self._chunks if chunk.length > 0]
+
+        # Find the first chunk that ends at or after the given time, then the row
+        # within that chunk
+        last_times = [chunk.times[chunk.length - 1] for chunk in chunks]
+
+        if side == "left":
+            n = bisect.bisect_left(last_times, time)
+        else:
+            n = bisect.bisect_right(last_times, time)
+
+        if n == len(chunks):
+            return self.appended
+
+        chunk = chunks[n]
+
+        i = np.searchsorted(chunk.times[: chunk.length], time, side=side)
+
+        return chunk.start + int(i)
+
+    def _add_chunk(self):
+        """Allocate a new chunk, or recycle the oldest one in ring buffer mode"""
+
+        ring_full = (
+            self.max_rows is not None
+            and len(self._chunks) > 0
+            and len(self) - self._chunks[0].length >= self.max_rows
+        )
+
+        if ring_full:
+            # the oldest chunk is not needed to keep max_rows rows
+            chunk = self._chunks.popleft()
+
+            # chunk arrays may have been created before a column was retyped
+            for column, dtype in self._dtypes.items():
+                if dtype is not None and chunk.values[column].dtype != dtype:
+                    chunk.values[column] = np.empty(self.chunk_size, dtype=dtype)
+
+            chunk.reset(self.appended)
+        else:
+            chunk = _Chunk(self.chunk_size, self._dtypes, self.appended)
+
+        self._chunks.append(chunk)
+
+    @staticmethod
+    def _dtype_of(value):
+        """Storage data type for a value"""
+
+        # Booleans are checked first, since bool is a subclass of int
+        if isinstance(value, Boolean):
+            return np.dtype(np.bool_)
+        elif isinstance(value, Toggle):
+            return np.dtype(object)
+        elif isinstance(value, Integer):
+            return np.dtype(np.int64)
+        elif isinstance(value, Float):
+            return np.dtype(np.float64)
+        elif isinstance(value, Complex):
+            return np.dtype(np.complex128)
+        else:
+            return np.dtype(object)
+
+    @classmethod
+    def _fits(cls, value, dtype):
+        """Whether a value can be stored in a column of the given data type"""
+
+        if dtype is None:
+            return False
+        elif dtype == object:
+            return True
+
+        value_dtype = cls._dtype_of(value)
+
+        if value_dtype == dtype:
+            return True
+        elif dtype in cls._numeric_dtypes and value_dtype in cls._numeric_dtypes:
+            return np.promote_types(dtype, value_dtype) == dtype
+        else:
+            return False
+
+    def _retype(self, column, value):
+        """Change the data type of a column to accommodate the given value"""
+
+        dtype = self._dtypes[column]
+        value_dtype = self._dtype_of(value)
+
+        if dtype is None:
+            new_dtype = value_dtype
+        elif dtype in self._numeric_dtypes and value_dtype in self._numeric_dtypes:
+            new_dtype = np.promote_types(dtype, value_dtype)
+        else:
+            new_dtype = np.dtype(object)
+
+        for chunk in self._chunks:
+            old_values = chunk.values[column]
+            valid = chunk.valid[column]
+
+            new_values = np.empty(self.chunk_size, dtype=new_dtype)
+
+            if new_dtype == object:
+                # convert element by element to keep the original objects
+                for i in np.flatnonzero(valid):
+                    new_values[i] = old_values[i]
+            else:
+                new_values[valid] = old_values[valid].astype(new_dtype)
+
+            chunk.values[column] = new_values
+
+        self._dtypes[column] = new_dtype
+
+    @staticmethod
+    def _view(values, valid):
+        """Fill in missing values of a column for the pandas view"""
+
+        if valid.all():
+            return values
+        elif values.dtype.kind in "fc":
+            values[~valid] = np.nan
+            return values
+        else:
+            values = values.astype(object)
+            values[~valid] = None
+            return values
+
+    def __repr__(self):
+        return "ColumnarStore"
+
+
+class ArrayRef:
+    """
+    Reference to an array held in an `ArrayStore`, which is stored in place of the
+    array in the experiment state and data.
+
+    The referenced array is read (as a read-only memory map, without copying) through
+    the `value` property, or by passing the reference to `numpy.asarray`. The string
+    representation of a reference, which is what is written to CSV files, has the
+    form `<store path>#<index>`.
+    """
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def value(self):
+        """Referenced array"""
+        return self.store[self.index]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.value
+        else:
+            return self.value.astype(dtype)
+
+    def __eq__(self, other):
+        if isinstance(other, ArrayRef):
+            return self.store.path == other.store.path and self.index == other.index
+        else:
+            return False
+
+    def __hash__(self):
+        return hash((self.store.path, self.index))
+
+    def __str__(self):
+        return f"{self.store.path}#{self.index}"
+
+    def __repr__(self):
+        return f"ArrayRef({self})"
+
+
+class ArrayStore:
+    """
+    Append-only store of the array values of a variable, kept in a directory on disk.
+
+    The raw bytes of the arrays are appended to chunk files (`chunk_0.bin`,
+    `chunk_1.bin`, ...), and for each array a fixed size record holding its
+    timestamp, chunk, byte offset, data type and shape is appended to the `index`
+    file. A new chunk file is started once the current one exceeds `chunk_size`
+    bytes.
+
+    Arrays are read back as read-only memory maps of the chunk files, so reading
+    does not copy data. An existing store is reopened (for reading or appending) by
+    constructing an `ArrayStore` with its path.
+
+    :param path: (path) directory of the store; created if it does not exist
+    :param chunk_size: (int) size in bytes beyond which a new chunk file is started;
+                       default is 256 MB
+    """
+
+    max_ndim = 8  #: maximum number of dimensions of stored arrays
+
+    _index_dtype = np.dtype(
+        [
+            ("time", "<i8"),  # timestamp in nanoseconds since the epoch
+            ("chunk", "<i8"),
+            ("offset", "<i8"),
+            ("dtype", "S16"),
+            ("ndim", "<i8"),
+            ("shape", "<i8", (max_ndim,)),
+        ]
+    )
+
+    def __init__(self, path, chunk_size=2**28):
+        self.path = os.path.abspath(path)
+        self.chunk_size = chunk_size
+
+        self.lock = threading.RLock()
+
+        os.makedirs(self.path, exist_ok=True)
+
+        index_path = os.path.join(self.path, "index")
+
+        if os.path.exists(index_path):
+            self._index = list(np.fromfile(index_path, dtype=self._index_dtype))
+        else:
+            self._index = []
+
+        if self._index:
+            self._chunk = int(self._index[-1]["chunk"])
+        else:
+            self._chunk = 0
+
+        self._index_file = open(index_path, "ab")
+        self._chunk_file = open(self._chunk_path(self._chunk), "ab")
+
+        self.closed = False
+
+    def _chunk_path(self, chunk):
+        return os.path.join(self.path, f"chunk_{chunk}.bin")
+
+    def __len__(self):
+        return len(self._index)
+
+    def append(self, array, timestamp=None):
+        """
+        Append an array to the store
+
+        :param array: (Array) array to be stored; object arrays cannot be stored
+        :param timestamp: (datetime) (optional) time at which the array was acquired
+        :return: (ArrayRef) reference to the stored array
+        """
+
+        array = np.ascontiguousarray(array)
+
+        if array.dtype.hasobject:
+            raise TypeError(f"arrays of {array.dtype} cannot be stored")
+
+        if array.ndim > self.max_ndim:
+            raise ValueError(
+                f"arrays with more than {self.max_ndim} dimensions cannot be stored"
+            )
+
+        record = np.zeros(1, dtype=self._index_dtype)[0]
+
+        if timestamp is not None:
+            record["time"] = pd.Timestamp(timestamp).value
+
+        record["dtype"] = array.dtype.str.encode()
+        record["ndim"] = array.ndim
+        record["shape"][: array.ndim] = array.shape
+
+        with self.lock:
+            if self.closed:
+                raise ValueError(f"array store {self.path} is closed")
+
+            if self._chunk_file.tell() >= self.chunk_size:
+                self._chunk_file.close()
+                self._chunk += 1
+                self._chunk_file = open(self._chunk_path(self._chunk), "ab")
+
+            record["chunk"] = self._chunk
+            record["offset"] = self._chunk_file.tell()
+
+            self._chunk_file.write(array.data)
+            self._chunk_file.flush()
+
+            self._index_file.write(record.tobytes())
+            self._index_file.flush()
+
+            self._index.append(record)
+
+            return ArrayRef(self, len(self._index) - 1)
+
+    def __getitem__(self, index):
+        """Read a stored array as a read-only memory map"""
+
+        record = self._index[index]
+
+        shape = tuple(record["shape"][: record["ndim"]])
+        dtype = np.dtype(record["dtype"].decode())
+
+        if dtype.itemsize * int(np.prod(shape)) == 0:
+            return np.empty(shape, dtype=dtype)
+
+        return np.memmap(
+            self._chunk_path(int(record["chunk"])),
+            dtype=dtype,
+            mode="r",
+            offset=int(record["offset"]),
+            shape=shape,
+        )
+
+    @property
+    def times(self):
+        """Timestamps of the stored arrays"""
+        return pd.to_datetime([record["time"] for record in self._index], unit="ns")
+
+    def close(self):
+        """Close the files of the store; stored arrays can still be read"""
+
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                self._chunk_file.close()
+                self._index_file.close()
+
+    def __repr__(self):
+        return "ArrayStore"
+
+
+class DataWriter:
+    """
+    Base class for writers that save experiment data to a file incrementally.
+
+    Data is passed to the `write` method as pandas DataFrames containing only rows
+    that have not been written before, and is appended to the file by a background
+    thread, so that calls to `write` return immediately. Written data is flushed to
+    the operating system after each batch, but is only synced to disk (`os.fsync`)
+    every `sync_interval` seconds and when the writer is closed, since syncing is
+    comparatively slow.
+
+    The optional `types` argument is a dictionary of the form
+    {..., column: type, ...}, giving the types (from `empyric.types`) of the values
+    in the columns, for writers that declare the column types upfront.
+
+    The file is opened upon construction of the writer, and the writer must be
+    closed with the `close` method to make sure that all data is written.
+    """
+
+    #: file extension for the format written by the writer
+    extension = ""
+
+    # Library used by the writer; overwritten in children classes.
+    lib = "python"
+
+    # If upon instantiation no valid library is found for the writer, raise
+    # ModuleNotFoundError with the following message; overwritten in children classes.
+    no_lib_msg = "no valid library found for writer; check library installation"
+
+    def __init__(self, path, columns, types=None, sync_interval=10.0):
+        if self.lib is None:
+            raise ModuleNotFoundError(self.no_lib_msg)
+
+        self.path = path
+        self.columns = list(columns)
+
+        # data types of the columns, where known (e.g. from the variables' types)
+        self.types = types if types is not None else {}
+        self.sync_interval = sync_interval
+
+        self.closed = False
+
+        self._queue = queue.Queue()
+
+        self._open()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        """
+        Queue rows of data to be appended to the file
+
+        :param data: (pandas.DataFrame) new rows of data
+        :return: None
+        """
+
+        if self.closed:
+            raise ValueError(f"writer for {self.path} is closed")
+
+        self._queue.put(data)
+
+    def flush(self):
+        """Block until all queued data has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Write any queued data, sync the file to disk and close it"""
+
+        if not self.closed:
+            self.closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        last_sync = time.time()
+
+        while True:
+            batch = [self._queue.get()]
+
+            # Write everything that has accumulated in a single batch
+            while not self._queue.empty():
+                batch.append(self._queue.get())
+
+            closing = any(data is None for data in batch)
+
+            try:
+                for data in batch:
+                    if data is not None:
+                        self._write(data)
+
+                self._flush()
+
+                if closing or time.time() - last_sync >= self.sync_interval:
+                    self._sync()
+                    last_sync = time.time()
+
+            except Exception as err:
+                logger.error(f"Unable to write experiment data to {self.path}: {err}")
+
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if closing:
+                break
+
+        self._close()
+
+    # All methods below should be overwritten in child class definitions
+
+    def _open(self):
+        """Open the file (in the calling thread)"""
+        pass
+
+    def _write(self, data):
+        """Append the rows of a DataFrame to the file"""
+        pass
+
+    def _flush(self):
+        """Flush written data to the operating system"""
+        pass
+
+    def _sync(self):
+        """Sync written data to disk"""
+        pass
+
+    def _close(self):
+        """Close the file"""
+        pass
+
+    def __repr__(self):
+        return "DataWriter"
+
+
+class CSVWriter(DataWriter):
+    """
+    Writer that appends experiment data to a CSV file, with the datetime index in the
+    first column.
+    """
+
+    extension = ".csv"
+
+    buffer_size = 2**20  # size of the file buffer in bytes
+
+    def _open(self):
+        new_file = not os.path.exists(self.path)
+
+        self._file = open(self.path, "a", buffering=self.buffer_size)
+
+        if new_file:
+            # if this is a new file, write column headers
+            self._file.write("," + ",".join(self.columns) + "\n")
+            self._file.flush()
+
+    def _write(self, data):
+        data.to_csv(self._file, header=False, na_rep="None")
+
+    def _flush(self):
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+    def __repr__(self):
+        return "CSVWriter"
+
+
+def _arrow_type(pa, column):
+    """Infer the Arrow data type of a column of a DataFrame"""
+
+    if column.dtype.kind == "b":
+        return pa.bool_()
+    elif column.dtype.kind in "iu":
+        return pa.int64()
+    elif column.dtype.kind == "f":
+        return pa.float64()
+
+    for value in column:
+        if value is None or (isinstance(value, Float) and np.isnan(value)):
+            continue
+        elif isinstance(value, Array):
+            dtype = np.asarray(value).dtype
+
+            if dtype.kind in "biuf":
+                return pa.list_(pa.from_numpy_dtype(dtype))
+            else:
+                return pa.list_(pa.string())
+        elif isinstance(value, Boolean):
+            return pa.bool_()
+        elif isinstance(value, Integer):
+            return pa.int64()
+        elif isinstance(value, Float):
+            return pa.float64()
+        else:
+            return pa.string()
+
+    return pa.float64()  # no values to go by; assume floating point numbers
+
+
+def _arrow_array(pa, column, arrow_type):
+    """Convert a column of a DataFrame into an Arrow array of the given type"""
+
+    def convert(value):
+        if value is None:
+            return None
+        elif pa.types.is_list(arrow_type):
+            return np.ravel(value)
+        elif pa.types.is_string(arrow_type):
+            return str(value)
+        else:
+            return value
+
+    try:
+        if pa.types.is_list(arrow_type) or pa.types.is_string(arrow_type):
+            return pa.array([convert(value) for value in column], type=arrow_type)
+        else:
+            return pa.array(column, type=arrow_type, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError) as err:
+        # Values that do not fit the column type are stored as nulls
+        logger.warning(
+            f"Unable to store values of {column.name} as {arrow_type}: {err}; "
+            "storing incompatible values as nulls"
+        )
+
+        values = []
+        for value in column:
+            try:
+                values.append(pa.scalar(convert(value), type=arrow_type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+                values.append(pa.scalar(None, type=arrow_type))
+
+        return pa.array(values, type=arrow_type)
+
+
+class _ArrowWriter(DataWriter):
+    """
+    Base class for writers using the Apache Arrow library. The schema is inferred
+    from the first batch of data written, and each batch is converted to an Arrow
+    table with that schema. Array values are stored inline, as lists.
+    """
+
+    if importlib.util.find_spec("pyarrow"):
+        lib = "pyarrow"
+    else:
+        lib = None
+
+    no_lib_msg = "the pyarrow library must be installed to write data in this format"
+
+    def _open(self):
+        self._pa = importlib.import_module("pyarrow")
+
+        if os.path.exists(self.path):
+            # Binary files cannot be appended to; write to a new file instead
+            stem, extension = os.path.splitext(self.path)
+
+            i = 1
+            while os.path.exists(f"{stem}_{i}{extension}"):
+                i += 1
+
+            logger.info(
+                f"{self.path} already exists; writing data to {stem}_{i}{extension}"
+            )
+
+            self.path = f"{stem}_{i}{extension}"
+
+        self._file = open(self.path, "wb")
+
+        self._schema = None
+        self._writer = None  # created upon first write, once the schema is known
+
+    def _table(self, data):
+        """Convert a DataFrame into an Arrow table"""
+
+        pa = self._pa
+
+        if self._schema is None:
+            self._schema = pa.schema(
+                [pa.field("index", pa.timestamp("ns"))]
+                + [
+                    pa.field(column, _arrow_type(pa, data[column]))
+                    for column in self.columns
+                ]
+            )
+
+        arrays = [pa.array(data.index.values, type=pa.timestamp("ns"))] + [
+            _arrow_array(pa, data[column], self._schema.field(column).type)
+            for column in self.columns
+        ]
+
+        return pa.Table.from_arrays(arrays, schema=self._schema)
+
+    def _flush(self):
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+        self._file.close()
+
+
+class ParquetWriter(_ArrowWriter):
+    """
+    Writer that saves experiment data to a Parquet file, with one row group per
+    batch of data written.
+
+    The Parquet file metadata is written when the writer is closed, so the file can
+    only be read after the experiment has ended.
+    """
+
+    extension = ".parquet"
+
+    def _write(self, data):
+        table = self._table(data)
+
+        if self._writer is None:
+            parquet = importlib.import_module("pyarrow.parquet")
+            self._writer = parquet.ParquetWriter(self._file, self._schema)
+
+        self._writer.write_table(table)
+
+    def __repr__(self):
+        return "ParquetWriter"
+
+
+class ArrowWriter(_ArrowWriter):
+    """
+    Writer that saves experiment data to a file in the Arrow IPC streaming format,
+    with one record batch per batch of data written.
+
+    Since each batch is complete on its own, the file can be read at any time (e.g.
+    with `pyarrow.ipc.open_stream(pyarrow.memory_map(path))`, which memory-maps
+    the data without copying it).
+    """
+
+    extension = ".arrows"
+
+    def _write(self, data):
+        table = self._table(data)
+
+        if self._writer is None:
+            ipc = importlib.import_module("pyarrow.ipc")
+            self._writer = ipc.new_stream(self._file, self._schema)
+
+        self._writer.write_table(table)
+
+    def __repr__(self):
+        return "ArrowWriter"
+
+
+class HDF5Writer(DataWriter):
+    """
+    Writer that saves experiment data to an HDF5 file, using the h5py library.
+
+    Each column is stored as a resizable dataset in the "data" group, with the
+    datetime index (in nanoseconds since the epoch) stored in the "index" dataset.
+    Since HDF5 datasets have no notion of missing values, a boolean dataset of the
+    same name in the "valid" group indicates which values are present. Array values
+    are stored inline, flattened into variable length datasets.
+    """
+
+    extension = ".h5"
+
+    if importlib.util.find_spec("h5py"):
+        lib = "h5py"
+    else:
+        lib = None
+
+    no_lib_msg = "the h5py library must be installed to write data in HDF5 format"
+
+    def _open(self):
+        self._h5py = importlib.import_module("h5py")
+
+        self._file = self._h5py.File(self.path, "a")
+
+        self._file.require_group("data")
+        self._file.require_group("valid")
+
+    def _dtype(self, column):
+        """Infer the HDF5 data type of a column of a DataFrame"""
+
+        if column.dtype.kind in "biufc":
+            return column.dtype
+
+        for value in column:
+            if value is None or (isinstance(value, Float) and np.isnan(value)):
+                continue
+            elif isinstance(value, Array):
+                return self._h5py.vlen_dtype(np.asarray(value).dtype)
+            elif isinstance(value, Boolean):
+                return np.dtype(np.bool_)
+            elif isinstance(value, Integer):
+                return np.dtype(np.int64)
+            elif isinstance(value, Float):
+                return np.dtype(np.float64)
+            elif isinstance(value, Complex):
+                return np.dtype(np.complex128)
+            else:
+                return self._h5py.string_dtype()
+
+        return np.dtype(np.float64)  # no values to go by; assume floating point
+
+    @staticmethod
+    def _extend(dataset, values):
+        """Append values to a resizable dataset"""
+
+        n = dataset.shape[0]
+        dataset.resize((n + len(values),))
+
+        if values.dtype == object:
+            # h5py would broadcast array elements, so assign them one at a time
+            for i, value in enumerate(values):
+                dataset[n + i] = value
+        else:
+            dataset[n:] = values
+
+    def _write(self, data):
+        if "index" not in self._file:
+            self._file.create_dataset(
+                "index", shape=(0,), maxshape=(None,), dtype=np.int64, chunks=True
+            )
+            self._file["index"].attrs["unit"] = "ns"
+
+        converted_columns = {}
+
+        for column in self.columns:
+            values = data[column]
+
+            if column not in self._file["data"]:
+                self._file["data"].create_dataset(
+                    column,
+                    shape=(0,),
+                    maxshape=(None,),
+                    dtype=self._dtype(values),
+                    chunks=True,
+                )
+                self._file["valid"].create_dataset(
+                    column, shape=(0,), maxshape=(None,), dtype=bool, chunks=True
+                )
+
+            dataset = self._file["data"][column]
+
+            valid = values.notna().to_numpy()
+
+            if self._h5py.check_vlen_dtype(dataset.dtype) is not None:
+                # variable length arrays
+                converted = np.empty(len(values), dtype=object)
+                for i, value in enumerate(values):
+                    converted[i] = (
+                        np.ravel(value) if valid[i] else np.array([], dtype=float)
+                    )
+            elif self._h5py.check_string_dtype(dataset.dtype) is not None:
+                converted = np.array(
+                    [str(value) if valid[i] else "" for i, value in enumerate(values)],
+                    dtype=object,
+                )
+            else:
+                converted = np.zeros(len(values), dtype=dataset.dtype)
+
+                try:
+                    converted[valid] = values[valid].to_numpy().astype(dataset.dtype)
+                except (TypeError, ValueError) as err:
+                    logger.warning(
+                        f"Unable to store values of {column} as {dataset.dtype}: "
+                        f"{err}; storing as missing values"
+                    )
+                    valid[:] = False
+
+            converted_columns[column] = converted, valid
+
+        # Only extend the datasets once all columns are converted,
+        # so that they always have the same length
+        self._extend(self._file["index"], data.index.values.astype(np.int64))
+
+        for column, (converted, valid) in converted_columns.items():
+            self._extend(self._file["data"][column], converted)
+            self._extend(self._file["valid"][column], valid)
+
+    def _flush(self):
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.id.get_vfd_handle())
+
+    def _close(self):
+        self._file.close()
+
+    def __repr__(self):
+        return "HDF5Writer"
+
+
+def _sql_name(name):
+    """Quote a table or column name for use in SQL statements"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_blob(array):
+    """Serialize an array as a BLOB in NumPy's .npy format"""
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(array), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _from_blob(blob):
+    """Deserialize an array stored as a BLOB in NumPy's .npy format"""
+    return np.load(io.BytesIO(blob), allow_pickle=False)
+
+
+def read_sqlite(path, start=None, stop=None, columns=None):
+    """
+    Read experiment data from an SQLite database written by an `SQLiteWriter`,
+    optionally restricted to a window of experiment times. Only the requested rows
+    are loaded, using the index on the "Time" column, and the database can be read
+    while the experiment is still writing to it.
+
+    :param path: (path) path to the SQLite database
+    :param start: (float) (optional) earliest experiment time in seconds
+    :param stop: (float) (optional) latest experiment time in seconds
+    :param columns: (list) (optional) columns to read; defaults to all columns
+    :return: (pandas.DataFrame) requested data, indexed by datetime
+    """
+
+    conditions, parameters = [], []
+
+    if start is not None:
+        conditions.append('"Time" >= ?')
+        parameters.append(start)
+
+    if stop is not None:
+        conditions.append('"Time" <= ?')
+        parameters.append(stop)
+
+    if columns is None:
+        selection = "*"
+    else:
+        selection = ", ".join(_sql_name(column) for column in ["timestamp"] + columns)
+
+    query = f"SELECT {selection} FROM data"
+
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    query += " ORDER BY rowid"
+
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    try:
+        data = pd.read_sql_query(query, connection, params=parameters)
+    finally:
+        connection.close()
+
+    data.index = pd.to_datetime(data.pop("timestamp"))
+    data.index.name = None
+
+    # Arrays are stored as BLOBs
+    for column in data.columns:
+        if data[column].dtype == object:
+            data[column] = [
+                _from_blob(value) if isinstance(value, bytes) else value
+                for value in data[column]
+            ]
+
+    return data
+
+
+class SQLiteWriter(DataWriter):
+    """
+    Writer that saves experiment data to an SQLite database.
+
+    The data is written to the "data" table, which has a "timestamp" column holding
+    the datetime index (as ISO 8601 text) and one column per column of data, with an
+    index on the "Time" column for quick retrieval of time windows (see
+    `read_sqlite` and the `window` method). Columns are given SQL types based on the
+    types of the corresponding variables, where known: INTEGER for booleans and
+    integers, REAL for floats, TEXT for toggles, strings and complex numbers, and
+    BLOB for arrays (in NumPy's .npy format).
+
+    Each batch of data is inserted with a single `executemany` call in its own
+    transaction, and the database is in write-ahead logging (WAL) mode, so that it
+    can be read while the experiment is running.
+    """
+
+    extension = ".db"
+
+    lib = "sqlite3"
+
+    def _open(self):
+        # The connection is created in the calling thread, but used by the writing
+        # thread, so it is not restricted to the thread that created it
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+
+        self._sql_types = {
+            column: self._sql_type(self.types.get(column, None))
+            for column in self.columns
+        }
+
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS data ("timestamp" TEXT)'
+            )
+
+            # Add any columns that are not already in the table
+            existing = [
+                row[1] for row in self._connection.execute("PRAGMA table_info(data)")
+            ]
+
+            for column in self.columns:
+                if column not in existing:
+                    self._connection.execute(
+                        f"ALTER TABLE data ADD COLUMN {_sql_name(column)} "
+                        f"{self._sql_types[column]}"
+                    )
+
+            if "Time" in self.columns:
+                self._connection.execute(
+                    'CREATE INDEX IF NOT EXISTS data_time ON data ("Time")'
+                )
+
+        self._insert = (
+            "INSERT INTO data ("
+            + ", ".join(_sql_name(column) for column in ["timestamp"] + self.columns)
+            + ") VALUES ("
+            + ", ".join("?" * (len(self.columns) + 1))
+            + ")"
+        )
+
+    @staticmethod
+    def _sql_type(_type):
+        """SQL type of a column of values of the given type"""
+
+        if _type is None:
+            return ""  # no declared type; values are stored as they come
+        elif issubclass(_type, Boolean) or issubclass(_type, Integer):
+            return "INTEGER"
+        elif issubclass(_type, Float):
+            return "REAL"
+        elif issubclass(_type, Array):
+            return "BLOB"
+        else:
+            return "TEXT"
+
+    @staticmethod
+    def _convert(value):
+        """Convert a value to a type that can be stored in an SQLite database"""
+
+        if value is None:
+            return None
+        elif isinstance(value, Boolean):
+            return int(value)
+        elif isinstance(value, Integer):
+            return int(value)
+        elif isinstance(value, Float):
+            return None if np.isnan(value) else float(value)
+        elif isinstance(value, Array) or isinstance(value, ArrayRef):
+            return _to_blob(value)
+        else:
+            return str(value)
+
+    def _write(self, data):
+        timestamps = data.index.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+        columns = [
+            [self._convert(value) for value in data[column]] for column in self.columns
+        ]
+
+        with self._connection:  # one transaction per batch
+            self._connection.executemany(self._insert, zip(timestamps, *columns))
+
+    def _sync(self):
+        self._connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def _close(self):
+        self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._connection.close()
+
+    def window(self, start=None, stop=None, columns=None):
+        """
+        Read written data within a window of experiment times (see `read_sqlite`);
+        data that is still queued for writing is written first.
+        """
+
+        self.flush()
+
+        return read_sqlite(self.path, start=start, stop=stop, columns=columns)
+
+    def __repr__(self):
+        return "SQLiteWriter"
+
+
+# Supported data formats for saving experiment data
+writers = {
+    "csv": CSVWriter,
+    "parquet": ParquetWriter,
+    "arrow": ArrowWriter,
+    "hdf5": HDF5Writer,
+    "sqlite": SQLiteWriter,
+}
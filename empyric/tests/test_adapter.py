@@ -1,5 +1,6 @@
 # Tests for adapters
 
+import asyncio
 import sys
 import importlib
 
@@ -32,3 +33,146 @@ def test_phidget():
     Phidget = importlib.import_module("empyric.adapters").Phidget
 
     assert Phidget.lib is not None
+
+
+def test_socket_async():
+    asyncio = importlib.import_module("asyncio")
+    socket = importlib.import_module("socket")
+    threading = importlib.import_module("threading")
+
+    BrainboxesED549 = importlib.import_module("empyric.collection.io").BrainboxesED549
+
+    # Simulated analog input gateway, answering queries of channel n with n + 0.5
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+
+    def handle(connection):
+        with connection:
+            buffer = b""
+            while True:
+                data = connection.recv(1024)
+                if not data:
+                    break
+
+                buffer += data
+                while b"\r" in buffer:
+                    command, buffer = buffer.split(b"\r", 1)
+                    channel = int(command[3:4])
+                    connection.sendall(b">+%02d.500\r" % channel)
+
+    def serve():
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:  # server closed
+                break
+
+            threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+
+    instrument = BrainboxesED549(address=f"127.0.0.1::{port}")
+
+    assert instrument.measure("analog_in1") == 1.5
+
+    async def measure_all():
+        measurements = await asyncio.gather(
+            *[instrument.measure_async(f"analog_in{n}") for n in range(4)]
+        )
+
+        # synchronous calls from other threads are run in the event loop
+        measurement = await asyncio.to_thread(instrument.measure, "analog_in2")
+
+        # bytes received after the end of a response are kept for the next read
+        await instrument.adapter.write_async("#010\r#011")
+
+        responses = [await instrument.adapter.read_async() for _ in range(2)]
+
+        return measurements, measurement, responses
+
+    measurements, measurement, responses = asyncio.run(measure_all())
+
+    assert measurements == [0.5, 1.5, 2.5, 3.5]
+    assert measurement == 2.5
+    assert responses == [">+00.500", ">+01.500"]
+    assert instrument.adapter.event_loop is not None
+
+    # once the event loop has stopped, the adapter reconnects synchronously
+    assert instrument.measure("analog_in3") == 3.5
+    assert instrument.adapter.event_loop is None
+
+    instrument.adapter.disconnect()
+    server.close()
+
+
+def test_adaptive_delay():
+    time = importlib.import_module("time")
+
+    adapters = importlib.import_module("empyric.adapters")
+    Instrument = importlib.import_module("empyric.collection.instrument").Instrument
+
+    class SlowAdapter(adapters.Adapter):
+        """Simulated adapter for an instrument that responds after 5 ms"""
+
+        delay = 0.2
+
+        def connect(self):
+            self._response_time = None
+            self.connected = True
+
+        def _write(self, message):
+            self._response_time = time.perf_counter() + 5e-3
+            return "Success"
+
+        def _read(self):
+            return "response"
+
+        def _query(self, question):
+            self._write(question)
+            self._wait_for_response()
+            return self._read()
+
+        @property
+        def in_waiting(self):
+            if self._response_time and time.perf_counter() > self._response_time:
+                return 8
+            return 0
+
+    instrument = Instrument(adapter=SlowAdapter, adaptive_delay=True)
+
+    start = time.perf_counter()
+    for _ in range(10):
+        assert instrument.query("question?") == "response"
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 10 * SlowAdapter.delay / 2
+    assert 5e-3 < instrument.adapter.latency < 0.1
+
+    instrument.adapter.adaptive_delay = False
+
+    start = time.perf_counter()
+    instrument.query("question?")
+
+    assert time.perf_counter() - start >= SlowAdapter.delay
+
+    # the async wait polls in the same way without blocking the event loop
+    instrument.adapter.adaptive_delay = True
+
+    async def query_async():
+        instrument.adapter._write("question?")
+        await instrument.adapter._wait_for_response_async()
+
+    start = time.perf_counter()
+    asyncio.run(query_async())
+
+    assert time.perf_counter() - start < SlowAdapter.delay / 2
+
+    # adapters that cannot tell whether a response is waiting keep the fixed delay
+    del SlowAdapter.in_waiting
+
+    instrument = Instrument(adapter=SlowAdapter, adaptive_delay=True)
+
+    start = time.perf_counter()
+    instrument.query("question?")
+
+    assert time.perf_counter() - start >= SlowAdapter.delay
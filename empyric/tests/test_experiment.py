@@ -3,10 +3,22 @@
 import os
 import time
 import glob
-from empyric.variables import Knob, Meter
+import datetime
+import importlib
+import threading
+
+import numpy as np
+import pytest
+
+import pandas as pd
+from empyric.variables import Knob, Meter, Expression, Parameter
 from empyric.experiment import Experiment, validate_runcard, Manager
+from empyric.experiment import dependency_waves
 from empyric.routines import Timecourse
-from empyric.instruments import Echo
+from empyric.instruments import Echo, measurer
+from empyric.storage import ColumnarStore, ArrayStore, SQLiteWriter, read_sqlite
+from empyric.storage import writers
+from empyric.types import Float, String, Array
 
 
 def test_experiment(tmp_path):
@@ -47,6 +59,50 @@ def test_experiment(tmp_path):
 
     assert any(glob.glob("data_*.csv"))
 
+    # all states are saved exactly once, upon termination
+    saved_data = pd.read_csv(glob.glob("data_*.csv")[0], index_col=0)
+
+    assert len(saved_data) == experiment.data.appended
+    assert list(saved_data.columns) == ["Time", "Echo In", "Echo Out"]
+
+
+@pytest.mark.parametrize("data_format", ["csv", "parquet"])
+def test_save_after_terminate(tmp_path, data_format):
+    """
+    Test that saving after termination leaves the completed data file alone
+    """
+
+    writer_class = writers[data_format]
+
+    if writer_class.lib != "python":
+        try:
+            importlib.import_module(writer_class.lib or "")
+        except (ImportError, ValueError) as err:
+            pytest.skip(f"unable to import library for {data_format} format: {err}")
+
+    os.chdir(str(tmp_path))
+
+    echo = Echo()
+
+    variables = {"Echo Out": Meter(instrument=echo, meter="output")}
+
+    experiment = Experiment(variables, end=0.2, data_format=data_format)
+
+    for _ in experiment:
+        time.sleep(0.01)
+
+    writer = experiment._writer
+
+    assert writer.closed
+
+    # a step which was in progress upon termination
+    experiment.data.append(datetime.datetime.now(), experiment.state)
+
+    experiment.save()
+
+    assert experiment._writer is writer
+    assert len(glob.glob("data_*")) == 1
+
 
 # Use Henon runcard example for testing
 tests_dir = os.path.dirname(__file__)
@@ -69,6 +125,24 @@ def test_runcard_validation():
     assert validate_runcard(test_runcard_path)
 
 
+# Example runcards shipped with the repository (absent from installed packages)
+example_runcard_paths = sorted(
+    glob.glob(
+        os.path.join(tests_dir, "..", "..", "examples", "**", "*.yaml"),
+        recursive=True,
+    )
+)
+
+
+@pytest.mark.parametrize(
+    "runcard_path",
+    example_runcard_paths,
+    ids=[os.path.basename(path) for path in example_runcard_paths],
+)
+def test_example_runcard_validation(runcard_path):
+    assert validate_runcard(runcard_path)
+
+
 def test_manager(tmp_path):
     manager = Manager(test_runcard_path)
 
@@ -82,3 +156,382 @@ def test_manager(tmp_path):
     manager.run(directory=tmp_path)
 
     assert manager.experiment.terminated
+
+
+def test_columnar_store():
+    """
+    Test storage.ColumnarStore
+    """
+
+    store = ColumnarStore(["Time", "x", "label"], chunk_size=4, max_rows=10)
+
+    start = datetime.datetime.now()
+
+    for i in range(25):
+        store.append(
+            start + datetime.timedelta(seconds=i),
+            {"Time": float(i), "x": i if i % 5 else None, "label": f"step {i}"},
+        )
+
+    # ring buffer keeps at least the 10 most recent rows, in whole chunks
+    assert store.appended == 25
+    assert 10 <= len(store) < 10 + store.chunk_size
+
+    data = store.dataframe
+
+    assert list(data.columns) == ["Time", "x", "label"]
+    assert data["Time"].iloc[-1] == 24.0
+    assert data["label"].iloc[-1] == "step 24"
+    assert data["x"].iloc[-5] is None  # missing value at step 20
+
+    # only rows after a given position are returned
+    assert list(store.since(22)["Time"]) == [22.0, 23.0, 24.0]
+
+    # windows are found across chunks, among the rows still held
+    assert list(store.window(13.5, 16)["Time"]) == [14.0, 15.0, 16.0]
+    assert list(store.window(19, 20.5)["Time"]) == [19.0, 20.0]
+    assert list(store.window(23.5)["Time"]) == [24.0]
+    assert len(store.window(30)) == 0
+    assert store.window(stop=3).empty  # rows no longer held
+
+
+@pytest.mark.parametrize("data_format", ["parquet", "arrow", "hdf5"])
+def test_binary_writers(tmp_path, data_format):
+    """
+    Test the binary file formats for saving experiment data
+    """
+
+    writer_class = writers[data_format]
+
+    try:
+        importlib.import_module(writer_class.lib or "")
+    except (ImportError, ValueError) as err:
+        pytest.skip(f"unable to import library for {data_format} format: {err}")
+
+    columns = ["Time", "Value", "Spectrum"]
+
+    start = datetime.datetime(2024, 1, 1)
+
+    path = os.path.join(str(tmp_path), "data" + writer_class.extension)
+
+    writer = writer_class(path, columns)
+
+    for i in range(5):
+        writer.write(
+            pd.DataFrame(
+                {
+                    "Time": [float(i)],
+                    "Value": [None if i == 2 else i / 2],
+                    "Spectrum": [np.arange(3.0) + i],
+                },
+                index=[start + datetime.timedelta(seconds=i)],
+                dtype=object,
+            )
+        )
+
+    writer.close()
+
+    if data_format == "hdf5":
+        import h5py
+
+        with h5py.File(path, "r") as file:
+            assert len(file["index"]) == 5
+            assert list(file["valid"]["Value"]) == [True, True, False, True, True]
+            assert list(file["data"]["Spectrum"][4]) == [4.0, 5.0, 6.0]
+    else:
+        import pyarrow
+        from pyarrow import parquet, ipc
+
+        if data_format == "parquet":
+            table = parquet.read_table(path)
+        else:
+            table = ipc.open_stream(pyarrow.memory_map(path)).read_all()
+
+        assert table.num_rows == 5
+        assert table.column("Value").to_pylist() == [0.0, 0.5, None, 1.5, 2.0]
+        assert table.column("Spectrum").to_pylist()[4] == [4.0, 5.0, 6.0]
+
+
+def test_array_store(tmp_path):
+    """
+    Test storage of array data in an array store
+    """
+
+    store = ArrayStore(os.path.join(str(tmp_path), "arrays"), chunk_size=100)
+
+    arrays = [np.arange(10.0) * i for i in range(5)] + [np.ones((2, 3), dtype=int)]
+
+    references = [store.append(array) for array in arrays]
+
+    # arrays are split across chunks, and read back as memory maps
+    assert len(glob.glob(os.path.join(str(tmp_path), "arrays", "chunk_*.bin"))) > 1
+
+    for array, reference in zip(arrays, references):
+        assert isinstance(reference.value, np.memmap)
+        assert np.array_equal(np.asarray(reference), array)
+        assert reference.value.dtype == array.dtype
+
+    store.close()
+
+    # reopen the store
+    reopened = ArrayStore(os.path.join(str(tmp_path), "arrays"))
+
+    assert len(reopened) == len(arrays)
+    assert np.array_equal(reopened[3], arrays[3])
+
+    reopened.append(np.zeros(4))
+
+    assert len(reopened) == len(arrays) + 1
+
+    reopened.close()
+
+
+def test_sqlite_writer(tmp_path):
+    """
+    Test saving experiment data to an SQLite database
+    """
+
+    columns = ["Time", "Value", "Label", "Spectrum"]
+
+    types = {"Time": Float, "Value": Float, "Label": String, "Spectrum": Array}
+
+    path = os.path.join(str(tmp_path), "data.db")
+
+    writer = SQLiteWriter(path, columns, types=types)
+
+    start = datetime.datetime(2024, 1, 1)
+
+    for i in range(10):
+        writer.write(
+            pd.DataFrame(
+                {
+                    "Time": [float(i)],
+                    "Value": [None if i == 2 else i / 2],
+                    "Label": [f"step {i}"],
+                    "Spectrum": [np.arange(3.0) + i],
+                },
+                index=[start + datetime.timedelta(seconds=i)],
+                dtype=object,
+            )
+        )
+
+    # query a window of experiment times while the writer is open
+    window = writer.window(3, 5)
+
+    assert list(window["Time"]) == [3.0, 4.0, 5.0]
+    assert window.index[0] == start + datetime.timedelta(seconds=3)
+
+    writer.close()
+
+    data = read_sqlite(path)
+
+    assert len(data) == 10
+    assert np.isnan(data["Value"].iloc[2])
+    assert data["Label"].iloc[9] == "step 9"
+    assert np.array_equal(data["Spectrum"].iloc[9], np.arange(3.0) + 9)
+
+    # windows of data in memory
+    store = ColumnarStore(columns, chunk_size=4)
+
+    for i, (index, row) in enumerate(data.iterrows()):
+        store.append(index, row)
+
+    assert list(store.window(2.5, 7)["Time"]) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert list(store.window(stop=1)["Time"]) == [0.0, 1.0]
+
+
+def test_dependency_waves():
+    """
+    Test ordering of expression evaluation
+    """
+
+    echo = Echo()
+
+    variables = {"Echo Out": Meter(instrument=echo, meter="output")}
+    variables["Sum"] = Expression(
+        expression="x + y", definitions={"x": variables["Echo Out"]}
+    )
+    variables["Double"] = Expression(
+        expression="2 * x", definitions={"x": variables["Echo Out"]}
+    )
+    variables["Sum"].definitions["y"] = variables["Double"]
+
+    experiment = Experiment(variables)
+
+    assert experiment._waves == [["Echo Out"], ["Double"], ["Sum"]]
+
+    echo.set("input", 2.0)
+
+    next(experiment)
+
+    assert experiment.state["Sum"] == 6.0
+
+    experiment.terminate()
+
+    # circular dependencies
+    assert dependency_waves({"a": [], "b": ["a"], "c": ["b"]}) == [["a"], ["b"], ["c"]]
+
+    with pytest.raises(ValueError):
+        dependency_waves({"a": ["c"], "b": ["a"], "c": ["b"], "d": []})
+
+
+def test_terminate_during_step(tmp_path):
+    """
+    Test terminating an experiment from another thread in the middle of a step
+    """
+
+    os.chdir(str(tmp_path))
+
+    class SlowEcho(Echo):
+        name = "SlowEcho"
+
+        @measurer
+        def measure_output(self) -> Float:
+            time.sleep(0.02)
+            return self.input
+
+    for delay in np.linspace(0.0, 0.1, 10):
+        echo = Echo()
+        slow_echo = SlowEcho()
+
+        variables = {
+            "Echo Out": Meter(instrument=echo, meter="output"),
+            "Slow Echo Out": Meter(instrument=slow_echo, meter="output"),
+        }
+
+        variables["Sum"] = Expression(
+            expression="x + y",
+            definitions={"x": variables["Echo Out"], "y": variables["Slow Echo Out"]},
+        )
+
+        experiment = Experiment(variables)
+
+        errors = []
+
+        def run():
+            try:
+                for _ in experiment:
+                    pass
+            except Exception as error:
+                errors.append(error)
+
+        runner = threading.Thread(target=run)
+        runner.start()
+
+        time.sleep(delay)
+        experiment.terminate()
+
+        runner.join(timeout=5)
+
+        assert not runner.is_alive()
+        assert errors == []
+
+        # worker pools are shut down once the last step is over
+        assert experiment._executors == {}
+
+
+def test_measure_many():
+    """
+    Test measuring the meters of an instrument together
+    """
+
+    echo = Echo()
+
+    calls = []
+
+    def measure_many(meters):
+        calls.append(meters)
+        return Echo.measure_many(echo, meters)
+
+    echo.measure_many = measure_many
+
+    gate = Parameter(parameter=True)
+
+    variables = {
+        "Echo In": Knob(instrument=echo, knob="input"),
+        "Echo Out": Meter(instrument=echo, meter="output"),
+        "Double Echo Out": Meter(instrument=echo, meter="output", multiplier=2),
+        "Gated Echo Out": Meter(instrument=echo, meter="output", gate=gate),
+    }
+
+    experiment = Experiment(variables)
+
+    echo.set("input", 3.0)
+
+    next(experiment)
+
+    # each meter is measured once per step, in a single call
+    assert calls == [["output"]]
+    assert experiment.state["Double Echo Out"] == 6.0
+    assert experiment.state["Gated Echo Out"] == 3.0
+
+    gate.value = False
+
+    next(experiment)
+
+    assert experiment.state["Echo Out"] == 3.0
+    assert experiment.state["Gated Echo Out"] is None
+
+    experiment.terminate()
+
+
+def test_measure_many_failure():
+    """
+    Test that a failed measurement does not affect the other meters measured with it
+    """
+
+    class FaultyEcho(Echo):
+        name = "FaultyEcho"
+
+        meters = ("output", "fault")
+
+        @measurer
+        def measure_fault(self) -> Float:
+            raise ValueError("faulty meter")
+
+    echo = FaultyEcho()
+
+    echo.set("input", 3.0)
+
+    assert echo.measure_many(["fault", "output"]) == {"fault": None, "output": 3.0}
+
+    variables = {
+        "Echo Out": Meter(instrument=echo, meter="output"),
+        "Fault": Meter(instrument=echo, meter="fault"),
+    }
+
+    experiment = Experiment(variables)
+
+    next(experiment)
+
+    assert experiment.status != Experiment.TERMINATED
+    assert experiment.state["Echo Out"] == 3.0
+    assert experiment.state["Fault"] is None
+
+    experiment.terminate()
+
+
+def test_worker_pools():
+    """
+    Test that instruments get their own worker pools, whatever their names
+    """
+
+    echoes = [Echo(), Echo(), Echo()]
+
+    echoes[0].name = echoes[1].name = "Echo"
+    echoes[2].name = "variables"
+
+    variables = {
+        f"Echo Out {i}": Meter(instrument=echo, meter="output")
+        for i, echo in enumerate(echoes)
+    }
+    variables["x"] = Parameter(parameter=1.0)
+
+    experiment = Experiment(variables)
+
+    next(experiment)
+
+    assert all(echo in experiment._executors for echo in echoes)
+    assert len(experiment._executors) == 4  # including the "variables" pool
+
+    experiment.terminate()
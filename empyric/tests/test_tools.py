@@ -0,0 +1,159 @@
+# Tests for tools
+
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from empyric.tools import MessageScanner, SocketConnection
+from empyric.tools import read_from_socket, write_to_socket
+from empyric.tools import pack_values, read_values
+from empyric.types import ON, Toggle
+
+
+def test_read_from_socket():
+    sender, receiver = socket.socketpair()
+
+    with sender, receiver:
+        # several messages arriving together are read one at a time
+        sender.sendall(b"first\rsecond\rthi")
+
+        assert read_from_socket(receiver, timeout=1) == "first"
+        assert read_from_socket(receiver, timeout=1) == "second"
+
+        sender.sendall(b"rd\r")
+        assert read_from_socket(receiver, timeout=1) == "third"
+
+        # large messages, with multi-byte terminations split between chunks
+        payload = bytes(range(256)) * 40000
+
+        writer = threading.Thread(
+            target=write_to_socket, args=(sender, payload, "\r\n\r\n")
+        )
+        writer.start()
+
+        message = read_from_socket(
+            receiver, termination=b"\r\n\r\n", decode=False, chunk_size=4095
+        )
+        writer.join()
+
+        assert message == payload + b"\r\n\r\n"
+
+        # fixed number of bytes, and callable termination
+        sender.sendall(b"0123456789")
+        assert read_from_socket(receiver, nbytes=4, termination=None) == "0123"
+
+        def is_terminated(message):
+            return message.endswith(b"9")
+
+        assert read_from_socket(receiver, termination=is_terminated) == "456789"
+
+        # incomplete messages are returned once the timeout expires
+        sender.sendall(b"incomplete")
+        assert read_from_socket(receiver, timeout=0.1) == "incomplete"
+
+
+def test_message_scanner():
+    # terminations split between received parts are found
+    scanner = MessageScanner(termination="\r\n", buffer=bytearray(b"fir"))
+
+    assert scanner.end is None
+    assert scanner.feed(b"st\r") is None
+    assert scanner.feed(b"\nsec") == 7
+    assert scanner.split() == ("first", bytearray(b"sec"))
+
+    # messages end after nbytes, unless terminated before
+    scanner = MessageScanner(nbytes=4, termination=None)
+
+    assert scanner.remaining(3) == 3
+    assert scanner.feed(b"012345") == 4
+    assert scanner.split(decode=False) == (b"0123", bytearray(b"45"))
+
+    scanner = MessageScanner(nbytes=4, termination=lambda message: b"!" in message)
+
+    assert scanner.feed(b"ab!") == 3
+
+    with pytest.raises(ValueError):
+        MessageScanner(termination=None)
+
+
+def test_socket_connection(monkeypatch):
+    settimeout_calls = []
+
+    def settimeout(_socket, timeout):
+        settimeout_calls.append(timeout)
+        original_settimeout(_socket, timeout)
+
+    original_settimeout = socket.socket.settimeout
+    monkeypatch.setattr(socket.socket, "settimeout", settimeout)
+
+    sender, receiver = socket.socketpair()
+
+    with sender, receiver:
+        outgoing = SocketConnection(sender, timeout=1)
+        incoming = SocketConnection(receiver, timeout=1)
+
+        # messages and terminations are sent together, and the socket timeout is
+        # only set when a different one is requested
+        for i in range(100):
+            outgoing.write(f"query {i}")
+            assert incoming.read() == f"query {i}"
+
+        assert settimeout_calls == [1, 1]  # once for each socket
+
+        outgoing.write(b"value", termination=b"\r\n")
+        assert incoming.read(termination="\r\n", timeout=0.5) == "value"
+        assert incoming.read(timeout=0.5) == ""
+        assert settimeout_calls == [1, 1, 0.5]
+
+        # leftover bytes are kept by the connection
+        outgoing.write("first\rsecond")
+        assert incoming.read() == "first"
+        assert incoming.read(decode=False) == b"second\r"
+
+
+def test_pack_values():
+    values = {
+        "toggle": ON,
+        "boolean": True,
+        "integer": np.int64(-3),
+        "float": 2.5,
+        "complex": 1 - 2j,
+        "string": "text",
+        "none": None,
+        "array": np.arange(6.0).reshape(2, 3),
+        "list": [1, 2, 3],
+        "strings": np.array(["a", "bc"]),
+    }
+
+    sender, receiver = socket.socketpair()
+
+    with sender, receiver:
+        connection = SocketConnection(receiver, timeout=1)
+
+        sender.sendall(pack_values(values) + b"\r" + b"next\r")
+
+        received = read_values(connection)
+
+        # bytes after the frame are left for the next read
+        assert connection.read() == "next"
+
+    assert list(received) == list(values)
+
+    for name, value in values.items():
+        np.testing.assert_array_equal(received[name], value)
+
+    assert type(received["toggle"]) is Toggle
+    assert isinstance(received["integer"], np.int64)
+    assert received["array"].flags.writeable
+    assert received["array"].flags.aligned
+
+    # text responses, such as errors, are raised
+    sender, receiver = socket.socketpair()
+
+    with sender, receiver:
+        sender.sendall(b"Error: invalid request @got\r")
+
+        with pytest.raises(ValueError, match="invalid request"):
+            read_values(SocketConnection(receiver, timeout=1))
@@ -1,5 +1,19 @@
+import importlib
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+import pytest
+
 from empyric.instruments import Clock
-from empyric.variables import Knob, Meter, Parameter, Expression
+from empyric.routines import ModbusServer, SocketServer
+from empyric.tools import read_from_socket
+from empyric.storage import ArrayStore
+from empyric.types import Array, Float, Integer, ON
+from empyric.variables import Knob, Meter, Parameter, Expression, Remote
+from empyric.variables import _ServerConnection
 
 
 def test_variable():
@@ -24,3 +38,539 @@ def test_variable():
     assert test_meter.value == 0
     assert test_parameter.value == 5
     assert test_expression.value == 5
+
+
+def test_expression():
+    """
+    Test evaluation of compiled expressions
+    """
+
+    x = Parameter(parameter=np.arange(8.0))
+    y = Parameter(parameter=2.0)
+
+    expression = Expression(
+        expression="max(x)^y + sum(x)", definitions={"x": x, "y": y}
+    )
+
+    assert expression.value == 49.0 + 28.0
+
+    y.value = 3.0
+
+    assert expression.value == 343.0 + 28.0
+
+    # expressions are recompiled upon assignment
+    expression.expression = "np.real(ifft(fft(x)))[3] * y"
+
+    assert np.isclose(expression.value, 9.0)
+
+    # invalid expressions evaluate to None
+    expression.expression = "x +"
+
+    assert expression.value is None
+
+
+def test_numexpr_backend():
+    """
+    Test evaluation of expressions with NumExpr
+    """
+
+    pytest.importorskip("numexpr")
+
+    x = Parameter(parameter=np.linspace(0, 1, 10001))
+    y = Parameter(parameter=2.0)
+
+    expression = Expression(
+        expression="sqrt(x^2 + y) * sin(x)",
+        definitions={"x": x, "y": y},
+        backend="numexpr",
+    )
+
+    assert np.allclose(expression.value, np.sqrt(x.value**2 + 2.0) * np.sin(x.value))
+
+    # unsupported functions fall back on numpy
+    expression = Expression(
+        expression="abs(fft(x))[0]", definitions={"x": x}, backend="numexpr"
+    )
+
+    assert np.isclose(expression.value, np.mean(x.value))
+
+
+def test_expression_validation():
+    """
+    Test validation of the values of the variables in expression definitions
+    """
+
+    x = Parameter(parameter=np.arange(5.0))
+    label = Parameter(parameter="label")
+
+    expression = Expression(expression="sum(x)", definitions={"x": x, "s": label})
+
+    assert expression.value == 10.0
+
+    for invalid_value in [np.array([0.0, np.nan]), np.array([np.inf, 1.0]), np.nan]:
+        x._value = invalid_value  # bypass type validation
+        assert expression.value is None
+
+    x._value = [1.0, None]
+    assert expression.value is None
+
+    # validity of array values is cached until the variable is evaluated again
+    meter = Expression(expression="x * 1", definitions={"x": x})
+    x._value = np.arange(3.0)
+
+    expression = Expression(expression="sum(y)", definitions={"y": meter})
+
+    meter.value
+    assert expression.value == 3.0
+    assert expression._validity["y"][1] == meter.last_evaluation
+
+
+def test_expression_filters():
+    """
+    Test the stateful filter functions of expressions
+    """
+
+    x = Parameter(parameter=1.0)
+
+    rolling = Expression(expression="rolling_mean(x, 3)", definitions={"x": x})
+    decimated = Expression(expression="decimate(x, 2)", definitions={"x": x})
+    smoothed = Expression(expression="ema(x, 1e6)", definitions={"x": x})
+
+    # each call of a filter function has its own history
+    twice = Expression(
+        expression="rolling_mean(x, 2) - rolling_mean(2 * x, 2)",
+        definitions={"x": x},
+    )
+
+    results = []
+    for value in [1.0, 2.0, 3.0, 4.0]:
+        x.value = value
+        results.append((rolling.value, decimated.value, smoothed.value, twice.value))
+
+    assert [result[0] for result in results] == [1.0, 1.5, 2.0, 3.0]
+    assert [result[1] for result in results] == [None, 1.5, None, 3.5]
+    assert [result[3] for result in results] == [-1.0, -1.5, -2.5, -3.5]
+
+    # with a very long time constant, the average barely moves
+    assert all(result[2] == pytest.approx(1.0, abs=1e-3) for result in results)
+
+    # filters apply elementwise to arrays
+    y = Parameter(parameter=np.zeros(3))
+    rolling = Expression(expression="rolling_mean(y, 2)", definitions={"y": y})
+
+    rolling.value
+    y.value = np.ones(3)
+
+    np.testing.assert_array_equal(rolling.value, 0.5 * np.ones(3))
+
+    # a new expression gets new filters, without the history of the previous ones
+    previous_filter = rolling._namespace["_filter_0"]
+
+    rolling.expression = "y + 0"
+
+    assert "_filter_0" not in rolling._namespace
+
+    rolling.expression = "rolling_mean(y, 2)"
+
+    assert rolling._namespace["_filter_0"] is not previous_filter
+    np.testing.assert_array_equal(rolling.value, np.ones(3))
+
+    # the values of the definitions are not stored in the shared namespace
+    assert "y" not in rolling._namespace
+
+
+def test_demodulation():
+    """
+    Test demodulation of an amplitude modulated signal, as a whole and in
+    partitions
+    """
+
+    dt = 1e-6
+    t = dt * np.arange(10000)
+
+    envelope = 1.0 + 0.5 * np.sin(2 * np.pi * 1e3 * t)
+    signal = envelope * np.cos(2 * np.pi * 5e4 * t + 0.3)
+
+    assert Expression.carrier(signal, dt, 5e4, 2e4) == pytest.approx(5e4)
+
+    demodulated = Expression.demod(signal, dt, 5e4, bw=2e4)
+
+    np.testing.assert_allclose(demodulated[1000:-1000], envelope[1000:-1000], atol=0.02)
+
+    # 20 cycles of the carrier per partition
+    demodulated = Expression.demod(signal, dt, 5e4, bw=2e4, cycles=20)
+
+    assert len(demodulated) == 10400  # partitions are padded with zeros
+    assert np.mean(demodulated[:10000]) == pytest.approx(np.mean(envelope), abs=0.05)
+
+
+def test_fft_cache():
+    """
+    Test sharing of Fourier transforms between expressions within an experiment
+    step
+    """
+
+    dt = 1e-6
+    signal = Parameter(parameter=np.cos(2 * np.pi * 5e4 * dt * np.arange(1000)))
+
+    ratio = Expression(
+        expression="ampl(s, 1e-6) / carrier(s, 1e-6)", definitions={"s": signal}
+    )
+    demodulated = Expression(
+        expression="demod(s, 1e-6, 5e4, 2e4)", definitions={"s": signal}
+    )
+
+    with Expression.fft_cache() as cache:
+        assert ratio.value == pytest.approx(1.0 / 5e4)
+        np.testing.assert_allclose(demodulated.value, 1.0, atol=1e-6)
+
+        assert len(cache) == 1  # one FFT of the signal
+
+        # the cache is not seen by threads outside of the current context
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(Expression._fft_cache.get())
+        )
+        thread.start()
+        thread.join()
+
+        assert other == [None]
+
+    assert Expression._fft_cache.get() is None
+
+    # without the cache, signals modified in place are transformed again
+    spectrum = Expression.fft(signal.value)
+    signal.value[:] = 0.0
+
+    assert np.all(Expression.fft(signal.value) == 0.0)
+    assert np.any(spectrum != 0.0)
+
+
+def test_remote():
+    """Test remote variables sharing a connection to a socket server"""
+
+    x = Parameter(parameter=1.5)
+    n = Parameter(parameter=3)
+
+    server = SocketServer(knobs={"x": x, "n": n})
+
+    try:
+        server.update({"Time": 0.0, "x": 1.5, "n": 3, "y": 7.0})
+
+        address = f"{server.ip_address}::{server.port}"
+
+        remote_x = Remote(address, "x")
+        remote_n = Remote(address, "n")
+        remote_y = Remote(address, "y")
+
+        connection = remote_x._connection
+
+        assert remote_n._connection is connection
+        assert remote_y._connection is connection
+        assert connection.users == 3
+
+        # types and settability are obtained in the handshake
+        assert connection.info["y"] == (False, Float)
+        assert (remote_x.settable, remote_x.type) == (True, Float)
+        assert (remote_n.settable, remote_n.type) == (True, Integer)
+
+        assert remote_x.value == 1.5
+
+        remote_n.value = 5
+        assert n.value == 5
+
+        # pipelined requests are answered together, in order
+        assert connection.request("n ?", "x ?", "y ?") == ["n 5", "x 1.5", "y 7.0"]
+
+        # values of several variables in one exchange
+        assert Remote.fetch_many([remote_y, remote_x, remote_n]) == [7.0, 1.5, 5]
+
+        remote_z = Remote(address, "y", multiplier=2)
+
+        assert remote_z.value == 14.0
+
+        # values that cannot be retrieved are None
+        def get_values(aliases):
+            raise OSError("connection lost")
+
+        connection.get_values = get_values
+
+        assert Remote.fetch_many([remote_y, remote_x]) == [None, None]
+
+        # as is the value of a single variable, instead of its last value
+        assert remote_z.value is None
+
+        del connection.get_values, remote_z
+
+        Remote.set_many([remote_x, remote_n], [2.5, 6])
+        assert (x.value, n.value) == (2.5, 6)
+
+        snapshot = Remote.snapshot(address)
+        assert snapshot == {"x": 2.5, "n": 6, "Time": 0.0, "y": 7.0}
+        assert isinstance(snapshot["n"], np.int64)
+
+        del remote_x, remote_n, remote_y
+
+        assert connection.users == 0
+        assert address not in _ServerConnection._pool
+
+    finally:
+        server.terminate()
+
+
+def test_remote_array(tmp_path):
+    """Test transferring arrays from a socket server to remote variables"""
+
+    store = ArrayStore(str(tmp_path / "arrays"))
+
+    waveform = np.linspace(0, 1, 1000).reshape(10, 100)
+    counts = np.arange(10, dtype=np.uint16)
+
+    server = SocketServer(knobs={})
+
+    try:
+        server.update(
+            {"Time": 0.0, "waveform": store.append(waveform), "counts": counts}
+        )
+
+        address = f"{server.ip_address}::{server.port}"
+
+        remote_waveform = Remote(address, "waveform")
+        remote_counts = Remote(address, "counts")
+
+        assert remote_waveform.type == Array
+
+        value = remote_waveform.value
+
+        assert np.array_equal(value, waveform)
+        assert value.dtype == waveform.dtype and value.flags.writeable
+
+        assert np.array_equal(remote_counts.value, counts)
+        assert remote_counts.value.dtype == np.uint16
+
+        del remote_waveform, remote_counts
+
+    finally:
+        server.terminate()
+        store.close()
+
+
+def test_remote_subscription():
+    """Test remote variables with values pushed by a socket server"""
+
+    server = SocketServer(knobs={})
+
+    def wait_for(condition, timeout=5):
+        start = time.perf_counter()
+
+        while not condition() and time.perf_counter() - start < timeout:
+            time.sleep(0.01)
+
+        return condition()
+
+    try:
+        server.update({"Time": 0.0, "x": 1.0, "y": 2.0})
+
+        address = f"{server.ip_address}::{server.port}"
+
+        remote_x = Remote(address, "x", subscribe=True, deadband=0.5)
+        remote_y = Remote(address, "y", subscribe=True, interval=0.2)
+
+        connection = remote_x._connection
+
+        assert remote_x.subscribed and remote_y.subscribed
+        assert connection.cache == {"x": 1.0, "y": 2.0}
+
+        # values are pushed by the server upon updates
+        server.update({"Time": 1.0, "x": 3.0, "y": 2.0})
+
+        assert wait_for(lambda: connection.cache["x"] == 3.0)
+        assert remote_x.value == 3.0
+
+        # changes within the deadband are not pushed
+        server.update({"Time": 2.0, "x": 3.2, "y": 2.0})
+        server.update({"Time": 3.0, "x": 3.2, "y": 4.0})
+
+        assert wait_for(lambda: connection.cache["y"] == 4.0)
+        assert remote_x.value == 3.0
+
+        # changes within the interval are pushed together at its end
+        start = time.perf_counter()
+
+        server.update({"Time": 4.0, "x": 3.2, "y": 5.0})
+        server.update({"Time": 5.0, "x": 3.2, "y": 6.0})
+
+        assert wait_for(lambda: connection.cache["y"] == 6.0)
+        assert time.perf_counter() - start > 0.1
+
+        # the interval of one variable does not delay the others
+        server.update({"Time": 6.0, "x": 5.0, "y": 7.0})
+
+        assert wait_for(lambda: connection.cache["x"] == 5.0)
+        assert connection.cache["y"] == 6.0
+        assert wait_for(lambda: connection.cache["y"] == 7.0)
+
+        # subscribed values are taken from the cache
+        assert Remote.fetch_many([remote_x, remote_y]) == [5.0, 7.0]
+
+        with pytest.raises(ValueError, match="cannot be zero"):
+            Remote(address, "x", subscribe=True, deadband=0.5, multiplier=0)
+
+        subscriptions = server.subscriptions
+
+        del remote_x, remote_y
+
+        assert not connection.pushing
+        assert wait_for(lambda: not subscriptions)
+
+    finally:
+        server.terminate()
+
+
+def test_socket_server():
+    """Test serving many clients at once"""
+
+    class SlowKnob:
+        """Knob of an instrument that takes 0.5 seconds to respond"""
+
+        settable = True
+        _type = Float
+
+        @property
+        def value(self):
+            time.sleep(0.5)
+            return 2.5
+
+    server = SocketServer(knobs={"x": Parameter(parameter=1.5), "slow": SlowKnob()})
+
+    clients = [socket.create_connection((server.ip_address, server.port), timeout=5)]
+
+    try:
+        clients += [
+            socket.create_connection((server.ip_address, server.port), timeout=5)
+            for _ in range(199)
+        ]
+
+        for client in clients:
+            client.sendall(b"x ?\r")
+
+        assert all(client.recv(16) == b"x 1.5\r" for client in clients)
+
+        # pipelined requests are answered in order
+        clients[0].sendall(b"x ?\rx settable?\r")
+
+        assert read_from_socket(clients[0]) == "x 1.5"
+        assert read_from_socket(clients[0]) == "x settable"
+
+        # a slow knob does not hold up the other clients
+        start = time.perf_counter()
+
+        clients[0].sendall(b"slow ?\r")
+        clients[1].sendall(b"x ?\r")
+
+        assert read_from_socket(clients[1]) == "x 1.5"
+        assert time.perf_counter() - start < 0.25
+
+        assert read_from_socket(clients[0]) == "slow 2.5"
+
+        server.terminate()
+
+        # clients are disconnected when the server terminates
+        assert all(client.recv(16) == b"" for client in clients)
+        assert server.clients == {}
+
+    finally:
+        server.terminate()
+
+        for client in clients:
+            client.close()
+
+
+def test_modbus_server(monkeypatch):
+    """Test storing values in the registers of a Modbus server"""
+
+    _socket = socket.socket()
+    _socket.bind(("127.0.0.1", 0))
+    port = _socket.getsockname()[1]
+    _socket.close()
+
+    x = Parameter(parameter=1.5)
+    n = Parameter(parameter=3)
+
+    server = ModbusServer(knobs={"x": x, "n": n}, address="127.0.0.1", port=port)
+
+    try:
+        server.update({"Time": 0.0, "y": 7.0, "on": ON, "text": "abc", "big": 2**70})
+
+        # each value is stored in 4 registers followed by its type code
+        assert server.slave.getValues(3, 0, 10) == (
+            np.frombuffer(struct.pack(">dhqh", 1.5, 3, 3, 2), dtype=">u2").tolist()
+        )
+
+        registers = np.frombuffer(
+            struct.pack(">dhdhQhdhdh", 0.0, 3, 7.0, 3, 1, 1, np.nan, 5, np.nan, 2),
+            dtype=">u2",
+        ).tolist()
+
+        assert server.slave.getValues(4, 0, 25) == registers
+
+        address = f"127.0.0.1::{port}"
+
+        remote_x = Remote(address, 0, protocol="modbus", settable=True)
+        remote_y = Remote(address, 5, protocol="modbus")
+
+        assert (remote_x.value, remote_y.value) == (1.5, 7.0)
+
+        # holding registers are updated when a client sets a knob
+        remote_x.value = 2.5
+
+        assert x.value == 2.5
+        assert remote_x.value == 2.5
+
+        # a single write may set several knobs
+        registers = np.frombuffer(
+            struct.pack(">dhqh", 4.5, 3, 8, 2), dtype=">u2"
+        ).tolist()
+
+        server.slave.setValues(16, 0, registers)
+
+        assert (x.value, n.value) == (4.5, 8)
+        assert server.slave.getValues(3, 0, 10) == registers
+
+        # while disabled, the server still updates the holding registers, and keeps
+        # the last enabled state in the input registers
+        input_registers = server.slave.getValues(4, 0, 25)
+
+        server.enable = "Enabled"
+        x.value = 9.5
+
+        server.update({"Time": 1.0, "Enabled": False, "y": 8.0})
+
+        assert server.slave.getValues(3, 0, 5) == (
+            np.frombuffer(struct.pack(">dh", 9.5, 3), dtype=">u2").tolist()
+        )
+        assert server.slave.getValues(4, 0, 25) == input_registers
+
+        del remote_x, remote_y
+
+    finally:
+        server.terminate()
+        server.server_thread.join()
+
+    # registers of variables cannot overlap
+    with pytest.raises(ValueError, match="registers of x at address 0 and n at"):
+        ModbusServer(knobs={"x": x, "n": n}, knob_addresses=[0, 3])
+
+    # errors upon starting the server are raised instead of hanging
+    import_module = importlib.import_module
+
+    def failing_import(name, package=None):
+        if (name, package) == (".server", "pymodbus"):
+            raise ImportError("no server module")
+
+        return import_module(name, package=package)
+
+    monkeypatch.setattr(importlib, "import_module", failing_import)
+
+    with pytest.raises(ImportError, match="no server module"):
+        ModbusServer(knobs={"x": x}, address="127.0.0.1", port=port)
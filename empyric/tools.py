@@ -1,11 +1,14 @@
 import time
-import select
 import socket
+import struct
 import numbers
+import weakref
 import logging
 import numpy as np
 import logging
 
+from empyric.types import Toggle, Boolean, Integer, Float, Complex, Array
+
 # Set up logging
 logger = logging.getLogger("empyric")
 
@@ -155,108 +158,367 @@ def autobind_socket(_socket):
     return ip_address, port
 
 
-def read_from_socket(
-    _socket, nbytes=None, termination="\r", timeout=None, decode=True, chunk_size=4096
-):
+class MessageScanner:
     """
-    Read from a socket, with some effort taken to get the whole message.
+    Incremental search for the end of a message in a growing buffer of received
+    bytes, which is only searched for the termination where new bytes arrived.
+    Used by readers of messages from sockets or streams, which feed the scanner
+    with received bytes until the end of the message is found.
 
-    :param _socket: (socket.Socket) socket to read from.
-    :param nbytes: (int) number of bytes to read; defaults to infinite.
+    :param nbytes: (int) number of bytes of the message; defaults to infinite.
     :param termination: (str/bytes/callable) if str or bytes, expected message
                         termination character(s); if callable, a function that
                         takes a message as its sole argument and returns True if
                         the message indicates that it is terminated, and False
                         otherwise.
-    :param timeout: (numbers.Number) communication timeout in seconds;
-                    used for both the `select.select` and `_socket.recv`
-                    functions; defaults to existing timeout of _socket.
-    :param decode: (bool) whether to return decoded string (True) or raw bytes
-                   message (False); defaults to True.
-    :param chunk_size: (int) number of bytes to read on each call to recv method.
+    :param buffer: (bytearray) bytes received before, e.g. left over from the
+                   previous message, which become the start of the message.
     """
 
-    default_timeout = _socket.gettimeout()  # save default timeout
+    def __init__(self, nbytes=None, termination="\r", buffer=None):
+        if nbytes is None:
+            nbytes = np.inf
 
-    if timeout is None:
-        timeout = default_timeout
+            if termination is None:
+                raise ValueError(
+                    "nbytes must be a non-negative integer if termination is None"
+                )
 
-    _socket.settimeout(timeout)
+        if isinstance(termination, str):
+            termination = termination.encode()
 
-    if nbytes is None:
-        nbytes = np.inf
+        self.nbytes = nbytes
+        self.termination = termination
 
-        if termination is None:
-            raise ValueError(
-                "nbytes must be a non-negative integer if termination is None"
-            )
+        self.message = bytearray() if buffer is None else buffer
+
+        self.searched = 0  # length of the message searched for the termination
+        self.end = None  # position of the end of the message, once found
+
+        self._scan()
+
+    def feed(self, data):
+        """
+        Append received bytes to the message, and search them for its end
+
+        :param data: (bytes/bytearray/memoryview) received bytes.
+        :return: (int/None) position of the end of the message, or None if the
+                 message is incomplete
+        """
+
+        self.message += data
+
+        return self._scan()
+
+    def remaining(self, chunk_size):
+        """Number of bytes to receive next, at most `chunk_size`"""
+
+        return int(min(chunk_size, self.nbytes - len(self.message)))
+
+    def split(self, decode=True):
+        """
+        Split the bytes received so far into the message and any bytes after its
+        end, which belong to the next message
 
-    null_responses = 0
-    max_nulls = 3
+        :param decode: (bool) whether to return the message as a decoded string
+                       (True) or raw bytes (False); defaults to True.
+        :return: (tuple) the message and a bytearray of the bytes after its end
+        """
 
-    if type(termination) == str:
-        termination = termination.encode()
+        message, leftover = self.message, bytearray()
 
-    def is_terminated(message):
-        if isinstance(termination, bytes):
-            return termination in message
-        elif callable(termination):
-            return termination(message)
+        if self.end is not None and self.end < len(message):
+            leftover = message[self.end :]
+            del message[self.end :]
+
+        if decode:
+            return message.decode().strip(), leftover
         else:
-            return False
+            return bytes(message), leftover
+
+    def _scan(self):
+        message, termination = self.message, self.termination
+
+        if self.end is None:
+            if isinstance(termination, bytes) and termination:
+                start = max(0, self.searched - len(termination) + 1)
+
+                found = message.find(termination, start)
+
+                if found >= 0:
+                    self.end = found + len(termination)
 
-    message = b""
+            elif callable(termination) and len(message) > self.searched:
+                if termination(message):
+                    self.end = len(message)
 
-    while len(message) < nbytes and null_responses < max_nulls:
-        part = b""
+        self.searched = len(message)
 
-        remaining_bytes = nbytes - len(message)
+        if len(message) >= self.nbytes:
+            nbytes = int(self.nbytes)
+            self.end = nbytes if self.end is None else min(self.end, nbytes)
 
-        # Check for readability and errors
-        if timeout:
-            rlist, _, xlist = select.select([_socket], [], [_socket], timeout)
+        return self.end
+
+    def __repr__(self):
+        return "MessageScanner"
+
+
+class SocketConnection:
+    """
+    Buffered connection through a socket, for frequent exchanges of messages.
+
+    The connection keeps track of the timeout set on the socket, so that the
+    timeout is only set again when a read or write asks for a different one, and
+    keeps any bytes received after the end of a message for the next read.
+    Messages and their terminations are sent together with a single
+    scatter-gather call where available, rather than being concatenated first.
+
+    :param _socket: (socket.Socket) connected socket.
+    :param timeout: (numbers.Number) default timeout in seconds of reads and writes;
+                    defaults to existing timeout of _socket.
+    :param chunk_size: (int) default maximum number of bytes to receive at once.
+    """
+
+    def __init__(self, _socket, timeout=None, chunk_size=65536):
+        self.socket = _socket
+
+        self._socket_timeout = _socket.gettimeout()  # timeout set on the socket
+
+        if timeout is None:
+            self.timeout = self._socket_timeout
         else:
-            rlist, _, xlist = select.select([_socket], [], [_socket])
+            self.timeout = timeout
+
+        self.chunk_size = chunk_size
+
+        self.buffer = bytearray()  # bytes received after the end of last message
+        self._chunk = None  # preallocated receive buffer
+
+    def _set_timeout(self, timeout):
+        if timeout != self._socket_timeout:
+            self.socket.settimeout(timeout)
+            self._socket_timeout = timeout
+
+    def read(
+        self, nbytes=None, termination="\r", timeout=None, decode=True, chunk_size=None
+    ):
+        """
+        Read a message, with some effort taken to get the whole message.
+
+        Received bytes are copied from a preallocated chunk into a growing message
+        buffer, which is searched for the termination only where new bytes arrived
+        (see `MessageScanner`).
+
+        :param nbytes: (int) number of bytes to read; defaults to infinite.
+        :param termination: (str/bytes/callable) if str or bytes, expected message
+                            termination character(s); if callable, a function that
+                            takes a message as its sole argument and returns True if
+                            the message indicates that it is terminated, and False
+                            otherwise.
+        :param timeout: (numbers.Number) communication timeout in seconds, for each
+                        call to the `recv_into` method of the socket; defaults to
+                        the timeout of the connection; zero means no timeout.
+        :param decode: (bool) whether to return decoded string (True) or raw bytes
+                       message (False); defaults to True.
+        :param chunk_size: (int) maximum number of bytes to read on each call to the
+                           `recv_into` method; defaults to the chunk size of the
+                           connection.
+        """
+
+        if timeout is None:
+            timeout = self.timeout
+
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+
+        scanner = MessageScanner(nbytes, termination, self.buffer)
+
+        if scanner.end is None:
+            if self._chunk is None or len(self._chunk) < chunk_size:
+                self._chunk = memoryview(bytearray(chunk_size))
+
+            chunk = self._chunk
+
+            # Zero timeout means blocking
+            self._set_timeout(timeout if timeout else None)
+
+            while scanner.end is None:
+                try:
+                    received = self.socket.recv_into(
+                        chunk, scanner.remaining(chunk_size)
+                    )
+                except (socket.timeout, BlockingIOError):
+                    break
+                except ConnectionResetError as err:
+                    print(
+                        f"Warning: while reading from socket at "
+                        f"{self.socket.getsockname()}, got error: {err}"
+                    )
+                    break
+
+                if received == 0:  # connection closed
+                    break
+
+                scanner.feed(chunk[:received])
+
+        message, self.buffer = scanner.split(decode=decode)
 
-        readable = _socket in rlist
-        in_error = _socket in xlist
+        return message
 
-        if not readable:
-            break
-        elif in_error:
-            raise ConnectionError("an exception has been raised for the socket")
+    def write(self, message, termination="\r", timeout=None):
+        """
+        Write a message, with care taken to get the whole message transmitted.
+
+        :param message: (str/bytes) message to send.
+        :param termination: (str/bytes) message termination character(s).
+        :param timeout: (numbers.Number) timeout in seconds for sending the message;
+                        defaults to the timeout of the connection; zero means no
+                        timeout.
+        """
+
+        if timeout is None:
+            timeout = self.timeout
+
+        if isinstance(message, str):
+            message = message.encode()
+        elif not isinstance(message, (bytes, bytearray, memoryview)):
+            raise ValueError("message argument must be either string or bytes")
+
+        if isinstance(termination, str):
+            termination = termination.encode()
+
+        self._set_timeout(timeout if timeout else None)
 
         try:
+            if hasattr(self.socket, "sendmsg"):
+                buffers = [memoryview(part) for part in (message, termination) if part]
+
+                while buffers:
+                    sent = self.socket.sendmsg(buffers)
+
+                    if sent == 0:
+                        raise ConnectionError("no bytes sent")
 
-            if remaining_bytes < chunk_size:
-                part = _socket.recv(remaining_bytes)
+                    # Drop what was sent and continue with the rest
+                    while buffers and sent >= len(buffers[0]):
+                        sent -= len(buffers.pop(0))
+
+                    if buffers:
+                        buffers[0] = buffers[0][sent:]
             else:
-                part = _socket.recv(chunk_size)
+                self.socket.sendall(bytes(message) + termination)
 
-        except ConnectionResetError as err:
-            print(
-                f"Warning: while reading from socket at {_socket.getsockname()}, "
-                f"got error: {err}"
-            )
-            break
-        except socket.timeout:
-            pass
+        except (socket.timeout, ConnectionError) as err:
+            raise ConnectionError(
+                f"Socket connection to {self.socket.getsockname()} is broken!"
+            ) from err
 
-        if len(part) > 0:
-            message = message + part
+        return len(message) + len(termination)
 
-            if is_terminated(message):
+    def read_into(self, buffer, timeout=None):
+        """
+        Read bytes until a buffer is filled, receiving them directly into the buffer
+
+        :param buffer: (bytearray/numpy.ndarray) writeable, contiguous buffer.
+        :param timeout: (numbers.Number) communication timeout in seconds, for each
+                        call to the `recv_into` method of the socket; defaults to
+                        the timeout of the connection; zero means no timeout.
+        :return: (int) number of bytes read, which is less than the size of the
+                 buffer only if the connection timed out or was closed
+        """
+
+        if timeout is None:
+            timeout = self.timeout
+
+        view = memoryview(buffer).cast("B")
+
+        # Start with any bytes left over from the previous read
+        filled = min(len(self.buffer), len(view))
+
+        view[:filled] = self.buffer[:filled]
+        del self.buffer[:filled]
+
+        if filled < len(view):
+            self._set_timeout(timeout if timeout else None)
+
+        while filled < len(view):
+            try:
+                received = self.socket.recv_into(view[filled:])
+            except (socket.timeout, BlockingIOError):
+                break
+            except ConnectionResetError as err:
+                print(
+                    f"Warning: while reading from socket at "
+                    f"{self.socket.getsockname()}, got error: {err}"
+                )
                 break
 
-        else:
-            null_responses += 1
+            if received == 0:  # connection closed
+                break
 
-    _socket.settimeout(default_timeout)
+            filled += received
 
-    if decode:
-        return message.decode().strip()
-    else:
-        return message
+        return filled
+
+    def close(self):
+        """Shut down and close the socket"""
+
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:  # already disconnected
+            pass
+
+        self.socket.close()
+
+    def __repr__(self):
+        return "SocketConnection"
+
+
+# Bytes received by read_from_socket after the end of a message, which belong to
+# the next message; of the form {..., socket: bytearray, ...}
+_read_buffers = weakref.WeakKeyDictionary()
+
+
+def read_from_socket(
+    _socket, nbytes=None, termination="\r", timeout=None, decode=True, chunk_size=65536
+):
+    """
+    Read from a socket, with some effort taken to get the whole message.
+
+    Any bytes received after the termination (or after nbytes) are kept for the
+    next read from the same socket. For frequent reads, use a `SocketConnection`,
+    which also avoids setting the timeout of the socket on every call.
+
+    :param _socket: (socket.Socket) socket to read from.
+    :param nbytes: (int) number of bytes to read; defaults to infinite.
+    :param termination: (str/bytes/callable) if str or bytes, expected message
+                        termination character(s); if callable, a function that
+                        takes a message as its sole argument and returns True if
+                        the message indicates that it is terminated, and False
+                        otherwise.
+    :param timeout: (numbers.Number) communication timeout in seconds, for each
+                    call to the `_socket.recv_into` function; defaults to existing
+                    timeout of _socket.
+    :param decode: (bool) whether to return decoded string (True) or raw bytes
+                   message (False); defaults to True.
+    :param chunk_size: (int) maximum number of bytes to read on each call to the
+                       recv_into method.
+    """
+
+    connection = SocketConnection(_socket, chunk_size=chunk_size)
+
+    connection.buffer = _read_buffers.pop(_socket, bytearray())
+
+    try:
+        return connection.read(
+            nbytes=nbytes, termination=termination, timeout=timeout, decode=decode
+        )
+    finally:
+        if connection.buffer:
+            _read_buffers[_socket] = connection.buffer
+
+        connection._set_timeout(connection.timeout)  # restore default timeout
 
 
 def write_to_socket(_socket, message, termination="\r", timeout=None):
@@ -267,47 +529,232 @@ def write_to_socket(_socket, message, termination="\r", timeout=None):
     :param _socket: (socket.Socket) socket to write to.
     :param message: (str/bytes) message to send.
     :param termination: (str/bytes) expected message termination character(s).
-    :param timeout: (numbers.Number) timeout for `select.select` call; defaults to
+    :param timeout: (numbers.Number) timeout for sending the message; defaults to
     existing timeout of _socket.
     """
 
-    if timeout is None:
-        timeout = _socket.gettimeout()
+    connection = SocketConnection(_socket)
 
-    if isinstance(message, str):
-        bytes_message = (message + termination).encode()
-    elif isinstance(message, bytes):
-        bytes_message = message + termination.encode()
-    else:
-        raise ValueError("message argument must be either string or bytes")
+    try:
+        return connection.write(message, termination=termination, timeout=timeout)
+    finally:
+        connection._set_timeout(connection.timeout)  # restore default timeout
 
-    msg_len = len(bytes_message)
 
-    failures = 0
-    max_failures = 3
+# Compact binary encoding of values exchanged between socket servers and clients
+_frame_header = struct.Struct("!4sI")  # marker and size of the encoded values
+_frame_marker = b"@bin"
 
-    total_sent = 0
+_count = struct.Struct("!I")
+_name_size = struct.Struct("!H")
+_string_size = struct.Struct("!I")
+# Sizes of dtype string and of shape, and padding before the data of an array
+_array_header = struct.Struct("!BBB")
 
-    while total_sent < msg_len and failures < max_failures:
-        # Block until the socket is writeable or until timeout
-        if timeout:
-            writeable = _socket in select.select([], [_socket], [], timeout)[1]
+_scalars = {
+    b"t": struct.Struct("!?"),  # toggle
+    b"b": struct.Struct("!?"),  # boolean
+    b"i": struct.Struct("!q"),  # integer
+    b"f": struct.Struct("!d"),  # float
+    b"c": struct.Struct("!dd"),  # complex
+}
+
+
+def _pack_value(value, offset):
+    """
+    Encode a single value, starting at the given offset of the encoded values, as
+    a list of bytes-like parts
+    """
+
+    try:
+        if value is None:
+            return [b"n"]
+        elif isinstance(value, Toggle):
+            return [b"t", _scalars[b"t"].pack(value.on)]
+        elif isinstance(value, Boolean):
+            return [b"b", _scalars[b"b"].pack(value)]
+        elif isinstance(value, Integer):
+            return [b"i", _scalars[b"i"].pack(value)]
+        elif isinstance(value, Float):
+            return [b"f", _scalars[b"f"].pack(value)]
+        elif isinstance(value, Complex):
+            return [b"c", _scalars[b"c"].pack(value.real, value.imag)]
+        elif isinstance(value, Array):
+            array = np.ascontiguousarray(value)
+
+            if array.dtype.kind in "biufcSU":
+                dtype = array.dtype.str.encode()
+
+                # Pad so that the data is aligned in the buffer it is received in
+                start = offset + 1 + _array_header.size + len(dtype) + 8 * array.ndim
+                padding = -start % array.dtype.alignment
+
+                return [
+                    b"a",
+                    _array_header.pack(len(dtype), array.ndim, padding),
+                    dtype,
+                    struct.pack(f"!{array.ndim}Q", *array.shape),
+                    bytes(padding),
+                    memoryview(array.reshape(-1).view(np.uint8)),  # raw data
+                ]
+    except struct.error:  # e.g. integer too large; encoded as a string below
+        pass
+
+    string = str(value).encode()
+
+    return [b"s", _string_size.pack(len(string)), string]
+
+
+def _unpack_value(data, offset):
+    """Decode the value at the offset, returning the value and the next offset"""
+
+    code = bytes(data[offset : offset + 1])
+    offset += 1
+
+    if code == b"n":
+        return None, offset
+
+    elif code in _scalars:
+        scalar = _scalars[code]
+        fields = scalar.unpack_from(data, offset)
+        offset += scalar.size
+
+        if code == b"t":
+            return Toggle(fields[0]), offset
+        elif code == b"b":
+            return np.bool_(fields[0]), offset
+        elif code == b"i":
+            return np.int64(fields[0]), offset
+        elif code == b"f":
+            return np.float64(fields[0]), offset
         else:
-            writeable = _socket in select.select([], [_socket], [])[1]
+            return np.complex128(complex(*fields)), offset
 
-        if not writeable:
-            break
+    elif code == b"s":
+        (size,) = _string_size.unpack_from(data, offset)
+        offset += _string_size.size
 
-        sent = _socket.send(bytes_message[total_sent:])
+        return bytes(data[offset : offset + size]).decode(), offset + size
 
-        if sent == 0:
-            failures += 1
+    elif code == b"a":
+        dtype_size, ndim, padding = _array_header.unpack_from(data, offset)
+        offset += _array_header.size
 
-        total_sent = total_sent + sent
+        dtype = np.dtype(bytes(data[offset : offset + dtype_size]).decode())
+        offset += dtype_size
 
-    if total_sent < msg_len:
-        raise ConnectionError(
-            f"Socket connection to {_socket.getsockname()} is broken!"
-        )
+        shape = struct.unpack_from(f"!{ndim}Q", data, offset)
+        offset += 8 * ndim + padding
+
+        count = int(np.prod(shape))
+
+        # The array is a view of the data, without copying
+        array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+
+        return array.reshape(shape), offset + count * dtype.itemsize
+
+    else:
+        raise ValueError(f"invalid value code {code}")
+
+
+def pack_values(values):
+    """
+    Encode named values into a compact binary frame, to be sent through a socket.
+
+    Each value is encoded as a type code followed by its binary representation:
+    toggles, booleans, integers, floats and complex numbers as their 1, 8 or 16
+    byte representations, strings as their size and UTF-8 encoding, and arrays of
+    numbers or strings as their dtype, shape and raw data, aligned for the type of
+    their elements. Values of any other type are encoded as strings.
+
+    :param values: (dict) values to encode, of the form {..., name: value, ...}
+    :return: (bytes) frame consisting of a header, which gives the size of the
+             encoded values, followed by the encoded values
+    """
+
+    parts = [_count.pack(len(values))]
+    offset = _count.size
+
+    for name, value in values.items():
+        name = str(name).encode()
+
+        parts.extend([_name_size.pack(len(name)), name])
+        offset += _name_size.size + len(name)
+
+        value_parts = _pack_value(value, offset)
+
+        parts.extend(value_parts)
+        offset += sum(len(part) for part in value_parts)
+
+    payload = b"".join(parts)
+
+    return _frame_header.pack(_frame_marker, len(payload)) + payload
+
+
+def unpack_values(payload):
+    """
+    Decode named values encoded by `pack_values`, without the frame header.
+
+    Arrays are decoded as views of the payload, which are writeable only if the
+    payload is.
+
+    :param payload: (bytes-like) encoded values
+    :return: (dict) decoded values, of the form {..., name: value, ...}
+    """
+
+    payload = memoryview(payload)
+
+    (count,) = _count.unpack_from(payload, 0)
+    offset = _count.size
+
+    values = {}
+
+    for _ in range(count):
+        (size,) = _name_size.unpack_from(payload, offset)
+        offset += _name_size.size
+
+        name = bytes(payload[offset : offset + size]).decode()
+        offset += size
+
+        values[name], offset = _unpack_value(payload, offset)
+
+    return values
+
+
+def read_values(connection, timeout=None):
+    """
+    Read a frame of values encoded by `pack_values`, followed by a one-byte
+    message termination, from a connection.
+
+    The encoded values are received directly into a buffer allocated for them,
+    of which the decoded arrays are (writeable) views, so arrays are neither
+    copied nor unpickled.
+
+    :param connection: (SocketConnection) connection to read from.
+    :param timeout: (numbers.Number) communication timeout in seconds; defaults to
+                    the timeout of the connection.
+    :return: (dict) decoded values, of the form {..., name: value, ...}
+    """
+
+    header = connection.read(
+        nbytes=_frame_header.size, termination=None, timeout=timeout, decode=False
+    )
+
+    if len(header) < _frame_header.size:
+        raise ConnectionError("received no values")
+
+    marker, size = _frame_header.unpack(header)
+
+    if marker != _frame_marker:
+        # Got a text message instead, such as an error message
+        message = header + connection.read(timeout=timeout, decode=False)
+
+        raise ValueError(message.decode().strip())
+
+    # Frames are followed by the message termination, which is discarded
+    payload = bytearray(size + 1)
+
+    if connection.read_into(payload, timeout=timeout) < len(payload):
+        raise ConnectionError("received incomplete values")
 
-    return total_sent
+    return unpack_values(memoryview(payload)[:size])
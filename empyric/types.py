@@ -4,7 +4,6 @@ import os
 import re
 from abc import ABC
 
-import dill
 import pandas as pd
 import numpy as np
 from typing import Any, Union, get_origin, get_args
@@ -233,14 +232,10 @@ def recast(value: Any, to: type = Type) -> Union[Type, None]:
             else:
                 return value  # must be an actual string
         elif isinstance(value, bytes):
-            if value[:5] == b"dlpkl":
-                # pickled object
-                return dill.loads(value[5:])
-            else:
-                try:
-                    return recast(value.decode())
-                except UnicodeDecodeError:
-                    return value
+            try:
+                return recast(value.decode())
+            except UnicodeDecodeError:
+                return value
         if isinstance(value, Array):  # value is an array
             np_array = np.array(value)  # convert to numpy array
             rep_elem = np_array.flatten()[0]  # representative element
@@ -1,21 +1,32 @@
 # Experiment variables
 
+import ast
+import contextvars
+import importlib
+import json
 import numbers
 import socket
+import threading
 import time
 import typing
-from functools import wraps
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 
-import dill
 import numpy as np  # used in Expression's eval call
 
+from empyric import filters
 from empyric.collection.instrument import Instrument
 
 from empyric.instruments import ModbusClient
-from empyric.tools import write_to_socket, read_from_socket, logger
+from empyric.tools import SocketConnection, read_values, logger
 from empyric.types import supported as supported_types, recast
 from empyric.types import Type, Boolean, Float, Integer, Toggle, ON, Array
 
+if importlib.util.find_spec("numexpr"):
+    numexpr = importlib.import_module("numexpr")
+else:
+    numexpr = None
+
 
 class Variable:
     """
@@ -87,8 +98,8 @@ class Variable:
         """Checks that get value is compatible with variable's type"""
 
         @wraps(getter)
-        def wrapped_getter(self):
-            value = getter(self)
+        def wrapped_getter(self, *args, **kwargs):
+            value = getter(self, *args, **kwargs)
 
             if not isinstance(value, Array) and (
                 value is None or value == float("nan")
@@ -319,16 +330,31 @@ class Meter(Variable):
         self._value = None
 
     @property
-    @Variable.getter_type_validator
     def value(self):
         """
         Measured value of the meter of an instrument
         """
 
         if not self.gate.value:
+            return self.record(None)
+
+        return self.record(self.instrument.measure(self.meter))
+
+    @Variable.getter_type_validator
+    def record(self, measurement):
+        """
+        Update the value of the meter with a measurement of the meter obtained from
+        the instrument, e.g. through the `measure_many` method of the instrument,
+        applying the multiplier and offset.
+
+        :param measurement: (Type) measured value, or None if not measured
+        :return: (Type) new value of the meter
+        """
+
+        if measurement is None:
             return None
 
-        self._value = self.instrument.measure(self.meter)
+        self._value = measurement
 
         if isinstance(self._value, numbers.Number):
             self._value = self.multiplier * self._value + self.offset
@@ -355,37 +381,127 @@ class Expression(Variable):
 
     The `definitions` argument is a dictionary mapping symbols in the
     `expression` argument to variables.
+
+    The optional `backend` argument selects how the expression is evaluated: with
+    "numpy" (the default), the expression is evaluated by the Python interpreter,
+    while with "numexpr", it is evaluated by the NumExpr library, which evaluates
+    array expressions in multiple threads without creating temporary arrays. This
+    is faster for expressions of large arrays, such as waveforms. NumExpr only
+    supports arithmetic and common mathematical functions; if it is not installed
+    or cannot evaluate the expression, the "numpy" backend is used instead.
+
+    Expressions can also contain the stateful filter functions of the
+    `empyric.filters` module, such as `ema(x, tau)` (exponential moving average
+    with time constant tau), `rolling_mean(x, n)`, `lowpass(x, fc)`,
+    `fir(x, coefficients)`, `decimate(x, k)` and `deriv(x)`, which process the
+    signal x one evaluation at a time, keeping a fixed-size history of it.
+
+    The Fourier analysis functions `fft`, `ifft`, `carrier`, `ampl` and `demod`
+    share the transforms of their signals during each step of an experiment (see
+    the `fft_cache` method), so that several spectral expressions of the same
+    signal are computed from a single FFT.
     """
 
     _settable = False  #:
 
-    # shorthand terms for common functions
+    # shorthand names for common functions
     # TODO consolidate these functions in a separate module
     _functions = {
-        "sqrt(": "np.sqrt(",
-        "exp(": "np.exp(",
-        "sin(": "np.sin(",
-        "cos(": "np.cos(",
-        "tan(": "np.tan(",
-        "sum(": "np.nansum(",
-        "mean(": "np.nanmean(",
-        "rms(": "np.nanstd(",
-        "std(": "np.nanstd(",
-        "var(": "np.nanvar(",
-        "diff(": "np.diff(",
-        "max(": "np.nanmax(",
-        "min(": "np.nanmin(",
-        "fft(": "self.fft(",
-        "ifft(": "self.ifft(",
-        "carrier(": "self.carrier(",
-        "ampl(": "self.ampl(",
-        "demod(": "self.demod(",
+        "sqrt": np.sqrt,
+        "exp": np.exp,
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "sum": np.nansum,
+        "mean": np.nanmean,
+        "rms": np.nanstd,
+        "std": np.nanstd,
+        "var": np.nanvar,
+        "diff": np.diff,
+        "max": np.nanmax,
+        "min": np.nanmin,
     }
 
-    def __init__(self, expression: str, definitions: dict = None):
+    # shorthand names for the utility functions defined below
+    _methods = ("fft", "ifft", "carrier", "ampl", "demod")
+
+    #: available backends for evaluating expressions
+    backends = ("numpy", "numexpr")
+
+    # Transforms of signals shared by the Fourier analysis functions within an
+    # evaluation pass; see the `fft_cache` method
+    _fft_cache = contextvars.ContextVar("fft_cache", default=None)
+    _fft_cache_size = 32
+
+    def __init__(
+        self, expression: str, definitions: dict = None, backend: str = "numpy"
+    ):
+        if backend not in self.backends:
+            raise ValueError(
+                f"invalid backend {backend} for expression {expression}; "
+                f"valid backends are {', '.join(self.backends)}"
+            )
+
+        if backend == "numexpr" and numexpr is None:
+            logger.warning(
+                f"numexpr is not installed; evaluating expression {expression} "
+                "with numpy instead"
+            )
+
+            backend = "numpy"
+
+        self.backend = backend
+
+        self._validity = {}
+        # dict of the form {..., symbol: (value, last evaluation, validity), ...}
+        # caching the validity of array values of the variables in the definitions
+
         self.expression = expression
         self.definitions = definitions if definitions is not None else {}
 
+    @property
+    def expression(self):
+        """
+        Expression string; it is parsed and compiled upon assignment, so that
+        evaluations only execute the compiled code. Each call of a filter function
+        (see `empyric.filters`) in the expression is bound to its own filter,
+        which keeps its history between evaluations.
+        """
+        return self._expression
+
+    @expression.setter
+    def expression(self, expression: str):
+        self._expression = expression
+
+        self._numexpr_supported = True  # until NumExpr fails to evaluate it
+
+        try:
+            # carets represent exponents
+            tree = ast.parse(expression.replace("^", "**"), mode="eval")
+
+            bound_filters = filters.bind_filters(tree)
+
+            # Namespace in which the expression is evaluated, rebuilt with each new
+            # expression so that the filters of previous ones are dropped; the values
+            # of the variables in the definitions are added upon each evaluation
+            self._namespace = {
+                **globals(),
+                **self._functions,
+                **{name: getattr(self, name) for name in self._methods},
+                **bound_filters,
+            }
+
+            # NumExpr cannot call filters
+            self._numexpr_supported = not bound_filters
+
+            self._code = compile(tree, f"<expression {expression}>", "eval")
+            self._error = None
+        except (SyntaxError, ValueError) as err:
+            # reported upon evaluation
+            self._code = None
+            self._error = err
+            self._namespace = {}
+
     @property
     @Variable.getter_type_validator
     def value(self):
@@ -393,48 +509,38 @@ class Expression(Variable):
         Value of the expression
         """
 
-        expression = self.expression
-
-        logger.debug(f"Evaluating expression {expression}")
-
-        # carets represent exponents
-        expression = expression.replace("^", "**")
+        logger.debug(f"Evaluating expression {self.expression}")
 
         variables = {
             symbol: variable._value for symbol, variable in self.definitions.items()
         }
 
-        for shorthand, longhand in self._functions.items():
-            if shorthand in expression:
-                expression = expression.replace(shorthand, longhand)
-
         try:
-            all_values = np.concatenate(
-                [np.atleast_1d(val).flatten() for val in variables.values()]
-            )
+            invalid = [
+                symbol
+                for symbol, variable in self.definitions.items()
+                if not self._valid_input(symbol, variable)
+            ]
 
-            no_nones = None not in all_values
-            no_nans = np.nan not in all_values
-            no_infs = (np.inf not in all_values) and (-np.inf not in all_values)
+            if not invalid:
+                if self._code is None:
+                    raise self._error
 
-            valid_values = no_nones and no_nans and no_infs
+                if self.backend == "numexpr" and self._numexpr_supported:
+                    self._value = self._evaluate_numexpr(variables)
 
-            if valid_values:
-                self._value = eval(expression, {**globals(), **variables}, locals())
-            else:
-
-                log_str = f"Dependencies for {expression} contain invalid values: "
-
-                for name, value in variables.items():
+                if self.backend == "numpy" or not self._numexpr_supported:
+                    # evaluated in a copy of the namespace, so that concurrent
+                    # evaluations do not see each other's values
+                    namespace = {**self._namespace, **variables}
 
-                    if value is None:
-                        log_str += f"\n{name} = None"
-                    elif np.isnan(value):
-                        log_str += f"\n{name} = NaN"
-                    elif np.isinf(value):
-                        log_str += f"\n{name} = +/-Inf"
-
-                logger.debug(log_str)
+                    self._value = eval(self._code, namespace)
+            else:
+                logger.debug(
+                    f"Dependencies for {self.expression} contain invalid values "
+                    "(None, NaN or +/-Inf): "
+                    + ", ".join(f"{symbol} = {variables[symbol]}" for symbol in invalid)
+                )
 
                 self._value = None
 
@@ -452,6 +558,84 @@ class Expression(Variable):
 
         return self._value
 
+    def _valid_input(self, symbol, variable):
+        """
+        Check that the value of a variable in the definitions is valid, i.e. it is
+        not None and all of its numerical elements are finite.
+
+        Arrays are checked with a single `np.isfinite` reduction, without copying
+        them, and the result is cached until the variable is evaluated again.
+        """
+
+        value = variable._value
+
+        if value is None:
+            return False
+
+        if np.ndim(value) == 0:
+            try:
+                return bool(np.isfinite(value))
+            except TypeError:  # not a number (e.g. string or toggle)
+                return True
+
+        cached = self._validity.get(symbol, None)
+
+        if (
+            cached is not None
+            and cached[0] is value
+            and cached[1] == variable.last_evaluation
+            and variable.last_evaluation is not None
+        ):
+            return cached[2]
+
+        array = np.asarray(value)
+
+        if array.dtype.kind in "biufc":
+            valid = bool(np.isfinite(array).all())
+        elif array.dtype.kind == "O":  # e.g. lists containing None
+            valid = not any(
+                element is None
+                or (isinstance(element, numbers.Number) and not np.isfinite(element))
+                for element in array.flat
+            )
+        else:  # e.g. arrays of strings
+            valid = True
+
+        # keeping a reference to the value makes sure that its id is not reused
+        self._validity[symbol] = (value, variable.last_evaluation, valid)
+
+        return valid
+
+    def _evaluate_numexpr(self, variables):
+        """Evaluate the expression with NumExpr"""
+
+        try:
+            value = numexpr.evaluate(
+                self.expression.replace("^", "**"),
+                local_dict=variables,
+                global_dict={},
+            )
+        except (
+            KeyError,
+            NotImplementedError,
+            SyntaxError,
+            TypeError,
+            ValueError,
+        ) as err:
+            logger.warning(
+                f"Unable to evaluate expression {self.expression} with numexpr due "
+                f"to error: {err}; using numpy instead"
+            )
+
+            self._numexpr_supported = False
+
+            return None
+
+        if value.ndim == 0:
+            return value.item()
+        else:
+            return value
+
     def __str__(self):
         if len(str(self.value)) < 100:  # first call to value evaluates expression
             return f"Expression({self.expression} = {self._value})"
@@ -463,31 +647,170 @@ class Expression(Variable):
                 f"{str(self._value)[:50]} ... {str(self._value)[-50:]}"
             )
 
+    @classmethod
+    @contextmanager
+    def fft_cache(cls):
+        """
+        Context manager within which the Fourier transforms of signals are
+        computed once and shared by the `fft`, `ifft`, `carrier`, `ampl` and
+        `demod` functions of all expressions, so that several spectral expressions
+        of the same signal cost one FFT. Signals are identified by their array
+        objects, so the cache is only valid while signals are not modified in
+        place, i.e. for one step of an experiment; it is discarded upon exit.
+
+        The cache belongs to the current context (see the `contextvars` module),
+        so it is only seen by code running in that context, or in copies of it
+        made while the cache is in place, such as the worker pool tasks of an
+        experiment step. The cache dictionary, of the form
+        {..., key: (signal, transform), ...}, is yielded for inspection.
+        """
+
+        cache = {}
+        token = cls._fft_cache.set((cache, threading.Lock()))
+
+        try:
+            yield cache
+        finally:
+            cls._fft_cache.reset(token)
+
+    @staticmethod
+    def _cached_transform(kind, s, transform, *args):
+        """
+        Apply a transform to a signal, reusing the result if the same transform
+        of the same signal was already computed within the `fft_cache` context.
+        Cached results are read-only.
+        """
+
+        active = Expression._fft_cache.get()
+
+        if active is None:
+            return transform(np.asarray(s), *args)
+
+        cache, lock = active
+        key = (kind, id(s), *args)
+
+        with lock:
+            cached = cache.get(key)
+
+        # the cache holds a reference to the signal, so its id cannot be reused
+        # by another signal while the entry exists
+        if cached is not None and cached[0] is s:
+            return cached[1]
+
+        result = transform(np.asarray(s), *args)
+        result.flags.writeable = False
+
+        with lock:
+            if key not in cache and len(cache) >= Expression._fft_cache_size:
+                del cache[next(iter(cache))]
+
+            cache[key] = (s, result)
+
+        return result
+
+    @staticmethod
+    def _partition(s, k_partition):
+        """Split a signal into zero-padded partitions of k_partition samples"""
+
+        n_parts = int(len(s) / k_partition) + 1
+
+        s_padded = np.concatenate([s, np.zeros(n_parts * k_partition - len(s))])
+
+        return np.reshape(s_padded, (n_parts, k_partition))
+
+    @staticmethod
+    def _spectrum(s, k_partition=None):
+        """
+        Calculate the (unnormalized) FFT of a signal, or of each of its partitions
+        of k_partition samples
+        """
+
+        if k_partition is None:
+            return Expression._cached_transform("fft", s, np.fft.fft)
+        else:
+            return Expression._cached_transform(
+                "partitioned fft",
+                s,
+                lambda s, k: np.fft.fft(Expression._partition(s, k), axis=1),
+                k_partition,
+            )
+
     # Utility functions for Fourier analysis
     @staticmethod
     def fft(s):
         """Calculate the fast Fourier transform of a signal"""
-        return np.fft.fft(s, norm="forward")
+        return Expression._spectrum(s) / np.shape(s)[-1]
 
     @staticmethod
     def ifft(s):
         """Calculate the inverse fast Fourier transform of a signal"""
-        return np.fft.ifft(s, norm="forward")
+        return np.shape(s)[-1] * Expression._cached_transform("ifft", s, np.fft.ifft)
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _frequencies(n, dt):
+        """
+        Get the (read-only) frequencies of the FFT of a signal of n samples with
+        sampling interval dt; cached, since signals usually have the same length
+        from one evaluation to the next
+        """
+
+        freq = np.fft.fftfreq(n, d=dt)
+        freq.flags.writeable = False
+
+        return freq
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _band(n, dt, f0, bw):
+        """
+        Get the (read-only) mask selecting the frequencies of the FFT of a signal
+        of n samples within the band of width bw about f0
+        """
+
+        freq = Expression._frequencies(n, dt)
+
+        in_band = (freq > f0 - 0.5 * bw) & (freq < f0 + 0.5 * bw)
+        in_band.flags.writeable = False
+
+        return in_band
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _low_pass(n, dt, bw, filt):
+        """
+        Get the (read-only) low pass filter of width bw, applied to the FFT of a
+        demodulated signal of n samples
+        """
+
+        freq = Expression._frequencies(n, dt)
+
+        low_pass = np.ones(n)
+
+        if filt == "gaussian":
+            low_pass *= np.exp(-(freq**2) / (2 * bw**2))
+        if filt == "sinc":
+            low_pass *= np.sinc(freq / bw)
+        else:
+            low_pass *= np.abs(freq) < 0.5 * bw
+
+        low_pass.flags.writeable = False
+
+        return low_pass
 
     @staticmethod
     def _find_carrier(s, dt, f0=0.0, bw=np.inf):
         """Characterize the carrier wave of a signal"""
-        fft_s = np.fft.fft(s, norm="forward")
-        f = np.fft.fftfreq(len(s), d=dt)
+        fft_s = Expression._spectrum(s)
+        f = Expression._frequencies(len(s), float(dt))
 
-        in_band = (f > f0 - 0.5 * bw) & (f < f0 + 0.5 * bw)
+        in_band = Expression._band(len(s), float(dt), float(f0), float(bw))
 
         filt_fft_s = np.abs(in_band * fft_s)
 
-        fc = np.abs(f[filt_fft_s == np.max(filt_fft_s)][0])
-        Ac = np.abs(filt_fft_s[filt_fft_s == np.max(filt_fft_s)][0])
+        peak = np.argmax(filt_fft_s)
 
-        return fc, Ac
+        return np.abs(f[peak]), filt_fft_s[peak] / len(s)
 
     @staticmethod
     def carrier(s, dt, f0=0.0, bw=np.inf):
@@ -503,70 +826,322 @@ class Expression(Variable):
     def demod(s, dt, f0, bw=np.inf, cycles=np.inf, filt=None):
         """Demodulate an oscillatory signal"""
 
+        dt, f0, bw = float(dt), float(f0), float(bw)
+
         if np.isfinite(cycles):
             # Partition signal into segments containing integer number of carrier cycles
             fc = Expression.carrier(s, dt, f0, bw=bw)  # get carrier frequency
 
             k_partition = int(cycles / (dt * fc))  # number of samples per partition
 
-            n_parts = int(len(s) / k_partition) + 1
-
-            s_padded = np.concatenate([s, np.zeros(n_parts * k_partition - len(s))])
-
-            partitions = np.reshape(s_padded, (n_parts, k_partition))
+            # Calculate the FFTs of all partitions at once
+            fft = Expression._spectrum(s, k_partition)
         else:
             # Demodulate the whole signal
-
-            n_parts = 1
             k_partition = len(s)
 
-            partitions = np.array([s])
+            fft = Expression._spectrum(s)[np.newaxis]
 
-        partitions_demod = np.empty_like(partitions, dtype=np.complex128)
+        n_parts = len(fft)
 
-        for i, partition in enumerate(partitions):
-            # Calculate FFT
-            freq = np.fft.fftfreq(k_partition, d=dt)  # frequency values for the FFT
-            fft = np.fft.fft(partition)
+        # Find principal frequency within the given band about the given frequency
+        in_band = Expression._band(k_partition, dt, f0, bw)
 
-            # Find principal frequency within the given band about the given frequency
-            fft_in_positive_band = np.abs(
-                fft * ((freq > f0 - 0.5 * bw) & (freq < f0 + 0.5 * bw))
-            )
+        where_f0_closest = np.argmax(np.abs(fft * in_band), axis=1)
 
-            where_f0_closest = np.argwhere(
-                fft_in_positive_band == np.max(fft_in_positive_band)
-            ).flatten()[0]
+        peaks = fft[np.arange(n_parts), where_f0_closest]
 
-            if np.abs(fft[where_f0_closest]) > 0.0:
-                phase = np.log(fft[where_f0_closest]).imag  # Get phase of sinusoid
-            else:
-                phase = 0.0
+        # Get phase of sinusoid
+        phase = np.where(np.abs(peaks) > 0.0, np.angle(peaks), 0.0)[:, np.newaxis]
 
-            # Construct the demodulated FFT
-            fft_demod = np.zeros_like(fft)
+        # Construct the demodulated FFT, by rolling the positive and negative
+        # components towards zero and removing the phase; partitions sharing the
+        # same principal frequency (usually all of them) are rolled together
+        rotation = np.exp(1j * phase)
 
-            # roll the positive component towards zero and remove phase
-            fft_demod += np.roll(fft, -where_f0_closest) * np.exp(-1j * phase)
+        shifts = np.unique(where_f0_closest)
 
-            # roll the negative component towards zero and remove phase
-            fft_demod += np.roll(fft, where_f0_closest) * np.exp(1j * phase)
+        if len(shifts) == 1:
+            fft_demod = np.roll(fft, -shifts[0], axis=1) * rotation.conj()
+            fft_demod += np.roll(fft, shifts[0], axis=1) * rotation
+        else:
+            fft_demod = np.empty_like(fft)
 
-            # Apply low pass filter
-            if filt == "gaussian":
-                fft_demod *= np.exp(-(freq**2) / (2 * bw**2))
-            if filt == "sinc":
-                fft_demod *= np.sinc(freq / bw)
-            else:
-                fft_demod *= np.abs(freq) < 0.5 * bw
+            for shift in shifts:
+                rows = where_f0_closest == shift
+
+                fft_demod[rows] = (
+                    np.roll(fft[rows], -shift, axis=1) * rotation[rows].conj()
+                    + np.roll(fft[rows], shift, axis=1) * rotation[rows]
+                )
 
-            partitions_demod[i] = np.fft.ifft(fft_demod)
+        # Apply low pass filter
+        fft_demod *= Expression._low_pass(k_partition, dt, bw, filt)
 
-        signal_demod = partitions_demod.flatten()
+        signal_demod = np.fft.ifft(fft_demod, axis=1).flatten()
 
         return np.abs(signal_demod)
 
 
+def _jsonable(value):
+    """Convert values that the json module cannot encode"""
+
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    elif isinstance(value, np.generic):
+        return value.item()
+    else:
+        return str(value)
+
+
+class _ServerConnection:
+    """
+    Connection to a socket server, shared by all Remote variables of the server.
+
+    Requests can be pipelined: several requests are sent at once and the
+    responses, which the server sends in the order of the requests, are then read
+    back in the same order. The settability and type of all variables on the
+    server are fetched upon connection in a single exchange, so that Remote
+    variables need not query them one by one.
+
+    Values of subscribed variables are pushed by the server through a second
+    connection, on which a background thread receives them into a cache.
+    """
+
+    _pool = {}  # open connections, of the form {..., server: connection, ...}
+    _pool_lock = threading.Lock()
+
+    def __init__(self, server):
+        self.server = server
+
+        server_ip, server_port = server.split("::")
+
+        _socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+        _socket.connect((server_ip, int(server_port)))
+
+        self.connection = SocketConnection(_socket, timeout=60)
+
+        self.lock = threading.Lock()  # for exchanges from different threads
+
+        self.users = 0
+
+        # Whether the server answers requests concerning several variables
+        self.bulk = False
+
+        # Settability and type of each variable, of the form
+        # {..., alias: (settable, type), ...}
+        self.info = self.get_info()
+
+        # Connection through which the server pushes values of subscribed variables
+        self.pushes = None
+        self.pushing = False
+
+        self.cache = {}  # latest pushed values, of the form {..., alias: value, ...}
+
+        self._pushed = threading.Condition()  # notified upon receiving values
+        self._push_error = None
+        self._subscribe_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, server):
+        """Get the connection to the server, connecting if necessary"""
+
+        with cls._pool_lock:
+            connection = cls._pool.get(server)
+
+            if connection is None:
+                connection = cls._pool[server] = cls(server)
+
+            connection.users += 1
+
+        return connection
+
+    def release(self):
+        """Release the connection, which is closed once it has no more users"""
+
+        with self._pool_lock:
+            self.users -= 1
+
+            if self.users > 0:
+                return
+
+            if self._pool.get(self.server) is self:
+                del self._pool[self.server]
+
+        self.connection.close()
+
+        if self.pushes is not None:
+            self.pushing = False
+            self.pushes.close()
+
+    def request(self, *requests, decode=True):
+        """
+        Send one or more requests at once, and return the list of responses
+
+        :param requests: (str) requests to send to the server, in order
+        :param decode: (bool) whether to return decoded strings (True) or raw bytes
+                       responses (False); defaults to True.
+        :return: (list) responses from the server, in the order of the requests
+        """
+
+        with self.lock:
+            self.connection.write("\r".join(requests))
+
+            return [self.connection.read(decode=decode) for _ in requests]
+
+    def _request_values(self, request):
+        """Send a request, and read the values sent in response"""
+
+        with self.lock:
+            self.connection.write(request)
+
+            return read_values(self.connection)
+
+    def get_values(self, aliases):
+        """
+        Get the values of several variables in one exchange
+
+        :param aliases: (list) aliases of the variables on the server
+        :return: (dict) values, of the form {..., alias: value, ...}
+        """
+
+        return self._request_values("@get " + json.dumps(list(aliases)))
+
+    def set_values(self, values):
+        """
+        Set the values of several variables in one exchange
+
+        :param values: (dict) values to set, of the form {..., alias: value, ...}
+        :return: (dict) new values of the variables that could be set
+        """
+
+        return self._request_values("@set " + json.dumps(values, default=_jsonable))
+
+    def snapshot(self):
+        """
+        Get the values of all variables on the server in one exchange
+
+        :return: (dict) values, of the form {..., alias: value, ...}
+        """
+
+        return self._request_values("@snapshot")
+
+    def subscribe(self, alias, deadband=None, interval=None):
+        """
+        Subscribe to the value of a variable, which the server then pushes
+        whenever it changes, to be kept in the `cache` attribute
+
+        :param alias: (str) alias of the variable on the server
+        :param deadband: (float) change of a numeric value below which the new
+                         value is not pushed; defaults to zero
+        :param interval: (float) minimum time in seconds between pushes of the
+                         value; defaults to zero
+        :return: (bool) whether the subscription succeeded, in which case the
+                 current value of the variable is in the cache
+        """
+
+        if not self.bulk:  # server does not support subscriptions
+            return False
+
+        arguments = {"aliases": [alias]}
+
+        if deadband is not None:
+            arguments["deadband"] = {alias: deadband}
+
+        if interval is not None:
+            arguments["interval"] = {alias: interval}
+
+        with self._subscribe_lock:
+            if self.pushes is None:
+                server_ip, server_port = self.server.split("::")
+
+                _socket = socket.create_connection((server_ip, int(server_port)))
+
+                # Pushes are awaited indefinitely
+                self.pushes = SocketConnection(_socket, timeout=0)
+                self.pushing = True
+
+                threading.Thread(target=self._receive_pushes, daemon=True).start()
+
+            with self._pushed:
+                self._push_error = None
+
+                self.pushes.write("@subscribe " + json.dumps(arguments))
+
+                # The current value is sent in response, and received with pushes
+                self._pushed.wait_for(
+                    lambda: alias in self.cache
+                    or self._push_error is not None
+                    or not self.pushing,
+                    timeout=self.connection.timeout,
+                )
+
+                if self._push_error is not None:
+                    logger.warning(
+                        f"Unable to subscribe to {alias} on server at "
+                        f'{self.server}: "{self._push_error}"'
+                    )
+
+                return alias in self.cache and self.pushing
+
+    def _receive_pushes(self):
+        """Receive values pushed by the server, until the connection closes"""
+
+        while True:
+            try:
+                values = read_values(self.pushes)
+            except ValueError as error:  # error message from the server
+                with self._pushed:
+                    self._push_error = str(error)
+                    self._pushed.notify_all()
+
+                continue
+            except OSError:  # connection is closed
+                break
+
+            with self._pushed:
+                self.cache.update(values)
+                self._pushed.notify_all()
+
+        if self.pushing:
+            logger.warning(
+                f"Lost subscriptions to server at {self.server}; "
+                f"values of subscribed variables are requested instead"
+            )
+
+        with self._pushed:
+            self.pushing = False
+            self._pushed.notify_all()
+
+    def get_info(self):
+        """
+        Get the settability and type of all variables on the server in one
+        exchange; servers which do not support this return an error, in which
+        case no information is returned
+        """
+
+        response = self.request("@info")[0]
+
+        if not response.startswith("@info "):
+            return {}
+
+        try:
+            info = json.loads(response[len("@info ") :])
+        except ValueError:
+            return {}
+
+        self.bulk = True
+
+        return {
+            alias: (settability == "settable", supported_types.get(type_name, None))
+            for alias, (settability, type_name) in info.items()
+        }
+
+    def __repr__(self):
+        return "_ServerConnection"
+
+
 class Remote(Variable):
     """
     Variable controlled by an experiment (running a server routine) on a
@@ -587,7 +1162,20 @@ class Remote(Variable):
     to. Setting `protocol='modbus'` indicates a Modbus server (controlled by a
     ModbusServer routine on the remote process/computer), and any other value
     or no value indicates a socket server (controlled by a SocketServer
-    routine).
+    routine). Remote variables of the same socket server share one connection
+    to the server, and the settability and type of all of them are obtained in a
+    single exchange with the server upon connection. The values of several of
+    them can be retrieved or set in a single exchange with the `fetch_many` and
+    `set_many` methods, and the values of all variables on a server with the
+    `snapshot` method.
+
+    If the optional `subscribe` argument is set to True, the socket server pushes
+    the value of the variable whenever it changes, and the `value` property
+    returns the latest pushed value without any exchange with the server. The
+    optional `deadband` argument is the change of a numeric value below which the
+    server does not push the new value, and the optional `interval` argument is
+    the minimum time in seconds between pushes of the value from the server. If the
+    subscription fails or is lost, values are requested from the server instead.
 
     The `settable` argument is required for remote variables on a Modbus server,
     and is not used for a socket server. If `settable` is set to True, then
@@ -598,9 +1186,11 @@ class Remote(Variable):
     a linear transformation of the raw variable value. Readings from the instrument will
     be multiplied by the `multiplier` and then increased by the `offset`. Set commands
     to the server will take the variable value, subtract the `offset` and divide by the
-    `multiplier`.
+    `multiplier`, which therefore cannot be zero.
     """
 
+    subscribed = False  #: whether the server pushes the value of the variable
+
     type_map = {
         Toggle: "64bit_uint",
         Boolean: "64bit_uint",
@@ -618,6 +1208,9 @@ class Remote(Variable):
         upper_limit: typing.Union[float, int] = None,
         multiplier: typing.Union[float, int] = 1,
         offset: typing.Union[float, int] = 0,
+        subscribe: bool = False,
+        deadband: typing.Union[float, int] = None,
+        interval: typing.Union[float, int] = None,
     ):
         self.server = server
         self.alias = alias
@@ -627,19 +1220,43 @@ class Remote(Variable):
         self.multiplier = multiplier
         self.offset = offset
 
+        if multiplier == 0:
+            raise ValueError(f"multiplier of remote variable {alias} cannot be zero")
+
         if protocol == "modbus":
             self._client = ModbusClient(server)
             self._settable = settable
 
         else:
-            server_ip, server_port = server.split("::")
+            # Remote variables of the same server share a connection
+            self._connection = _ServerConnection.open(server)
 
-            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            if alias in self._connection.info:
+                self._settable, self._type = self._connection.info[alias]
+            else:
+                self.get_settable()
+                self.get_type()
 
-            self._socket.connect((server_ip, int(server_port)))
+            if subscribe:
+                if deadband is not None:
+                    # deadband of the raw value on the server
+                    deadband = deadband / abs(multiplier)
 
-            self.get_settable()
-            self.get_type()
+                self.subscribed = self._connection.subscribe(
+                    alias, deadband=deadband, interval=interval
+                )
+
+                if not self.subscribed:
+                    logger.warning(
+                        f"Unable to subscribe to {alias} on server at {server}; "
+                        f"its value is requested instead"
+                    )
+
+    @property
+    def _pushed(self):
+        """Whether the value of the variable is pushed by the server"""
+
+        return self.subscribed and self._connection.pushing
 
     @property
     @Variable.getter_type_validator
@@ -672,28 +1289,39 @@ class Remote(Variable):
                 )
 
         else:
-            write_to_socket(self._socket, f"{self.alias} ?")
-
             logger.debug(
                 f"Retrieving value of type {self._type} "
                 f"with alias {self.alias}"
                 f"from socket server at {self.server}..."
             )
 
-            response = read_from_socket(self._socket, timeout=60, decode=False)
-
             try:
-                if response is None:
-                    self._value = None
-                elif b"Error" in response:
-                    raise RuntimeError(response.decode().split("Error: ")[-1])
-                else:
-                    bytes_value = response.split(self.alias.encode() + b" ")[-1].strip()
+                if self._pushed:
+                    # latest value pushed by the server
+                    self._value = self._connection.cache.get(self.alias, None)
+
+                elif self._connection.bulk:
+                    # values, including arrays, are received in binary form
+                    values = self._connection.get_values([self.alias])
 
-                    if bytes_value[:5] == b"dlpkl":
-                        # pickled quantity, usually an array, list or tuple
-                        self._value = dill.loads(bytes_value[5:])
+                    self._value = values[self.alias]
+
+                else:  # server only answers requests of single values
+                    response = self._connection.request(
+                        f"{self.alias} ?", decode=False
+                    )[0]
+
+                    if response is None:
+                        self._value = None
+                    elif b"Error" in response:
+                        raise RuntimeError(response.decode().split("Error: ")[-1])
                     else:
+                        bytes_value = response.split(self.alias.encode() + b" ")[-1]
+                        bytes_value = bytes_value.strip()
+
+                        if bytes_value[:5] == b"dlpkl":
+                            raise RuntimeError("pickled values are not accepted")
+
                         self._value = recast(
                             bytes_value,
                             to=self._type if self._type is not None else Type,
@@ -710,6 +1338,11 @@ class Remote(Variable):
                     f'from {self.protocol} server at {self.server}: "{error}"'
                 )
 
+                # the value is unavailable, as in `fetch_many`
+                self._value = None
+
+                return self._value
+
         if isinstance(self._value, numbers.Number):
             self._value = self.multiplier * self._value + self.offset
 
@@ -722,10 +1355,7 @@ class Remote(Variable):
         Set the value of a remote variable
         """
 
-        if isinstance(value, np.integer):
-            value = (value - int(self.offset)) // int(self.multiplier)
-        elif isinstance(value, np.floating):
-            value = (value - self.offset) / self.multiplier
+        value = self._to_server(value)
 
         if self.protocol == "modbus":
 
@@ -743,9 +1373,7 @@ class Remote(Variable):
                 f"on socket server at {self.server}..."
             )
 
-            write_to_socket(self._socket, f"{self.alias} {value}")
-
-            check = read_from_socket(self._socket, timeout=60)
+            check = self._connection.request(f"{self.alias} {value}")[0]
 
             if check == "" or check is None:
                 logger.warning(
@@ -784,9 +1412,8 @@ class Remote(Variable):
     def __del__(self):
         if self.protocol == "modbus":
             self._client.disconnect()
-        else:
-            self._socket.shutdown(socket.SHUT_RDWR)
-            self._socket.close()
+        elif hasattr(self, "_connection"):
+            self._connection.release()
 
     def get_type(self):
         """Get the data type of the remote variable"""
@@ -821,9 +1448,7 @@ class Remote(Variable):
                 f"on socket server at {self.server}..."
             )
 
-            write_to_socket(self._socket, f"{self.alias} type?")
-
-            response = read_from_socket(self._socket, timeout=60)
+            response = self._connection.request(f"{self.alias} type?")[0]
 
             if response is not None:
                 for _type in supported_types:
@@ -839,11 +1464,141 @@ class Remote(Variable):
 
     def get_settable(self):
         """Get settability of remote variable"""
-        write_to_socket(self._socket, f"{self.alias} settable?")
-
-        response = read_from_socket(self._socket, timeout=60)
+        response = self._connection.request(f"{self.alias} settable?")[0]
         self._settable = response == f"{self.alias} settable"
 
+    def _to_server(self, value):
+        """Undo the linear transformation of a value to be set on the server"""
+
+        if isinstance(value, np.integer):
+            return (value - int(self.offset)) // int(self.multiplier)
+        elif isinstance(value, np.floating):
+            return (value - self.offset) / self.multiplier
+        else:
+            return value
+
+    @Variable.getter_type_validator
+    def _receive(self, value):
+        """Transform and validate a value received from the server"""
+
+        if isinstance(value, numbers.Number):
+            value = self.multiplier * value + self.offset
+
+        return value
+
+    @staticmethod
+    def fetch_many(remotes):
+        """
+        Get the values of several remote variables, with a single request to each
+        socket server; values of variables on Modbus servers are retrieved
+        individually. The values of variables that cannot be retrieved (e.g. if
+        their server is unreachable) are None.
+
+        :param remotes: (list) Remote variables
+        :return: (list) values of the remote variables, in the same order
+        """
+
+        groups = {}  # of the form {..., connection: [..., remote, ...], ...}
+
+        for remote in remotes:
+            connection = getattr(remote, "_connection", None)
+
+            if connection is not None and connection.bulk and not remote._pushed:
+                groups.setdefault(connection, []).append(remote)
+            else:
+                try:
+                    remote.value
+                except Exception as error:
+                    logger.warning(
+                        f"Unable to retrieve value of {remote.alias} "
+                        f'from {remote.protocol} server at {remote.server}: "{error}"'
+                    )
+
+                    remote._value = None
+
+        for connection, group in groups.items():
+            try:
+                values = connection.get_values([remote.alias for remote in group])
+            except Exception as error:
+                logger.warning(
+                    f"Unable to retrieve values from socket server at "
+                    f'{connection.server}: "{error}"'
+                )
+
+                values = {}
+
+            for remote in group:
+                remote._receive(values.get(remote.alias, None))
+
+        return [remote._value for remote in remotes]
+
+    @staticmethod
+    def set_many(remotes, values):
+        """
+        Set the values of several remote variables, with a single request to each
+        socket server; variables on Modbus servers are set individually.
+
+        :param remotes: (list) Remote variables
+        :param values: (list) values to set, in the same order
+        """
+
+        groups = {}  # of the form {..., connection: [..., (remote, value), ...], ...}
+
+        for remote, value in zip(remotes, values):
+            connection = getattr(remote, "_connection", None)
+
+            if connection is not None and connection.bulk:
+                if remote._type is not None:
+                    value = recast(value, to=remote._type)
+
+                groups.setdefault(connection, []).append(
+                    (remote, remote._to_server(value))
+                )
+            else:
+                remote.value = value
+
+        for connection, group in groups.items():
+            try:
+                checked = connection.set_values(
+                    {remote.alias: value for remote, value in group}
+                )
+            except (ConnectionError, ValueError) as error:
+                logger.warning(
+                    f"Unable to set values on socket server at "
+                    f'{connection.server}: "{error}"'
+                )
+
+                continue
+
+            for remote, value in group:
+                if remote.alias not in checked:
+                    logger.warning(
+                        f"Unable to set {remote.alias} on server at {remote.server}"
+                    )
+                elif np.any(checked[remote.alias] != value):
+                    logger.warning(
+                        f"Attempted to set {remote.alias} on "
+                        f"server at {remote.server} to {value} but "
+                        f"checked value is {checked[remote.alias]}"
+                    )
+
+    @staticmethod
+    def snapshot(server):
+        """
+        Get the values of all variables on a socket server in one exchange
+
+        :param server: (str) IP address and port of the server, in the form
+                       '(ip address)::(port)'
+        :return: (dict) values, of the form {..., alias: value, ...}
+        """
+
+        connection = _ServerConnection.open(server)
+
+        try:
+            return connection.snapshot()
+        finally:
+            connection.release()
+
     def __str__(self):
         return f"Remote({self.alias}@{self.server} = {self.value})"
 